@@ -1,36 +1,24 @@
 import json
 import re
 import os
+import sys
 from datetime import datetime
 
+if not __package__:  # run as a script rather than `python -m`
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    __package__ = "backend.Filtration"
+
+from .rule_set import get_rule_set
+
 class NewsFilter:
-    def __init__(self):
-        self.stock_tips_keywords = [
-            "buy recommendation", "sell recommendation", "strong buy", "strong sell",
-            "analyst rating", "analyst upgrade", "analyst downgrade", "price target",
-            "price prediction", "forecast", "earnings estimate", "earnings preview",
-            "earnings outlook", "dividend forecast", "market tip", "stock tip",
-            "tip for investors", "short squeeze", "long position"
-        ]
-
-        self.earnings_keywords = [
-            "quarterly earnings preview", "earnings", "profit forecast",
-            "revenue guidance", "results preview", "eps forecast"
-        ]
-
-        self.local_news_keywords = [
-            "local community", "regional office", "branch opening", "small business announcement",
-            "town hall meeting", "company picnic", "employee event", "corporate anniversary",
-            "generic press release", "company statement", "product launch—region", 
-            "plant closure", "city council partnership", "small contract award"
-        ]
-
-        self.non_us_keywords = [
-            "asia pacific region", "latin america region", "middle east region",
-            "emerging markets only", "non‑us operations", "overseas subsidiary",
-            "foreign exchange only", "china market focus", "india market expansion",
-            "european union only", "non‑us investor", "ASEAN"
-        ]
+    def __init__(self, rules=None, telemetry=None):
+        # keyword lists live in rules.json ("news_filter" section)
+        self.rules = rules or get_rule_set()
+        self.telemetry = telemetry
+        self.stock_tips_keywords = list(self.rules.keywords("news_filter.stock_tips"))
+        self.earnings_keywords = list(self.rules.keywords("news_filter.earnings"))
+        self.local_news_keywords = list(self.rules.keywords("news_filter.local_news"))
+        self.non_us_keywords = list(self.rules.keywords("news_filter.non_us"))
 
     def contains_keywords(self, text, keywords):
         if not text:
@@ -45,13 +33,12 @@ class NewsFilter:
             article.get('description', '')
         ).lower()
 
-        if (self.contains_keywords(combined_text, self.stock_tips_keywords) or
-            self.contains_keywords(combined_text, self.earnings_keywords) or
-            self.contains_keywords(combined_text, self.local_news_keywords) or
-            self.contains_keywords(combined_text, self.non_us_keywords)):
-            return True
+        if self.telemetry is not None:
+            self.telemetry.observe_news_filter(combined_text)
 
-        return False
+        # one precompiled word-boundary pattern per list
+        return any(self.rules.matches(name, combined_text)
+                   for name in self.rules.news_filter_order)
 
     def filter_articles(self, articles):
         return [article for article in articles if not self.exclude(article)]
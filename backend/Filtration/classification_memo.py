@@ -0,0 +1,166 @@
+"""
+Memo of per-article classification/scoring results, shared across runs.
+
+The same articles come back day after day (and from more than one provider),
+so we key results by sha256(rules version + namespace + normalized text):
+
+- in-process LRU (OrderedDict) for repeats inside one run
+- local SQLite file for repeats across runs / warm Lambda invocations
+
+The rules version is part of the key, and rows written under an older
+version are dropped when the file is opened, so editing rules.json
+invalidates everything automatically.
+
+Several processes may share the file (backfill workers): it runs in WAL
+mode, every put commits at once (no write transaction left open) and
+waits up to _BUSY_TIMEOUT for the lock. If SQLite still fails, the memo
+carries on in memory only for the rest of the run.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .rule_set import default_cache_dir, get_rule_set
+
+_BUSY_TIMEOUT = 5.0  # seconds to wait for another process's write lock
+
+
+class ClassificationMemo:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        rules_version: Optional[str] = None,
+        max_items: int = 4096,
+        use_disk: bool = True,
+    ) -> None:
+        self.rules_version = rules_version or get_rule_set().version
+        self.max_items = max_items
+        self.path = path or os.path.join(default_cache_dir(), "classification_memo.sqlite")
+
+        self._lru: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        if use_disk:
+            self._db = self._open_db(self.path)
+
+    def _open_db(self, path: str) -> Optional[sqlite3.Connection]:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            db = sqlite3.connect(path, timeout=_BUSY_TIMEOUT, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS memo ("
+                " key TEXT PRIMARY KEY, rules_version TEXT, value TEXT)"
+            )
+            # rules changed since these rows were written -> stale
+            db.execute("DELETE FROM memo WHERE rules_version != ?", (self.rules_version,))
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"[MEMO] Disk layer disabled ({path}): {e}")
+            return None
+
+    def key(self, namespace: str, text: str) -> str:
+        raw = f"{self.rules_version}\0{namespace}\0{text}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def get(self, namespace: str, text: str) -> Optional[Dict[str, Any]]:
+        k = self.key(namespace, text)
+        with self._lock:
+            if k in self._lru:
+                self._lru.move_to_end(k)
+                self.stats["memory_hits"] += 1
+                return dict(self._lru[k])
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value FROM memo WHERE key = ?", (k,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self._drop_disk(e)
+                    row = None
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(k, value)
+                    self.stats["disk_hits"] += 1
+                    return dict(value)
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, namespace: str, text: str, value: Dict[str, Any]) -> None:
+        k = self.key(namespace, text)
+        with self._lock:
+            self._remember(k, dict(value))
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO memo (key, rules_version, value) VALUES (?, ?, ?)",
+                    (k, self.rules_version, json.dumps(value)),
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._drop_disk(e)
+
+    def _drop_disk(self, error: Exception) -> None:
+        """SQLite failed (e.g. "database is locked"): memory only from here on."""
+        print(f"[MEMO] Disk layer disabled ({self.path}): {error}")
+        try:
+            self._db.rollback()
+            self._db.close()
+        except sqlite3.Error:
+            pass
+        self._db = None
+
+    def _remember(self, k: str, value: Dict[str, Any]) -> None:
+        self._lru[k] = value
+        self._lru.move_to_end(k)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+
+    def flush(self) -> None:
+        # puts commit as they go; kept so callers can mark a stage boundary
+        with self._lock:
+            if self._db is not None:
+                try:
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self._drop_disk(e)
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_DEFAULT_MEMO: Optional[ClassificationMemo] = None
+
+
+def default_memo() -> ClassificationMemo:
+    """
+    Process-wide memo. BRIEFLY_MEMO=off keeps it in memory only,
+    BRIEFLY_MEMO_PATH moves the SQLite file.
+    """
+    global _DEFAULT_MEMO
+    if _DEFAULT_MEMO is None or _DEFAULT_MEMO.rules_version != get_rule_set().version:
+        use_disk = (os.environ.get("BRIEFLY_MEMO") or "on").lower() not in ("0", "off", "false")
+        _DEFAULT_MEMO = ClassificationMemo(
+            path=os.environ.get("BRIEFLY_MEMO_PATH"),
+            use_disk=use_disk,
+        )
+        atexit.register(_DEFAULT_MEMO.flush)
+    return _DEFAULT_MEMO
@@ -1,7 +1,41 @@
 from typing import List, Dict, Any, Optional
 import os
 import json
-import requests
+import sys
+
+if not __package__:  # run as a script rather than `python -m`
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    __package__ = "backend.Filtration"
+
+from ..unipro_pipeline.llm_cache import LLMResponseCache, cache_key, default_llm_cache
+from ..unipro_pipeline.llm_client import LLMClient, default_deepseek_url
+from ..unipro_pipeline.llm_json import parse_items
+from ..unipro_pipeline.llm_usage import PromptCacheStats
+from ..unipro_pipeline.prompt_budget import compact_table, fit_to_budget, indented_json, savings_report
+from .rule_set import get_rule_set, tokenize
+
+# Same text on every call (nothing interpolated) so DeepSeek's prefix cache
+# can reuse it; the per-run numbers and the table go in the user message.
+SYSTEM_PROMPT = """You are ranking financial news articles by how EDUCATIONAL they are for a new trader.
+
+Return JSON ONLY in this format:
+{
+  "total_analyzed": <total_analyzed from the user message>,
+  "selection_logic": "top_10_or_15",
+  "selected_articles": [
+    {"id": 1, "education_score": 9, "rank": 1},
+    {"id": 2, "education_score": 8, "rank": 2}
+  ]
+}
+
+Scoring (1-10):
+- Higher score = more explanation value (what/how/why/impact, macro, sector dynamics, hidden connections).
+- Lower score = simple headline, basic company fluff, no real learning.
+
+The user message gives total_analyzed, then the articles, one per line,
+columns separated by "|" (base_label: IMP = IMPORTANT, NEU = NEUTRAL,
+LOW = NOT IMPORTANT; descriptions may be shortened).
+"""
 
 
 # Step 1: Christians FILTER
@@ -10,50 +44,7 @@ def classify_article(article: str) -> str:
     article = string containing title + description + content
     returns: "REMOVE", "IMPORTANT", "NOT IMPORTANT", or "NEUTRAL"
     """
-    text = article.lower()
-
-    # 1. Filter OUT non-US content
-    non_us_keywords = [
-        "china", "india", "russia", "uk", "england", "europe", "africa",
-        "asia", "middle east", "mexico", "canada", "brazil", "australia",
-        "japan", "south america", "international", "global"
-    ]
-    for k in non_us_keywords:
-        if k in text:
-            return "REMOVE"
-
-    # 2. Filter OUT political content
-    political_keywords = [
-        "election", "vote", "ballot", "president", "senator", "governor",
-        "congress", "parliament", "policy", "bill", "legislation",
-        "democrat", "republican", "campaign", "white house", "supreme court",
-        "lawmaker", "administration"
-    ]
-    for k in political_keywords:
-        if k in text:
-            return "REMOVE"
-
-    # 3. Classify IMPORTANT articles
-    important_keywords = [
-        "breaking", "urgent", "emergency", "crisis", "public safety",
-        "severe weather", "health advisory", "recall", "missing person",
-        "natural disaster", "major update"
-    ]
-    for k in important_keywords:
-        if k in text:
-            return "IMPORTANT"
-
-    # 4. Classify NOT IMPORTANT articles
-    not_important_keywords = [
-        "celebrity", "gossip", "viral", "meme", "influencer",
-        "entertainment", "fashion", "sports rumor", "pop culture"
-    ]
-    for k in not_important_keywords:
-        if k in text:
-            return "NOT IMPORTANT"
-
-    # 5. Everything else = Neutral
-    return "NEUTRAL"
+    return get_rule_set().classify(article)
 
 #Step 2 my filter
 class EducationalArticleAnalyzer:
@@ -62,39 +53,31 @@ class EducationalArticleAnalyzer:
     Input: list of dicts with id, title, description, content.
     """
 
-    def __init__(self, deepseek_api_key: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        deepseek_api_key: Optional[str] = None,
+        llm_cache: Optional[LLMResponseCache] = None,
+        llm_client: Optional[LLMClient] = None,
+        deepseek_url: Optional[str] = None,
+        prompt_token_budget: Optional[int] = None,
+    ) -> None:
         # Step 2: Store DeepSeek config
         self.deepseek_api_key = deepseek_api_key or os.environ.get("DEEPSEEK_API_KEY")
         if not self.deepseek_api_key:
             raise ValueError("DeepSeek API key not provided (pass in or set DEEPSEEK_API_KEY).")
-        self.deepseek_url = "https://api.deepseek.com/v1/chat/completions"
-
-        # Simple sector mapping
-        self.sector_keywords = {
-            "technology": "Technology",
-            "ai": "Technology",
-            "chip": "Technology",
-            "semiconductor": "Technology",
-            "software": "Technology",
-            "bank": "Financials",
-            "credit": "Financials",
-            "loan": "Financials",
-            "insurance": "Financials",
-            "oil": "Energy",
-            "gas": "Energy",
-            "opec": "Energy",
-            "solar": "Energy",
-            "wind": "Energy",
-            "retail": "Consumer",
-            "consumer": "Consumer",
-            "pharma": "Healthcare",
-            "drug": "Healthcare",
-            "vaccine": "Healthcare",
-            "hospital": "Healthcare",
-            "shipping": "Industrials",
-            "factory": "Industrials",
-            "manufacturing": "Industrials",
-        }
+        self.deepseek_url = deepseek_url or default_deepseek_url()
+        self.llm_cache = llm_cache if llm_cache is not None else default_llm_cache()
+        # timeouts + retries; raises LLMCallError when it gives up
+        self.llm_client = llm_client or LLMClient(self.deepseek_api_key, self.deepseek_url)
+        self.prompt_cache_stats = PromptCacheStats()
+        # system + user prompt, estimated tokens (same knob as the pipeline)
+        self.prompt_token_budget = prompt_token_budget or int(
+            os.environ.get("DEEPSEEK_PROMPT_TOKEN_BUDGET", "6000")
+        )
+        self.prompt_stats: Dict[str, Any] = {}
+
+        # Simple sector mapping (from rules.json)
+        self.sector_keywords = dict(get_rule_set().sector_keywords)
 
     # Step 3: Normalize + combine article text
     def _normalize_text(self, article: Dict[str, Any]) -> str:
@@ -106,10 +89,7 @@ class EducationalArticleAnalyzer:
     # Step 4: Infer simple sector
     def _infer_sector(self, article: Dict[str, Any]) -> str:
         text = self._normalize_text(article)
-        for keyword, sector in self.sector_keywords.items():
-            if keyword in text:
-                return sector
-        return "Unknown"
+        return get_rule_set().infer_sector(tokenize(text))[0]
 
     # Step 5: Prepare list for DeepSeek (after friend's filter)
     def _prepare_for_deepseek(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -141,56 +121,79 @@ class EducationalArticleAnalyzer:
 
         return {"annotated": annotated, "simplified": simplified}
 
-    # Step 6: Build DeepSeek prompt
-    def _build_prompt(self, simplified_articles: List[Dict[str, Any]]) -> str:
-        prompt = f"""
-You are ranking financial news articles by how EDUCATIONAL they are for a new trader.
-
-Return JSON ONLY in this format:
-{{
-  "total_analyzed": {len(simplified_articles)},
-  "selection_logic": "top_10_or_15",
-  "selected_articles": [
-    {{"id": 1, "education_score": 9, "rank": 1}},
-    {{"id": 2, "education_score": 8, "rank": 2}}
-  ]
-}}
-
-Scoring (1-10):
-- Higher score = more explanation value (what/how/why/impact, macro, sector dynamics, hidden connections).
-- Lower score = simple headline, basic company fluff, no real learning.
+    # Step 6: Build DeepSeek prompt (user part; instructions are SYSTEM_PROMPT)
+    def _render_prompt(
+        self, simplified_articles: List[Dict[str, Any]], desc_limit: Optional[int]
+    ) -> str:
+        table = compact_table(
+            simplified_articles,
+            ["id", "sector", "base_label", "title", "description"],
+            {"description": desc_limit} if desc_limit is not None else None,
+        )
+        return f"total_analyzed: {len(simplified_articles)}\n\n{table}\n"
 
-Articles (list of objects with id, title, description, sector, base_label):
-{simplified_articles}
-"""
+    def _build_prompt(self, simplified_articles: List[Dict[str, Any]]) -> str:
+        """
+        Table trimmed so system + user stay within `prompt_token_budget`
+        (shorter descriptions first, then fewer tail articles). Token
+        savings vs. the articles as indented JSON end up in self.prompt_stats.
+        """
+        kept, desc_limit, _ = fit_to_budget(
+            simplified_articles,
+            lambda items, limit: SYSTEM_PROMPT + self._render_prompt(items, limit),
+            self.prompt_token_budget,
+            desc_limits=(200, 160, 80, 0),
+        )
+        if len(kept) < len(simplified_articles):
+            print(
+                f"[PROMPT] analyzer: token budget {self.prompt_token_budget}, "
+                f"sending {len(kept)} of {len(simplified_articles)} articles"
+            )
+        prompt = self._render_prompt(kept, desc_limit)
+
+        self.prompt_stats = {
+            **savings_report(SYSTEM_PROMPT + indented_json(simplified_articles), SYSTEM_PROMPT + prompt),
+            "token_budget": self.prompt_token_budget,
+            "articles_in": len(simplified_articles),
+            "articles_sent": len(kept),
+            "description_chars": desc_limit,
+        }
+        print(
+            f"[PROMPT] analyzer: ~{self.prompt_stats['compact_tokens']} tokens "
+            f"(~{self.prompt_stats['json_tokens']} as indented JSON, -{self.prompt_stats['saved_pct']}%)"
+        )
         return prompt
 
     # Step 7: Call DeepSeek API
     def _call_deepseek(self, prompt: str) -> List[Dict[str, Any]]:
-        headers = {
-            "Authorization": f"Bearer {self.deepseek_api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "model": "deepseek-chat",
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
             "temperature": 0.3,
             "max_tokens": 1500,
         }
 
-        resp = requests.post(self.deepseek_url, headers=headers, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-        content = data["choices"][0]["message"]["content"].strip()
+        key = cache_key(
+            payload["model"], payload["temperature"], payload["max_tokens"], payload["messages"]
+        )
+        cached = self.llm_cache.get(key)
+        if cached is not None:
+            return cached
 
-        if content.startswith("```"):
-            start = content.find("{")
-            end = content.rfind("}")
-            if start != -1 and end != -1:
-                content = content[start : end + 1]
+        data = self.llm_client.chat(payload, "analyzer", stage="analyzer")
+        self.prompt_cache_stats.record(data.get("usage"))
+        content = data["choices"][0]["message"]["content"].strip()
 
-        parsed = json.loads(content)
-        return parsed.get("selected_articles", [])
+        parsed = parse_items(content, list_key="selected_articles")
+        if not parsed.items and not parsed.complete:
+            raise ValueError(f"DeepSeek reply is not JSON: {content[:200]}")
+        # a truncated reply still yields its complete picks, but isn't cached
+        if parsed.complete:
+            self.llm_cache.set(key, parsed.items)
+        return parsed.items
 
     # Step 8: Merge DeepSeek ranking with full articles
     def _merge_results(
@@ -247,6 +250,10 @@ Articles (list of objects with id, title, description, sector, base_label):
             "filtered_for_deepseek": len(annotated),
             "selected_count": len(final_articles),
             "selected": final_articles,
+            "llm_cache": self.llm_cache.snapshot(),
+            "prompt_cache": self.prompt_cache_stats.snapshot(),
+            "prompt_tokens": self.prompt_stats,
+            "llm_metrics": self.llm_client.meter.summary(),
         }
 
 
@@ -1,4 +1,14 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+import os
+import sys
+
+if not __package__:  # run as a script rather than `python -m`
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    __package__ = "backend.Filtration"
+
+from .classification_memo import ClassificationMemo
+from .rule_set import get_rule_set, tokenize
+from .topk import label_score_key, top_k
 
 
 class BasicArticleFilter:
@@ -7,50 +17,7 @@ class BasicArticleFilter:
     """
 
     def classify_text(self, text: str) -> str:
-        t = text.lower()
-
-        # 1. Filter OUT non-US content
-        non_us_keywords = [
-            "china", "india", "russia", "uk", "england", "europe", "africa",
-            "asia", "middle east", "mexico", "canada", "brazil", "australia",
-            "japan", "south america", "international", "global",
-        ]
-        for k in non_us_keywords:
-            if k in t:
-                return "REMOVE"
-
-        # 2. Filter OUT political content
-        political_keywords = [
-            "election", "vote", "ballot", "president", "senator", "governor",
-            "congress", "parliament", "policy", "bill", "legislation",
-            "democrat", "republican", "campaign", "white house",
-            "supreme court", "lawmaker", "administration",
-        ]
-        for k in political_keywords:
-            if k in t:
-                return "REMOVE"
-
-        # 3. IMPORTANT articles
-        important_keywords = [
-            "breaking", "urgent", "emergency", "crisis", "public safety",
-            "severe weather", "health advisory", "recall", "missing person",
-            "natural disaster", "major update",
-        ]
-        for k in important_keywords:
-            if k in t:
-                return "IMPORTANT"
-
-        # 4. NOT IMPORTANT articles
-        not_important_keywords = [
-            "celebrity", "gossip", "viral", "meme", "influencer",
-            "entertainment", "fashion", "sports rumor", "pop culture",
-        ]
-        for k in not_important_keywords:
-            if k in t:
-                return "NOT IMPORTANT"
-
-        # 5. Everything else
-        return "NEUTRAL"
+        return get_rule_set().classify(text)
 
 
 class EducationalArticleAnalyzer:
@@ -65,48 +32,20 @@ class EducationalArticleAnalyzer:
     - Select top N in a DeepSeek-style list.
     """
 
-    def __init__(self, base_filter: Optional[BasicArticleFilter] = None) -> None:
+    def __init__(
+        self,
+        base_filter: Optional[BasicArticleFilter] = None,
+        memo: Optional[ClassificationMemo] = None,
+    ) -> None:
         self.base_filter = base_filter or BasicArticleFilter()
+        # optional: reuse annotations for articles seen in earlier runs.
+        # Memo keys only cover rules.json, so a custom filter (whose labels
+        # can differ for the same text) doesn't use it.
+        self.memo = memo if type(self.base_filter) is BasicArticleFilter else None
 
-        self.sector_keywords = {
-            "technology": "Technology",
-            "ai": "Technology",
-            "chip": "Technology",
-            "semiconductor": "Technology",
-            "software": "Technology",
-            "bank": "Financials",
-            "credit": "Financials",
-            "loan": "Financials",
-            "insurance": "Financials",
-            "oil": "Energy",
-            "gas": "Energy",
-            "opec": "Energy",
-            "solar": "Energy",
-            "wind": "Energy",
-            "retail": "Consumer",
-            "consumer": "Consumer",
-            "pharma": "Healthcare",
-            "drug": "Healthcare",
-            "vaccine": "Healthcare",
-            "hospital": "Healthcare",
-            "shipping": "Industrials",
-            "factory": "Industrials",
-            "manufacturing": "Industrials",
-        }
-
-        self.educational_triggers = {
-            "why": 2,
-            "how": 2,
-            "explained": 3,
-            "analysis": 2,
-            "impact": 3,
-            "implications": 3,
-            "consequences": 3,
-            "supply chain": 3,
-            "regulatory": 3,
-            "geopolitical": 4,
-            "crisis": 4,
-        }
+        rules = self.rules = get_rule_set()
+        self.sector_keywords = dict(rules.sector_keywords)
+        self.educational_triggers = dict(rules.educational_triggers)
 
     # 1) Normalize article text
     def normalize_text(self, article: Dict[str, Any]) -> str:
@@ -115,13 +54,12 @@ class EducationalArticleAnalyzer:
         content = (article.get("content") or "").lower()
         return f"{title} {desc} {content}".strip()
 
-    # 2) Sector inference
+    # 2) Sector inference (token inverted index, weighted votes)
     def infer_sector(self, article: Dict[str, Any]) -> str:
-        text = self.normalize_text(article)
-        for keyword, sector in self.sector_keywords.items():
-            if keyword in text:
-                return sector
-        return "Unknown"
+        return self.infer_sector_with_confidence(article)[0]
+
+    def infer_sector_with_confidence(self, article: Dict[str, Any]) -> Tuple[str, float]:
+        return self.rules.infer_sector(tokenize(self.normalize_text(article)))
 
     # 3) Educational score
     def compute_educational_score(self, article: Dict[str, Any]) -> int:
@@ -140,37 +78,44 @@ class EducationalArticleAnalyzer:
     # 4) Annotate ONE article
     def annotate_article(self, article: Dict[str, Any]) -> Dict[str, Any]:
         text = self.normalize_text(article)
-        base_label = self.base_filter.classify_text(text)
-        sector = self.infer_sector(article)
-        score = self.compute_educational_score(article)
+
+        fields = self.memo.get("annotate.v2", text) if self.memo else None
+        if fields is None:
+            # one tokenization pass feeds the sector vote
+            sector, confidence = self.rules.infer_sector(tokenize(text))
+            fields = {
+                "base_label": self.base_filter.classify_text(text),
+                "sector": sector,
+                "sector_confidence": confidence,
+                "educational_score": self.compute_educational_score(article),
+            }
+            if self.memo:
+                self.memo.put("annotate.v2", text, fields)
 
         annotated = article.copy()
-        annotated["base_label"] = base_label
-        annotated["sector"] = sector
-        annotated["educational_score"] = score
+        annotated.update(fields)
         return annotated
 
     # 5) Filter using BasicArticleFilter
-    def filter_with_basic(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        kept: List[Dict[str, Any]] = []
+    def iter_filtered(self, articles: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         for article in articles:
             annotated = self.annotate_article(article)
             if annotated["base_label"] != "REMOVE":
-                kept.append(annotated)
-        return kept
+                yield annotated
+
+    def filter_with_basic(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return list(self.iter_filtered(articles))
 
     # 6) Rank articles by label + score
-    def rank_articles(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        filtered = self.filter_with_basic(articles)
-        label_priority = {"IMPORTANT": 0, "NEUTRAL": 1, "NOT IMPORTANT": 2}
-
-        filtered.sort(
-            key=lambda a: (
-                label_priority.get(a["base_label"], 3),
-                -a["educational_score"],
-            )
-        )
-        return filtered
+    def rank_articles(
+        self,
+        articles: Iterable[Dict[str, Any]],
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        if limit is None:
+            return sorted(self.iter_filtered(articles), key=label_score_key)
+        # only the best `limit` are kept while streaming
+        return top_k(self.iter_filtered(articles), limit, key=label_score_key)
 
     # 7) Select top N
     def select_top_for_deepseek(
@@ -178,8 +123,7 @@ class EducationalArticleAnalyzer:
         articles: List[Dict[str, Any]],
         max_count: int = 15,
     ) -> Dict[str, Any]:
-        ranked = self.rank_articles(articles)
-        top = ranked[:max_count]
+        top = self.rank_articles(articles, limit=max_count)
 
         selected: List[Dict[str, Any]] = []
         for idx, art in enumerate(top, start=1):
@@ -0,0 +1,307 @@
+"""
+Keyword rule sets, loaded from rules.json and compiled once per process.
+
+All keyword lists (non-US / political / important / not-important labels,
+NewsFilter exclusions, banned title words, educational triggers, sector
+keywords) live in one data file. Point BRIEFLY_RULES_PATH at another file to
+change rules without a code deploy.
+
+The compiled form (deduped keyword tuples + regex sources) is cached as
+versioned JSON. On a cold start we only hash rules.json, check it against
+the checksum stored in the cache and load it; the regexes themselves are
+compiled lazily the first time a list is used. A cache file that does not
+parse or check out is a miss: rules.json is compiled again.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# bump when the cached payload layout changes
+CACHE_FORMAT = 3
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "rules.json")
+
+_NEVER_MATCHES = "(?!)"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def default_cache_dir() -> str:
+    """
+    Where local caches go: /tmp in Lambda, ~/.cache/briefly otherwise.
+    """
+    env_dir = os.environ.get("BRIEFLY_CACHE_DIR")
+    if env_dir:
+        return env_dir
+    if os.environ.get("AWS_EXECUTION_ENV"):
+        return "/tmp/briefly"
+    return os.path.join(os.path.expanduser("~"), ".cache", "briefly")
+
+
+def _rules_path() -> str:
+    return os.environ.get("BRIEFLY_RULES_PATH") or DEFAULT_RULES_PATH
+
+
+def _substring_source(keywords: Tuple[str, ...]) -> str:
+    # longest first so the alternation behaves like `any(k in text)`
+    if not keywords:
+        return _NEVER_MATCHES
+    ordered = sorted(keywords, key=len, reverse=True)
+    return "|".join(re.escape(k) for k in ordered)
+
+
+def _word_source(keywords: Tuple[str, ...]) -> str:
+    if not keywords:
+        return _NEVER_MATCHES
+    ordered = sorted(keywords, key=len, reverse=True)
+    return r"\b(?:" + "|".join(re.escape(k) for k in ordered) + r")\b"
+
+
+def _dedup_lower(words: List[str]) -> Tuple[str, ...]:
+    out: List[str] = []
+    seen = set()
+    for w in words:
+        w = (w or "").strip().lower()
+        if w and w not in seen:
+            seen.add(w)
+            out.append(w)
+    return tuple(out)
+
+
+def compile_rules(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn the rules.json document into the plain-data payload we cache.
+    """
+    lists: Dict[str, Tuple[str, ...]] = {}
+    sources: Dict[str, str] = {}
+
+    for name, words in (raw.get("classify") or {}).items():
+        kws = _dedup_lower(words)
+        lists[name] = kws
+        sources[name] = _substring_source(kws)
+
+    for name, words in (raw.get("news_filter") or {}).items():
+        key = f"news_filter.{name}"
+        kws = _dedup_lower(words)
+        lists[key] = kws
+        sources[key] = _word_source(kws)
+
+    # sector keyword -> [(sector, weight)]; value is "Sector" or ["Sector", weight]
+    sector_keywords: Dict[str, str] = {}
+    sector_index: Dict[str, List[Tuple[str, float]]] = {}
+    for kw, value in (raw.get("sector_keywords") or {}).items():
+        if isinstance(value, str):
+            sector, weight = value, 1.0
+        else:
+            sector, weight = value[0], float(value[1])
+        token_key = " ".join(tokenize(kw))
+        if not token_key:
+            continue
+        sector_keywords[kw] = sector
+        sector_index.setdefault(token_key, []).append((sector, weight))
+
+    banned = _dedup_lower(raw.get("banned_title_keywords") or [])
+    lists["banned_title"] = banned
+    sources["banned_title"] = _substring_source(banned)
+
+    return {
+        "lists": lists,
+        "sources": sources,
+        "classify_order": [tuple(x) for x in raw.get("classify_order") or []],
+        "news_filter_order": [
+            f"news_filter.{name}" for name in (raw.get("news_filter") or {})
+        ],
+        "candidate_triggers": dict(raw.get("candidate_triggers") or {}),
+        "educational_triggers": dict(raw.get("educational_triggers") or {}),
+        "sector_keywords": sector_keywords,
+        "sector_index": sector_index,
+        "sector_max_ngram": max((k.count(" ") + 1 for k in sector_index), default=1),
+    }
+
+
+class CompiledRuleSet:
+    """
+    Matcher structures built from one version of rules.json.
+    """
+
+    def __init__(self, checksum: str, payload: Dict[str, Any]) -> None:
+        self.checksum = checksum
+        self.lists: Dict[str, Tuple[str, ...]] = payload["lists"]
+        self.classify_order: List[Tuple[str, str]] = payload["classify_order"]
+        self.news_filter_order: List[str] = payload["news_filter_order"]
+        self.candidate_triggers: Dict[str, int] = payload["candidate_triggers"]
+        self.educational_triggers: Dict[str, int] = payload["educational_triggers"]
+        self.sector_keywords: Dict[str, str] = payload["sector_keywords"]
+        self.sector_index: Dict[str, List[Tuple[str, float]]] = payload["sector_index"]
+        self.sector_max_ngram: int = payload["sector_max_ngram"]
+
+        self._sources: Dict[str, str] = payload["sources"]
+        self._patterns: Dict[str, "re.Pattern[str]"] = {}
+
+    @property
+    def version(self) -> str:
+        """Short id of the rules file these matchers were built from."""
+        return self.checksum[:12]
+
+    def keywords(self, name: str) -> Tuple[str, ...]:
+        return self.lists.get(name, ())
+
+    def pattern(self, name: str) -> "re.Pattern[str]":
+        pat = self._patterns.get(name)
+        if pat is None:
+            pat = re.compile(self._sources.get(name, _NEVER_MATCHES))
+            self._patterns[name] = pat
+        return pat
+
+    def matches(self, name: str, text: str) -> bool:
+        """`text` must already be lower-cased."""
+        return self.pattern(name).search(text) is not None
+
+    def hits(self, name: str, text: str) -> List[str]:
+        """
+        Every keyword of list `name` found in `text` (slow path, telemetry only).
+        """
+        if name.startswith("news_filter."):
+            return [
+                k for k in self.keywords(name)
+                if re.search(r"\b" + re.escape(k) + r"\b", text)
+            ]
+        return [k for k in self.keywords(name) if k in text]
+
+    def classify(self, text: str) -> str:
+        """
+        "REMOVE", "IMPORTANT", "NOT IMPORTANT" or "NEUTRAL" (first list that hits wins).
+        """
+        t = (text or "").lower()
+        for name, label in self.classify_order:
+            if self.matches(name, t):
+                return label
+        return "NEUTRAL"
+
+    def infer_sector(self, tokens: List[str]) -> Tuple[str, float]:
+        """
+        Weighted vote over whole-token keyword hits (1..n-gram lookups in the
+        inverted index). Returns (sector, confidence), confidence = winner's
+        share of all votes; ("Unknown", 0.0) when nothing matches.
+        A trailing "s" is tried as a plural ("banks" -> "bank").
+        """
+        votes: Dict[str, float] = {}
+        first_seen: Dict[str, int] = {}
+        index = self.sector_index
+
+        n_tokens = len(tokens)
+        for i in range(n_tokens):
+            for n in range(1, self.sector_max_ngram + 1):
+                if i + n > n_tokens:
+                    break
+                gram = tokens[i] if n == 1 else " ".join(tokens[i : i + n])
+                hits = index.get(gram)
+                if hits is None and gram.endswith("s") and len(gram) > 3:
+                    hits = index.get(gram[:-1])
+                if not hits:
+                    continue
+                for sector, weight in hits:
+                    votes[sector] = votes.get(sector, 0.0) + weight
+                    first_seen.setdefault(sector, i)
+
+        if not votes:
+            return "Unknown", 0.0
+
+        # most votes wins; ties go to the sector mentioned first
+        best = min(votes, key=lambda sec: (-votes[sec], first_seen[sec]))
+        return best, round(votes[best] / sum(votes.values()), 3)
+
+
+# --------------------------------------------------------
+# loading + compiled cache
+# --------------------------------------------------------
+def _cache_path() -> str:
+    return os.path.join(default_cache_dir(), f"rules_v{CACHE_FORMAT}.json")
+
+
+def _read_cache(path: str, checksum: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return None
+
+    try:
+        header, body = blob.split(b"\n", 1)
+        fmt, source_sum, body_sum = header.decode("ascii").split(" ")
+        if int(fmt) != CACHE_FORMAT or source_sum != checksum:
+            return None
+        if hashlib.sha256(body).hexdigest() != body_sum:
+            return None
+        return _from_json(json.loads(body.decode("utf-8")))
+    except Exception:  # garbled header / body: recompile
+        return None
+
+
+def _from_json(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON has no tuples: restore the ones compile_rules() produces."""
+    payload["lists"] = {name: tuple(kws) for name, kws in payload["lists"].items()}
+    payload["classify_order"] = [tuple(x) for x in payload["classify_order"]]
+    payload["sector_index"] = {
+        key: [tuple(v) for v in votes] for key, votes in payload["sector_index"].items()
+    }
+    return payload
+
+
+def _write_cache(path: str, checksum: str, payload: Dict[str, Any]) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    header = f"{CACHE_FORMAT} {checksum} {hashlib.sha256(body).hexdigest()}\n"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header.encode("ascii") + body)
+        os.replace(tmp, path)
+    except OSError:
+        # read-only filesystem etc. -> just run without the cache
+        pass
+
+
+def load_rule_set(
+    rules_path: Optional[str] = None,
+    cache_path: Optional[str] = None,
+    use_cache: bool = True,
+) -> CompiledRuleSet:
+    rules_path = rules_path or _rules_path()
+    cache_path = cache_path or _cache_path()
+
+    with open(rules_path, "rb") as f:
+        raw_bytes = f.read()
+    checksum = hashlib.sha256(raw_bytes).hexdigest()
+
+    payload = _read_cache(cache_path, checksum) if use_cache else None
+    if payload is None:
+        payload = compile_rules(json.loads(raw_bytes.decode("utf-8")))
+        if use_cache:
+            _write_cache(cache_path, checksum, payload)
+
+    return CompiledRuleSet(checksum, payload)
+
+
+_RULE_SET: Optional[CompiledRuleSet] = None
+_RULE_SET_LOCK = threading.Lock()
+
+
+def get_rule_set(refresh: bool = False) -> CompiledRuleSet:
+    """
+    Process-wide rule set, loaded on first use.
+    """
+    global _RULE_SET
+    if _RULE_SET is None or refresh:
+        with _RULE_SET_LOCK:
+            if _RULE_SET is None or refresh:
+                _RULE_SET = load_rule_set()
+    return _RULE_SET
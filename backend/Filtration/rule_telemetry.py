@@ -0,0 +1,184 @@
+"""
+Optional hit-rate / latency telemetry for the keyword rules.
+
+Turn it on with BRIEFLY_RULE_TELEMETRY=1. The filter pipeline then counts,
+for every article it classifies:
+
+- hits per keyword and per list (all lists are checked, not just the first
+  one that decides the label)
+- which list decided the label
+- time spent per stage
+
+and writes FILTERSFORDEEPSEEK_MMDDYYYY.rules.json next to the candidates file.
+
+Aggregate a folder of those summaries to find dead / over-broad rules:
+    python -m backend.Filtration.rule_telemetry ./archive --top 20
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .rule_set import CompiledRuleSet, get_rule_set
+
+SUMMARY_SUFFIX = ".rules.json"
+
+
+def telemetry_enabled() -> bool:
+    return (os.environ.get("BRIEFLY_RULE_TELEMETRY") or "").lower() in ("1", "on", "true")
+
+
+def summary_path_for(artifact_path: str) -> str:
+    base, _ = os.path.splitext(artifact_path)
+    return base + SUMMARY_SUFFIX
+
+
+class RuleTelemetry:
+    def __init__(self, rules: Optional[CompiledRuleSet] = None) -> None:
+        self.rules = rules or get_rule_set()
+        self.texts: Dict[str, int] = {}
+        self.rule_hits: Dict[str, Dict[str, int]] = {}
+        self.list_hits: Dict[str, int] = {}
+        self.decided_by: Dict[str, int] = {}
+        self.stage_seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + elapsed
+
+    def _count(self, list_names: List[str], text: str) -> List[str]:
+        fired: List[str] = []
+        for name in list_names:
+            hits = self.rules.hits(name, text)
+            if not hits:
+                continue
+            fired.append(name)
+            self.list_hits[name] = self.list_hits.get(name, 0) + 1
+            per_rule = self.rule_hits.setdefault(name, {})
+            for kw in hits:
+                per_rule[kw] = per_rule.get(kw, 0) + 1
+        return fired
+
+    def observe_classify(self, text: str) -> None:
+        """Count every classify list that fires on `text` (lower-cased)."""
+        self.texts["classify"] = self.texts.get("classify", 0) + 1
+        fired = set(self._count([name for name, _ in self.rules.classify_order], text))
+        decider = next((n for n, _ in self.rules.classify_order if n in fired), "none")
+        self.decided_by[decider] = self.decided_by.get(decider, 0) + 1
+
+    def observe_news_filter(self, text: str) -> None:
+        self.texts["news_filter"] = self.texts.get("news_filter", 0) + 1
+        fired = self._count(self.rules.news_filter_order, text)
+        decider = fired[0] if fired else "none"
+        self.decided_by[decider] = self.decided_by.get(decider, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        # include zero-hit rules so dead keywords show up
+        rules_out: Dict[str, Dict[str, int]] = {}
+        for name, _ in self.rules.classify_order:
+            rules_out[name] = {kw: 0 for kw in self.rules.keywords(name)}
+        for name in self.rules.news_filter_order:
+            if "news_filter" in self.texts:
+                rules_out[name] = {kw: 0 for kw in self.rules.keywords(name)}
+        for name, per_rule in self.rule_hits.items():
+            rules_out.setdefault(name, {}).update(per_rule)
+
+        return {
+            "rules_version": self.rules.version,
+            "texts": self.texts,
+            "list_hits": self.list_hits,
+            "decided_by": self.decided_by,
+            "rule_hits": rules_out,
+            "stage_seconds": {k: round(v, 4) for k, v in self.stage_seconds.items()},
+        }
+
+    def write(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+        print(f"[TELEMETRY] Saved rule summary -> {path}")
+        return path
+
+
+# --------------------------------------------------------
+# aggregation CLI
+# --------------------------------------------------------
+def aggregate(paths: List[str]) -> Dict[str, Any]:
+    files: List[str] = []
+    for p in paths:
+        if os.path.isdir(p):
+            files += glob.glob(os.path.join(p, "**", f"*{SUMMARY_SUFFIX}"), recursive=True)
+        else:
+            files.append(p)
+
+    total_texts = 0
+    rule_hits: Dict[str, Dict[str, int]] = {}
+    rule_days: Dict[str, Dict[str, int]] = {}
+    decided_by: Dict[str, int] = {}
+    stage_seconds: Dict[str, float] = {}
+
+    for path in sorted(files):
+        with open(path, "r", encoding="utf-8") as f:
+            s = json.load(f)
+        total_texts += sum((s.get("texts") or {}).values())
+        for name, per_rule in (s.get("rule_hits") or {}).items():
+            agg = rule_hits.setdefault(name, {})
+            days = rule_days.setdefault(name, {})
+            for kw, n in per_rule.items():
+                agg[kw] = agg.get(kw, 0) + n
+                days[kw] = days.get(kw, 0) + (1 if n else 0)
+        for name, n in (s.get("decided_by") or {}).items():
+            decided_by[name] = decided_by.get(name, 0) + n
+        for name, sec in (s.get("stage_seconds") or {}).items():
+            stage_seconds[name] = stage_seconds.get(name, 0.0) + sec
+
+    flat = [
+        {"list": name, "rule": kw, "hits": n, "days_fired": rule_days[name][kw]}
+        for name, per_rule in rule_hits.items()
+        for kw, n in per_rule.items()
+    ]
+    flat.sort(key=lambda r: (-r["hits"], r["list"], r["rule"]))
+
+    return {
+        "files": len(files),
+        "texts": total_texts,
+        "decided_by": decided_by,
+        "stage_seconds": {k: round(v, 4) for k, v in stage_seconds.items()},
+        "rules": flat,
+        "dead_rules": [f"{r['list']}:{r['rule']}" for r in flat if r["hits"] == 0],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Aggregate *.rules.json telemetry summaries")
+    parser.add_argument("paths", nargs="+", help="summary files or directories")
+    parser.add_argument("--top", type=int, default=20, help="how many busiest rules to print")
+    parser.add_argument("--json", dest="json_out", help="write the full aggregate here")
+    args = parser.parse_args(argv)
+
+    report = aggregate(args.paths)
+    print(f"[TELEMETRY] {report['files']} summaries, {report['texts']} texts")
+    print(f"[TELEMETRY] Label decided by: {report['decided_by']}")
+    print(f"[TELEMETRY] Stage seconds: {report['stage_seconds']}")
+    print(f"{'hits':>6}  {'days':>4}  rule")
+    for r in report["rules"][: args.top]:
+        print(f"{r['hits']:>6}  {r['days_fired']:>4}  {r['list']}:{r['rule']}")
+    print(f"[TELEMETRY] Rules that never fired ({len(report['dead_rules'])}):")
+    for name in report["dead_rules"]:
+        print(f"  - {name}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Bounded top-k selection for annotated articles.
+
+The ranking steps only ever need the best few articles (30 candidates for
+DeepSeek, 15 for the analyzer, 10 for daily content), so instead of sorting
+the whole list we stream it through a heap that never holds more than k items.
+"""
+
+import heapq
+from typing import Any, Callable, Dict, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+# lower value = better
+LABEL_PRIORITY = {"IMPORTANT": 0, "NEUTRAL": 1, "NOT IMPORTANT": 2}
+
+
+def label_score_key(article: Dict[str, Any]) -> tuple:
+    """
+    Sort key used by the keyword filter: IMPORTANT first, then higher score.
+    """
+    return (
+        LABEL_PRIORITY.get(article.get("base_label", "NEUTRAL"), 3),
+        -(article.get("educational_score") or 0),
+    )
+
+
+def rank_key(article: Dict[str, Any]) -> int:
+    """
+    Sort key for articles already ranked by DeepSeek (educational_ranking.rank).
+    """
+    return (article.get("educational_ranking") or {}).get("rank", 9999)
+
+
+def top_k(items: Iterable[T], k: int, key: Callable[[T], Any]) -> List[T]:
+    """
+    Return the k smallest items by `key`, in order.
+
+    Same result as sorted(items, key=key)[:k] (ties keep their input order),
+    but the iterable is consumed once and only k items are kept at a time:
+    O(k) memory, O(n log k) time.
+    """
+    if k <= 0:
+        return []
+    return heapq.nsmallest(k, items, key=key)
@@ -5,6 +5,7 @@ from typing import List, Dict
 from .strategies.strategy_interface import SummarizationStrategy
 from .strategies.fast_ai_strategy import FastAIStrategy
 from .strategies.detailed_ai_strategy import DetailedAIStrategy
+from ..unipro_pipeline.profiling import StageProfile
 
 INPUT_JSON = Path("backend/data/filtered_articles.json")
 OUTPUT_JSON = Path("backend/out/enriched_articles.json")
@@ -39,6 +40,12 @@ def _pick_strategy() -> SummarizationStrategy:
         return FastAIStrategy()
     return DetailedAIStrategy()
 
-if __name__ == "__main__":
+def main() -> None:
     svc = ContentGenService(_pick_strategy())
-    svc.run()
+    # BRIEFLY_PROFILE=all -> backend/out/enriched_articles.profile.json / .prof
+    OUTPUT_JSON.parent.mkdir(parents=True, exist_ok=True)
+    with StageProfile(f"content_gen_{type(svc.strategy).__name__}", str(OUTPUT_JSON)):
+        svc.run()
+
+if __name__ == "__main__":
+    main()
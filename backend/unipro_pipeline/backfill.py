@@ -0,0 +1,162 @@
+"""
+Rebuild a range of past days, several days at a time.
+
+    python -m backend.unipro_pipeline.backfill 2025-09-01 2025-11-30 \
+        --data-dir ./archive --workers 4 --llm-concurrency 8
+
+Every day runs in a worker process (cwd = --data-dir, every file stamped
+with that day): filter (RAW_NEWS -> DEEPSEEKLISTFOR) then generate
+(-> DAILY_CONTENT). `--stages collect,filter,generate` refetches the news
+too, which only makes sense for recent days (the news APIs keep little
+history).
+
+Stage manifests (checkpoint.py) make this cheap to repeat: days whose
+inputs, config and code are unchanged are skipped, and an interrupted
+backfill picks up where it stopped. After a rules.json change every day's
+filter config hash changes, so the whole range is rebuilt.
+
+--llm-concurrency caps DeepSeek requests in flight across all workers
+(one multiprocessing semaphore handed to every worker, see
+llm_client.limit_concurrency), so workers x rewrite threads cannot run
+into the rate limit.
+
+The archive is a plain directory; sync it with the bucket around a run:
+    aws s3 sync s3://$BUCKET_NAME/NewsCollector/ ./archive
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+
+from .daily_content_generator import DailyContentGenerator
+from .educational_filter_pipeline import EducationalFilterPipeline
+from .llm_client import limit_concurrency
+from .raw_news import collect_and_save
+from .run_date import RunDate, date_range
+
+STAGES = ("collect", "filter", "generate")
+DEFAULT_STAGES = ("filter", "generate")
+
+
+def _init_worker(slots: Any, data_dir: str) -> None:
+    limit_concurrency(slots)
+    os.chdir(data_dir)
+
+
+def run_day(day: str, stages: Iterable[str] = DEFAULT_STAGES) -> Dict[str, Any]:
+    """All requested stages for one day, in the current directory."""
+    stages = tuple(stages)
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"date": day, "ok": True, "error": None}
+    try:
+        if "collect" in stages:
+            collect_and_save(target_count=100, run_date=day)
+        if "filter" in stages:
+            pipeline = EducationalFilterPipeline(run_date=day)
+            pipeline.run_complete_pipeline()
+            if not os.path.exists(pipeline._final_filename()):
+                raise RuntimeError(f"filter stage wrote no {pipeline._final_filename()}")
+        if "generate" in stages:
+            gen = DailyContentGenerator(run_date=day)
+            gen.generate_daily_content()
+            if not os.path.exists(gen.output_filename):
+                raise RuntimeError(f"generate stage wrote no {gen.output_filename}")
+    except Exception as e:
+        result.update(ok=False, error=f"{type(e).__name__}: {e}")
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def backfill(
+    start: RunDate,
+    end: RunDate,
+    data_dir: str = ".",
+    stages: Iterable[str] = DEFAULT_STAGES,
+    workers: int = 4,
+    llm_concurrency: int = 8,
+) -> List[Dict[str, Any]]:
+    """
+    Run `stages` for every day in [start, end]. workers <= 1 runs the days
+    one after another in this process. Returns one result per day, by date.
+    """
+    stages = tuple(stages)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages {sorted(unknown)}; pick from {STAGES}")
+    days = [d.isoformat() for d in date_range(start, end)]
+    data_dir = os.path.abspath(data_dir)
+    print(f"[BACKFILL] {len(days)} day(s) {days[0]}..{days[-1]}, stages {stages}, "
+          f"{workers} worker(s), {llm_concurrency} LLM call(s) in flight max")
+
+    results: List[Dict[str, Any]] = []
+    if workers <= 1:
+        cwd = os.getcwd()
+        _init_worker(threading.BoundedSemaphore(llm_concurrency), data_dir)
+        try:
+            for day in days:
+                results.append(run_day(day, stages))
+                _print_result(results[-1])
+        finally:
+            limit_concurrency(None)
+            os.chdir(cwd)
+    else:
+        # spawn: no forked copies of half-initialised locks / thread pools
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(days)),
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(ctx.BoundedSemaphore(llm_concurrency), data_dir),
+        ) as pool:
+            futures = [pool.submit(run_day, day, stages) for day in days]
+            for fut in as_completed(futures):
+                results.append(fut.result())
+                _print_result(results[-1])
+
+    results.sort(key=lambda r: r["date"])
+    failed = [r["date"] for r in results if not r["ok"]]
+    print(f"[BACKFILL] done: {len(results) - len(failed)} ok, {len(failed)} failed {failed or ''}")
+    return results
+
+
+def _print_result(r: Dict[str, Any]) -> None:
+    status = "ok" if r["ok"] else f"FAILED ({r['error']})"
+    print(f"[BACKFILL] {r['date']} {status} in {r['seconds']}s")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Reprocess a range of past days in parallel")
+    parser.add_argument("start", help="first day, YYYY-MM-DD")
+    parser.add_argument("end", help="last day, YYYY-MM-DD (included)")
+    parser.add_argument("--data-dir", default=".", help="where the RAW_NEWS_* etc. files live")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES),
+                        help=f"comma separated, from {','.join(STAGES)}")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--llm-concurrency", type=int,
+                        default=int(os.environ.get("BRIEFLY_BACKFILL_LLM_CONCURRENCY", "8")))
+    parser.add_argument("--json", dest="json_out", help="write per-day results here")
+    args = parser.parse_args(argv)
+
+    results = backfill(
+        args.start,
+        args.end,
+        data_dir=args.data_dir,
+        stages=[s.strip() for s in args.stages.split(",") if s.strip()],
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+    )
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Stage manifests: skip unchanged reruns, resume half-finished ones.
+
+Each stage writes <artifact>.manifest.json next to its output, e.g.
+DEEPSEEKLISTFOR11012025.manifest.json:
+
+    {stage, input_hash, config_hash, code_version, output, complete,
+     updated_at, partial}
+
+- input_hash: sha256 of what the stage read (file bytes / canonical JSON)
+- config_hash: sha256 of the settings that change its output
+- code_version: BRIEFLY_CODE_VERSION (e.g. the git sha at deploy), else a
+  hash of every backend/**/*.py
+- partial: progress saved while the stage runs (rewrites per article id,
+  the candidates file, ...)
+
+On a rerun with the same three hashes, a complete manifest whose output
+still exists means "skip the stage"; an incomplete one hands its `partial`
+back so the stage only does what is left. Anything else starts over.
+
+Env: BRIEFLY_CHECKPOINT=off disables manifests, BRIEFLY_FORCE=1 ignores
+complete ones (partial progress is still reused).
+
+On Lambda /tmp does not survive a timeout, so the handlers restore the
+manifest from S3 first and pass `on_write` to upload it. Uploads run
+outside the manifest lock (rewrite threads never wait on S3): always on
+record() / complete(), every BRIEFLY_CHECKPOINT_SYNC_EVERY (10) per-item
+records otherwise, and skipped if another upload is still in flight (the
+next one carries the newer manifest).
+"""
+
+import functools
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .run_date import utc_timestamp
+
+MANIFEST_SUFFIX = ".manifest.json"
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _flag(name: str, default: str) -> bool:
+    return (os.environ.get(name) or default).lower() in ("1", "on", "true")
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_json(value: Any) -> str:
+    return hash_bytes(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+@functools.lru_cache(maxsize=1)
+def code_version() -> str:
+    env = os.environ.get("BRIEFLY_CODE_VERSION")
+    if env:
+        return env
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(_BACKEND_DIR):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                h.update(os.path.relpath(path, _BACKEND_DIR).encode("utf-8"))
+                with open(path, "rb") as f:
+                    h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def manifest_path_for(artifact_path: str) -> str:
+    base, _ = os.path.splitext(artifact_path)
+    return base + MANIFEST_SUFFIX
+
+
+class StageCheckpoint:
+    def __init__(
+        self,
+        stage: str,
+        artifact_path: str,
+        input_hash: str,
+        config: Dict[str, Any],
+        enabled: Optional[bool] = None,
+        on_write: Optional[Callable[[str], None]] = None,
+        sync_every: Optional[int] = None,
+    ) -> None:
+        self.stage = stage
+        self.output = artifact_path
+        self.path = manifest_path_for(artifact_path)
+        self.input_hash = input_hash
+        self.config_hash = hash_json(config)
+        self.code_version = code_version()
+        self.enabled = _flag("BRIEFLY_CHECKPOINT", "on") if enabled is None else enabled
+        self.on_write = on_write
+        self.sync_every = max(
+            1, sync_every or int(os.environ.get("BRIEFLY_CHECKPOINT_SYNC_EVERY", "10"))
+        )
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._unsynced = 0
+        self._completed = False
+
+        previous = self._load() if self.enabled else None
+        self.matches = previous is not None and self._same_inputs(previous)
+        self.previous = previous if self.matches else None
+        self.partial: Dict[str, Any] = dict(previous.get("partial") or {}) if self.matches else {}
+        if previous is not None and not self.matches:
+            print(f"[CKPT] {stage}: inputs / config / code changed, starting over")
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[CKPT] Ignoring unreadable manifest {self.path}: {e}")
+            return None
+
+    def _same_inputs(self, m: Dict[str, Any]) -> bool:
+        return (
+            m.get("stage") == self.stage
+            and m.get("input_hash") == self.input_hash
+            and m.get("config_hash") == self.config_hash
+            and m.get("code_version") == self.code_version
+        )
+
+    def is_fresh(self) -> bool:
+        """Same inputs as a finished run whose output is still there."""
+        fresh = (
+            self.previous is not None
+            and bool(self.previous.get("complete"))
+            and os.path.exists(self.output)
+            and not _flag("BRIEFLY_FORCE", "off")
+        )
+        if fresh:
+            print(f"[CKPT] {self.stage}: unchanged since {self.previous.get('updated_at')}, skipping")
+        return fresh
+
+    def record(self, key: str, value: Any) -> None:
+        """Save one piece of progress right away (survives a crash / timeout)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._completed:
+                return
+            self.partial[key] = value
+            written = self._write(complete=False)
+        if written:
+            self._sync(wait=True)
+
+    def record_item(self, key: str, item_id: str, value: Any) -> None:
+        """
+        Like record(), for one entry of a per-item dict (e.g. rewrites by id).
+        Ignored after complete(): a rewrite that outlived the stage deadline
+        must not turn the finished manifest back into a partial one.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._completed:
+                return
+            self.partial.setdefault(key, {})[item_id] = value
+            written = self._write(complete=False)
+            self._unsynced += 1
+            due = written and self._unsynced >= self.sync_every
+            if due:
+                self._unsynced = 0
+        if due:
+            self._sync(wait=False)
+
+    def complete(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._completed = True
+            self.partial = {}
+            written = self._write(complete=True)
+        if written:
+            self._sync(wait=True)
+        print(f"[CKPT] {self.stage}: done -> {self.path}")
+
+    def _write(self, complete: bool) -> bool:
+        out = {
+            "stage": self.stage,
+            "input_hash": self.input_hash,
+            "config_hash": self.config_hash,
+            "code_version": self.code_version,
+            "output": self.output,
+            "complete": complete,
+            "updated_at": utc_timestamp(),
+            "partial": self.partial,
+        }
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(out, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[CKPT] Could not write {self.path}: {e}")
+            return False
+        return True
+
+    def _sync(self, wait: bool) -> None:
+        """Upload the manifest (called without self._lock held)."""
+        if self.on_write is None:
+            return
+        if not self._sync_lock.acquire(blocking=wait):
+            return  # an upload is in flight; the next sync carries this state
+        try:
+            self.on_write(self.path)
+        except Exception as e:  # a lost upload only costs resume, not the run
+            print(f"[CKPT] Could not sync {self.path}: {e}")
+        finally:
+            self._sync_lock.release()
+
+
+def s3_restore(s3: Any, bucket: str, prefix: str, paths: List[str]) -> List[str]:
+    """Download prefix+basename(path) -> path for each that exists in S3."""
+    restored = []
+    for path in paths:
+        key = f"{prefix}{os.path.basename(path)}"
+        try:
+            s3.download_file(bucket, key, path)
+            restored.append(path)
+        except Exception:  # not there yet (first run of the day)
+            pass
+    return restored
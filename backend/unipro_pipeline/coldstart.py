@@ -0,0 +1,135 @@
+"""
+Cold-start import budget for the Lambda handler modules.
+
+Every cold start pays for importing the handler module before
+lambda_handler runs. Each module is imported in a fresh interpreter under
+`python -X importtime`, and the check fails when:
+
+- the import takes longer than the budget (best of --repeat runs, in ms;
+  BRIEFLY_IMPORT_BUDGET_MS, default 120), or
+- a heavy dependency that is meant to load lazily shows up at import time
+  (requests / urllib3 on the first API call, boto3 inside the handler,
+  cProfile / pstats only with BRIEFLY_PROFILE).
+
+    python -m backend.unipro_pipeline.coldstart --top 8
+    make coldstart
+
+The --top list (slowest imports by cumulative time) is the audit: it is
+where to look when the budget breaks.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+HANDLER_MODULES = (
+    "backend.unipro_pipeline.raw_news",
+    "backend.unipro_pipeline.educational_filter_pipeline",
+    "backend.unipro_pipeline.daily_content_generator",
+    "backend.unipro_pipeline.runner",
+)
+LAZY_ONLY = ("requests", "urllib3", "boto3", "botocore", "cProfile", "pstats")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """`-X importtime` output -> [{name, self_us, cumulative_us, depth}] in import order."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append({
+                "name": m.group(4),
+                "self_us": int(m.group(1)),
+                "cumulative_us": int(m.group(2)),
+                "depth": (len(m.group(3)) - 1) // 2,
+            })
+    return rows
+
+
+def measure(module: str, python: str = sys.executable) -> List[Dict[str, Any]]:
+    """Import `module` in a fresh interpreter and return its importtime rows."""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def audit_module(module: str, budget_ms: float, repeat: int = 3, top: int = 8) -> Dict[str, Any]:
+    """Best-of-`repeat` import time of `module` plus the budget / lazy-import verdict."""
+    best: Optional[List[Dict[str, Any]]] = None
+    best_us = 0
+    for _ in range(max(1, repeat)):
+        rows = measure(module)
+        total = next((r["cumulative_us"] for r in rows if r["name"] == module), 0)
+        if best is None or total < best_us:
+            best, best_us = rows, total
+    rows = best or []
+    loaded = {r["name"] for r in rows}
+    eager = sorted(name for name in loaded if name in LAZY_ONLY)
+    # only what the module pulls in, not interpreter startup (site, encodings)
+    start = next((i for i, r in enumerate(rows) if r["depth"] == 0 and r["name"] == module), len(rows))
+    first = start
+    while first > 0 and rows[first - 1]["depth"] > 0:
+        first -= 1
+    own = rows[first:start + 1]
+    slowest = sorted(own, key=lambda r: r["cumulative_us"], reverse=True)[1:top + 1]
+    ms = round(best_us / 1000.0, 1)
+    return {
+        "module": module,
+        "import_ms": ms,
+        "budget_ms": budget_ms,
+        "modules_loaded": len(own),
+        "eager_heavy": eager,
+        "slowest": [
+            {"name": r["name"], "cumulative_ms": round(r["cumulative_us"] / 1000.0, 1)}
+            for r in slowest
+        ],
+        "ok": ms <= budget_ms and not eager,
+    }
+
+
+def audit(
+    modules: Iterable[str] = HANDLER_MODULES,
+    budget_ms: Optional[float] = None,
+    repeat: int = 3,
+    top: int = 8,
+) -> List[Dict[str, Any]]:
+    if budget_ms is None:
+        budget_ms = float(os.environ.get("BRIEFLY_IMPORT_BUDGET_MS", "120"))
+    return [audit_module(m, budget_ms, repeat, top) for m in modules]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import-time audit / cold-start budget of the handlers")
+    parser.add_argument("modules", nargs="*", default=list(HANDLER_MODULES))
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="per module (default BRIEFLY_IMPORT_BUDGET_MS or 120)")
+    parser.add_argument("--repeat", type=int, default=3, help="imports per module, best one counts")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list per module")
+    args = parser.parse_args(argv)
+
+    results = audit(args.modules, args.budget_ms, args.repeat, args.top)
+    for r in results:
+        status = "ok" if r["ok"] else "OVER BUDGET" if not r["eager_heavy"] else "EAGER IMPORT"
+        print(f"[COLDSTART] {r['module']}: {r['import_ms']} ms / {r['budget_ms']:.0f} ms budget, "
+              f"{r['modules_loaded']} modules - {status}")
+        if r["eager_heavy"]:
+            print(f"    loaded at import time (should be lazy): {', '.join(r['eager_heavy'])}")
+        for s in r["slowest"]:
+            print(f"    {s['cumulative_ms']:>7.1f} ms  {s['name']}")
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
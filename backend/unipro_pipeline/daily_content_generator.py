@@ -8,10 +8,79 @@
 
 import json
 import os
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+if not __package__:  # run as a script / top-level Lambda module rather than `python -m`
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    __package__ = "backend.unipro_pipeline"
+
+from ..content_gen.strategies.detailed_ai_strategy import DetailedAIStrategy
+from ..content_gen.strategies.fast_ai_strategy import FastAIStrategy
+from ..content_gen.strategies.strategy_interface import SummarizationStrategy
+from ..Filtration.topk import rank_key, top_k
+from .checkpoint import StageCheckpoint, hash_json, manifest_path_for, s3_restore
+from .llm_cache import LLMResponseCache, cache_key, default_llm_cache
+from .llm_client import LLMCallError, LLMClient, default_deepseek_url
+from .llm_json import parse_items, parse_object
+from .llm_metrics import metrics_path_for
+from .llm_usage import PromptCacheStats
+from .profiling import StageProfile
+from .prompt_budget import estimate_tokens
+from .rewrite_store import RewriteStore, default_rewrite_store
+from .run_date import RunDate, resolve_run_date, stamp_for
+from .speculative import load_speculative, speculative_filename
+from .tracing import TracedS3, carry, span
+
+REWRITE_SYSTEM_PROMPT = """You are rewriting a finance/news article for a student project.
+
+The user message gives the original title, original description, sector and
+publish time of one article.
 
-import requests
+Your job:
+- Keep the meaning of the article.
+- Make the title more creative, engaging, and curiosity-inducing.
+- Make the description 2–3 natural sentences, clear and educational.
+- No bullet points, no lists, no hashtags, no emojis.
+- Simple language. No jargon-heavy phrases.
+
+Return ONLY a JSON object in this exact shape:
+
+{
+  "title": "<new creative title>",
+  "description": "<2–3 sentence explanation, plain text>"
+}
+"""
+
+BATCH_REWRITE_SYSTEM_PROMPT = """You are rewriting finance/news articles for a student project.
+
+The user message gives a JSON array of articles (id, title, description,
+sector, published_at).
+
+For EACH article:
+- Keep the meaning of the article.
+- Make the title more creative, engaging, and curiosity-inducing.
+- Make the description 2–3 natural sentences, clear and educational.
+- No bullet points, no lists, no hashtags, no emojis.
+- Simple language. No jargon-heavy phrases.
+
+Return ONLY a JSON array with one object per article, using the same ids:
+
+[
+  {"id": <id>, "title": "<new creative title>", "description": "<2–3 sentence explanation>"}
+]
+"""
+
+
+def _pick_local_strategy(name: str) -> Optional[SummarizationStrategy]:
+    name = (name or "").lower()
+    if name == "fast":
+        return FastAIStrategy()
+    if name in ("none", "off", ""):
+        return None
+    return DetailedAIStrategy()
 
 
 class DailyContentGenerator:
@@ -47,14 +116,29 @@ class DailyContentGenerator:
               "sector": "...",
               "date": "YYYY-MM-DD",
               "title": "...",         # DeepSeek creative title
-              "description": "..."    # DeepSeek short description
+              "description": "...",   # DeepSeek short description
+              "strategy": "deepseek"  # or speculative / resumed / reused /
+                                      # DetailedAIStrategy / FastAIStrategy / fallback
             },
             ...
           ]
         }
     """
 
-    def __init__(self, deepseek_api_key: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        deepseek_api_key: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        request_timeout: Optional[float] = None,
+        overall_deadline: Optional[float] = None,
+        rewrite_mode: Optional[str] = None,
+        llm_cache: Optional[LLMResponseCache] = None,
+        llm_client: Optional[LLMClient] = None,
+        deepseek_url: Optional[str] = None,
+        local_strategy: Optional[str] = None,
+        rewrite_store: Optional[RewriteStore] = None,
+        run_date: RunDate = None,
+    ) -> None:
         # Use env var if present, else fallback to your provided key
         self.deepseek_api_key: str = (
             deepseek_api_key
@@ -64,12 +148,68 @@ class DailyContentGenerator:
         if not self.deepseek_api_key:
             raise ValueError("DeepSeek API key is not set")
 
-        self.deepseek_url = "https://api.deepseek.com/v1/chat/completions"
+        self.deepseek_url = deepseek_url or default_deepseek_url()
+        self.model = "deepseek-chat"
+        self.temperature = 0.5
+        # parsed rewrites keyed by prompt hash (reruns are free)
+        self.llm_cache = llm_cache if llm_cache is not None else default_llm_cache()
+        self.prompt_cache_stats = PromptCacheStats()
+        # past rewrites keyed by title similarity (near-duplicate stories)
+        self.rewrite_store = rewrite_store if rewrite_store is not None else default_rewrite_store()
+
+        # Rewrites run in a small thread pool; each request has its own timeout
+        # and the whole stage has a deadline, after which leftovers fall back.
+        self.max_workers = max(1, int(
+            max_workers or os.environ.get("DEEPSEEK_REWRITE_WORKERS", "4")
+        ))
+        self.request_timeout = float(
+            request_timeout or os.environ.get("DEEPSEEK_REQUEST_TIMEOUT", "40")
+        )
+        self.overall_deadline = float(
+            overall_deadline or os.environ.get("DEEPSEEK_REWRITE_DEADLINE", "120")
+        )
+
+        # "single" = one prompt per article, "batch" = several articles per
+        # prompt, packed to stay under an input token budget
+        self.rewrite_mode = (
+            rewrite_mode or os.environ.get("DEEPSEEK_REWRITE_MODE", "single")
+        ).lower()
+        self.batch_token_budget = int(os.environ.get("DEEPSEEK_BATCH_TOKEN_BUDGET", "3000"))
+        self.max_batch_size = int(os.environ.get("DEEPSEEK_MAX_BATCH_SIZE", "5"))
+
+        # retries / backoff; a retry never starts past the stage deadline
+        self.llm_client = llm_client or LLMClient(
+            self.deepseek_api_key, self.deepseek_url, request_timeout=self.request_timeout
+        )
+        self._stage_ends: Optional[float] = None
+
+        # Local content_gen strategy used once the deadline is at risk (and
+        # for failed calls): "detailed", "fast", or "none" for the bare
+        # "Explainer:" fallback. A call is skipped when the time left is below
+        # the p95 of this run's rewrite latencies (DEEPSEEK_EXPECTED_LATENCY
+        # until the first call comes back).
+        self.local_strategy = _pick_local_strategy(
+            local_strategy or os.environ.get("DEEPSEEK_LOCAL_STRATEGY", "detailed")
+        )
+        self.expected_latency = float(os.environ.get("DEEPSEEK_EXPECTED_LATENCY", "10"))
 
-        # Today’s stamp (MMDDYYYY) for filenames
-        stamp = datetime.today().strftime("%m%d%Y")
+        # Run date (BRIEFLY_RUN_DATE / today) and its stamp (MMDDYYYY) for filenames
+        self.run_date = resolve_run_date(run_date)
+        stamp = stamp_for(self.run_date)
         self.input_filename = f"DEEPSEEKLISTFOR{stamp}.json"
         self.output_filename = f"DAILY_CONTENT_{stamp}.json"
+        # rewrites the filter stage already made while ranking (if any)
+        self.speculative_filename = speculative_filename(stamp)
+        self.speculative_stats = {"available": 0, "used": 0}
+        # or the same rewrites handed over in memory (runner.py); None = read the file
+        self.speculative_rewrites: Optional[Dict[str, Dict[str, str]]] = None
+
+        # manifest for DAILY_CONTENT (see checkpoint.py); DeepSeek rewrites
+        # are recorded per article id as they finish, so a rerun after a
+        # crash only rewrites what is left. checkpoint_sync gets the manifest
+        # path after every write (the Lambda handler uploads it).
+        self.checkpoint: Optional[StageCheckpoint] = None
+        self.checkpoint_sync: Optional[Callable[[str], None]] = None
 
         print("🚀 Daily Content Generator (simplified)")
         print(f"📁 Input:  {self.input_filename}")
@@ -81,8 +221,10 @@ class DailyContentGenerator:
     # --------------------------------------------------
     def load_final_articles(self) -> List[Dict[str, Any]]:
         try:
-            with open(self.input_filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with span("json_read", path=self.input_filename) as sp:
+                with open(self.input_filename, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                sp.set(bytes=os.path.getsize(self.input_filename), items=len(data.get("articles", [])))
         except FileNotFoundError:
             print(f"❌ Input file not found: {self.input_filename}")
             return []
@@ -96,103 +238,95 @@ class DailyContentGenerator:
 
     @staticmethod
     def _sort_and_take_top10(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        def rank_of(a: Dict[str, Any]) -> int:
-            return a.get("educational_ranking", {}).get("rank", 9999)
-
-        sorted_articles = sorted(articles, key=rank_of)
-        top10 = sorted_articles[:10]
+        top10 = top_k(articles, 10, key=rank_key)
         print(f"🎯 Taking top {len(top10)} articles by educational_ranking.rank")
         return top10
 
     # --------------------------------------------------
     # DeepSeek call
     # --------------------------------------------------
+    # Static instructions go in the system message and never change between
+    # requests, so DeepSeek can serve that prefix from its prompt cache.
+    # Everything article-specific goes in the user message.
     def _build_prompt(self, article: Dict[str, Any]) -> str:
         original_title = article.get("title", "") or ""
         original_desc = article.get("description", "") or ""
         sector = article.get("sector", "Unknown") or "Unknown"
         published_at = article.get("published_at", "") or ""
 
-        return f"""
-You are rewriting a finance/news article for a student project.
-
-You are given:
-- Original title: {original_title}
-- Original description: {original_desc}
-- Sector: {sector}
-- Published at: {published_at}
-
-Your job:
-- Keep the meaning of the article.
-- Make the title more creative, engaging, and curiosity-inducing.
-- Make the description 2–3 natural sentences, clear and educational.
-- No bullet points, no lists, no hashtags, no emojis.
-- Simple language. No jargon-heavy phrases.
-
-Return ONLY a JSON object in this exact shape:
-
-{{
-  "title": "<new creative title>",
-  "description": "<2–3 sentence explanation, plain text>"
-}}
-"""
+        return (
+            f"Original title: {original_title}\n"
+            f"Original description: {original_desc}\n"
+            f"Sector: {sector}\n"
+            f"Published at: {published_at}\n"
+        )
 
-    def _call_deepseek_for_article(self, article: Dict[str, Any]) -> Dict[str, str]:
+    @staticmethod
+    def _messages(system: str, user: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ]
+
+    def _post_deepseek(
+        self, messages: List[Dict[str, str]], max_tokens: int, label: str
+    ) -> Optional[str]:
         """
-        Call DeepSeek to generate {title, description} for a single article.
-        On failure, falls back to a simple local rewrite.
+        Send one chat completion (with retries), return the message content
+        (``` fences not stripped) or None once retries are exhausted or the
+        reply has the wrong shape.
         """
-        prompt = self._build_prompt(article)
-
-        headers = {
-            "Authorization": f"Bearer {self.deepseek_api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
-            "model": "deepseek-chat",
-            "messages": [
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0.5,
-            "max_tokens": 400,
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": max_tokens,
         }
+        deadline = None
+        if self._stage_ends is not None:
+            deadline = max(0.0, self._stage_ends - time.monotonic())
 
         try:
-            resp = requests.post(
-                self.deepseek_url, headers=headers, json=payload, timeout=40
-            )
-        except Exception as e:
-            print(f"❌ DeepSeek request error (id={article.get('id')}): {e}")
-            return self._fallback_content(article)
-
-        if resp.status_code != 200:
-            print(
-                f"❌ DeepSeek HTTP {resp.status_code} "
-                f"for id={article.get('id')} -> {resp.text[:200]}"
-            )
-            return self._fallback_content(article)
-
-        try:
-            data = resp.json()
+            stage = "rewrite_batch" if label.startswith("batch") else "rewrite"
+            data = self.llm_client.chat(payload, label, deadline=deadline, stage=stage)
             content = data["choices"][0]["message"]["content"].strip()
+        except LLMCallError as e:
+            print(f"❌ DeepSeek request failed ({label}): {e}")
+            return None
         except Exception as e:
-            print(f"❌ DeepSeek response parse error (id={article.get('id')}): {e}")
-            return self._fallback_content(article)
+            print(f"❌ DeepSeek response parse error ({label}): {e}")
+            return None
 
-        # Strip optional ```json fences
-        if content.startswith("```"):
-            start = content.find("{")
-            end = content.rfind("}")
-            if start != -1 and end != -1:
-                content = content[start : end + 1]
+        self.prompt_cache_stats.record(data.get("usage"))
+        return content
 
-        try:
-            parsed = json.loads(content)
-        except json.JSONDecodeError:
+    def _call_deepseek_for_article(self, article: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Call DeepSeek to generate {title, description} for a single article.
+        On failure, falls back to a simple local rewrite.
+        """
+        messages = self._messages(REWRITE_SYSTEM_PROMPT, self._build_prompt(article))
+        key = cache_key(self.model, self.temperature, 400, messages)
+        cached = self.llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+        content = self._post_deepseek(messages, 400, f"id={article.get('id')}")
+        if content is None:
+            return self._local_rewrite(article)
+
+        parsed = parse_object(content)
+        if parsed is None:
             print(f"⚠️ DeepSeek returned non-JSON content (id={article.get('id')})")
             print(content)
-            return self._fallback_content(article)
+            return self._local_rewrite(article)
 
+        result = self._clean_rewrite(parsed, article)
+        self.llm_cache.set(key, result)
+        return result
+
+    @staticmethod
+    def _clean_rewrite(parsed: Dict[str, Any], article: Dict[str, Any]) -> Dict[str, str]:
         new_title = parsed.get("title") or article.get("title", "")
         new_desc = parsed.get("description") or article.get("description", "")
 
@@ -201,6 +335,130 @@ Return ONLY a JSON object in this exact shape:
             "description": new_desc.strip(),
         }
 
+    # --------------------------------------------------
+    # Batched DeepSeek calls (one prompt, many articles)
+    # --------------------------------------------------
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return estimate_tokens(text)
+
+    @staticmethod
+    def _batch_item(article: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": article.get("id"),
+            "title": article.get("title", "") or "",
+            "description": article.get("description", "") or "",
+            "sector": article.get("sector", "Unknown") or "Unknown",
+            "published_at": article.get("published_at", "") or "",
+        }
+
+    def _build_batch_prompt(self, articles: List[Dict[str, Any]]) -> str:
+        items = [self._batch_item(a) for a in articles]
+        return f"Articles:\n{json.dumps(items, ensure_ascii=False)}\n"
+
+    def _batch_overhead_tokens(self) -> int:
+        return self._estimate_tokens(BATCH_REWRITE_SYSTEM_PROMPT + self._build_batch_prompt([]))
+
+    def _plan_batches(self, articles: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Greedy packing: fill a batch until the estimated prompt would pass
+        `batch_token_budget` or it holds `max_batch_size` articles.
+        """
+        overhead = self._batch_overhead_tokens()
+        batches: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        used = overhead
+
+        for art in articles:
+            cost = self._estimate_tokens(json.dumps(self._batch_item(art), ensure_ascii=False))
+            full = len(current) >= self.max_batch_size
+            if current and (full or used + cost > self.batch_token_budget):
+                batches.append(current)
+                current, used = [], overhead
+            current.append(art)
+            used += cost
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def _call_deepseek_for_batch(
+        self, articles: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        One request for many articles. Returns {str(id): {title, description}}
+        for the ids that came back, or None if the reply was unusable.
+        """
+        messages = self._messages(BATCH_REWRITE_SYSTEM_PROMPT, self._build_batch_prompt(articles))
+        max_tokens = min(8000, 180 * len(articles) + 100)
+        key = cache_key(self.model, self.temperature, max_tokens, messages)
+        cached = self.llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+        ids = ",".join(str(a.get("id")) for a in articles)
+        content = self._post_deepseek(messages, max_tokens, f"batch ids={ids}")
+        if content is None:
+            return None
+
+        # keeps every complete item even if the array was cut off
+        by_id = {str(a.get("id")): a for a in articles}
+        parsed = parse_items(content, expected_ids=list(by_id))
+        if not parsed.items:
+            print(f"⚠️ DeepSeek returned non-JSON batch (ids={ids})")
+            return None
+
+        out: Dict[str, Dict[str, str]] = {}
+        for item in parsed.items:
+            aid = str(item.get("id"))
+            if aid in by_id:
+                out[aid] = self._clean_rewrite(item, by_id[aid])
+        if not out:
+            # parsed, but none of our ids: as unusable as non-JSON
+            print(f"⚠️ DeepSeek batch reply had none of the ids {ids}")
+            return None
+        if parsed.missing_ids:
+            print(f"⚠️ Batch reply missing ids {parsed.missing_ids}, re-requesting those")
+        # only complete replies are cached; partial ones get re-requested
+        if len(out) == len(articles):
+            self.llm_cache.set(key, out)
+        return out
+
+    def _rewrite_single(self, articles: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        art = articles[0]
+        if self._budget_at_risk():
+            return self._local_for(articles)
+        return {str(art.get("id")): self._call_deepseek_for_article(art)}
+
+    def _rewrite_batch(self, articles: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        """
+        Rewrite a batch; if the reply cannot be parsed, bisect and retry.
+        Ids the model skipped are retried the same way. A single article
+        ends up on the normal per-article path (which has its own fallback).
+        """
+        if len(articles) == 1:
+            return self._rewrite_single(articles)
+        if self._budget_at_risk():
+            return self._local_for(articles)
+
+        result = self._call_deepseek_for_batch(articles)
+        if result is None:
+            mid = len(articles) // 2
+            print(f"↔️ Splitting batch of {len(articles)} and retrying")
+            result = {}
+            result.update(self._rewrite_batch(articles[:mid]))
+            result.update(self._rewrite_batch(articles[mid:]))
+            return result
+
+        missing = [a for a in articles if str(a.get("id")) not in result]
+        if len(missing) == len(articles):
+            # no progress: resending the same batch would loop, go one by one
+            for art in articles:
+                result.update(self._rewrite_single([art]))
+        elif missing:
+            result.update(self._rewrite_batch(missing))
+        return result
+
     @staticmethod
     def _fallback_content(article: Dict[str, Any]) -> Dict[str, str]:
         """
@@ -211,8 +469,160 @@ Return ONLY a JSON object in this exact shape:
         return {
             "title": f"Explainer: {base_title[:80]}",
             "description": base_desc or "This article covers an important development in the markets.",
+            "strategy": "fallback",
+        }
+
+    # --------------------------------------------------
+    # Degradation to local content_gen strategies
+    # --------------------------------------------------
+    def _expected_call_seconds(self) -> float:
+        p95 = self.llm_client.meter.latency_percentile(95, ("rewrite", "rewrite_batch"))
+        return p95 / 1000.0 if p95 is not None else self.expected_latency
+
+    def _budget_at_risk(self) -> bool:
+        """True if a DeepSeek call started now would likely miss the deadline."""
+        if self.local_strategy is None or self._stage_ends is None:
+            return False
+        return self._stage_ends - time.monotonic() < self._expected_call_seconds()
+
+    def _local_rewrite(self, article: Dict[str, Any]) -> Dict[str, str]:
+        if self.local_strategy is None:
+            return self._fallback_content(article)
+        title = (article.get("title") or "").strip()
+        desc = (article.get("description") or "").strip()
+        res = self.local_strategy.generate(". ".join(p.rstrip(".") for p in (title, desc) if p))
+        if not res.get("title"):
+            return self._fallback_content(article)
+        return {
+            "title": res["title"],
+            "description": res.get("summary") or desc,
+            "strategy": type(self.local_strategy).__name__,
         }
 
+    def _local_for(self, articles: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        print(f"🏃 Deadline at risk, rewriting locally (ids={[a.get('id') for a in articles]})")
+        return {str(a.get("id")): self._local_rewrite(a) for a in articles}
+
+    def _rewrite_all(self, articles: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """
+        Rewrite `articles` with up to `max_workers` DeepSeek calls in flight
+        (one article per call, or packed batches in "batch" mode).
+        Results come back in input order, each tagged with "strategy"
+        (deepseek / a content_gen strategy / fallback). Calls are skipped
+        once the deadline is at risk; anything that raised or did not finish
+        before `overall_deadline` is rewritten locally.
+        """
+        if not articles:
+            return []
+
+        by_id: Dict[str, Dict[str, str]] = {}
+
+        # made by the filter stage while the ranking call was in flight
+        speculative = (
+            self.speculative_rewrites
+            if self.speculative_rewrites is not None
+            else load_speculative(self.speculative_filename)
+        )
+        self.speculative_stats["available"] = len(speculative)
+        for art in articles:
+            spec = speculative.get(str(art.get("id")))
+            if spec and spec.get("source_title") == (art.get("title") or ""):
+                by_id[str(art.get("id"))] = {
+                    "title": spec["title"],
+                    "description": spec["description"],
+                    "strategy": "speculative",
+                }
+        self.speculative_stats["used"] = len(by_id)
+
+        # finished by an earlier run of this stage on the same input
+        if self.checkpoint is not None:
+            done = self.checkpoint.partial.get("rewrites", {})
+            for art in articles:
+                prev = done.get(str(art.get("id")))
+                if prev and str(art.get("id")) not in by_id:
+                    by_id[str(art.get("id"))] = {**prev, "strategy": "resumed"}
+
+        # near-duplicates of stories we already rewrote
+        if self.rewrite_store is not None:
+            for art in articles:
+                if str(art.get("id")) in by_id:
+                    continue
+                hit = self.rewrite_store.lookup(art.get("title") or "")
+                if hit is not None:
+                    print(f"♻️ Reusing rewrite for id={art.get('id')} (similarity {hit['similarity']})")
+                    by_id[str(art.get("id"))] = {
+                        "title": hit["title"],
+                        "description": hit["description"],
+                        "strategy": "reused",
+                    }
+        todo = [a for a in articles if str(a.get("id")) not in by_id]
+
+        pool = None
+        if todo:
+            pool = self._submit_and_wait(todo, by_id)
+
+        results: List[Dict[str, str]] = []
+        for art in articles:
+            res = by_id.get(str(art.get("id")))
+            if res is None:
+                res = self._local_rewrite(art)
+            res = {**res, "strategy": res.get("strategy", "deepseek")}
+            if self.rewrite_store is not None and res["strategy"] in ("deepseek", "speculative", "resumed"):
+                self.rewrite_store.store(
+                    art.get("title") or "",
+                    {"title": res["title"], "description": res["description"]},
+                )
+            results.append(res)
+
+        # don't block on stragglers; their requests time out on their own
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def _submit_and_wait(
+        self, articles: List[Dict[str, Any]], by_id: Dict[str, Dict[str, str]]
+    ) -> ThreadPoolExecutor:
+        """Run the DeepSeek jobs until done or the deadline; fills `by_id`."""
+        if self.rewrite_mode == "batch":
+            jobs = self._plan_batches(articles)
+            task = self._rewrite_batch
+            print(f"📦 Batch mode: {len(articles)} articles in {len(jobs)} request(s)")
+        else:
+            jobs = [[art] for art in articles]
+            task = self._rewrite_single
+
+        self._stage_ends = time.monotonic() + self.overall_deadline
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs)))
+        futures = []
+        for batch in jobs:
+            for art in batch:
+                print(f"\n📝 Processing article id={art.get('id')}")
+            futures.append(pool.submit(carry(self._run_and_checkpoint), task, batch))
+
+        done, _ = wait(futures, timeout=self.overall_deadline)
+
+        for batch, fut in zip(jobs, futures):
+            ids = [a.get("id") for a in batch]
+            if fut not in done:
+                print(f"⏱️ Deadline hit, rewriting locally (ids={ids})")
+            elif fut.exception() is not None:
+                print(f"❌ Rewrite failed (ids={ids}): {fut.exception()}")
+            else:
+                by_id.update(fut.result())
+        return pool
+
+    def _run_and_checkpoint(
+        self,
+        task: Callable[[List[Dict[str, Any]]], Dict[str, Dict[str, str]]],
+        batch: List[Dict[str, Any]],
+    ) -> Dict[str, Dict[str, str]]:
+        result = task(batch)
+        if self.checkpoint is not None:
+            for aid, res in result.items():
+                if "strategy" not in res:  # DeepSeek output, not a local fallback
+                    self.checkpoint.record_item("rewrites", aid, res)
+        return result
+
     # --------------------------------------------------
     # Final assembly
     # --------------------------------------------------
@@ -230,20 +640,64 @@ Return ONLY a JSON object in this exact shape:
         return published_at
 
     def generate_daily_content(self) -> None:
+        with span("generate_stage", run_date=self.run_date.isoformat()):
+            self._generate_daily_content()
+
+    def _generate_daily_content(self) -> None:
         articles = self.load_final_articles()
         if not articles:
             print("❌ No articles available. Exiting.")
             return
 
+        self.checkpoint = StageCheckpoint(
+            "generate", self.output_filename, hash_json(articles),
+            self._checkpoint_config(), on_write=self.checkpoint_sync,
+        )
+        if self.checkpoint.is_fresh():
+            return
+
+        out = self.build_daily_content(articles)
+
+        try:
+            with span("json_write", path=self.output_filename, items=out["total_articles"]) as sp:
+                with open(self.output_filename, "w", encoding="utf-8") as f:
+                    json.dump(out, f, indent=2, ensure_ascii=False)
+                sp.set(bytes=os.path.getsize(self.output_filename))
+            print("\n✅ DAILY CONTENT GENERATED")
+            print(f"💾 Saved -> {self.output_filename}")
+            self.checkpoint.complete()
+        except Exception as e:
+            print(f"❌ Error saving {self.output_filename}: {e}")
+
+        # per-call tokens / cost / latency, uploaded next to the output
+        self.llm_client.meter.write(
+            metrics_path_for(self.output_filename), out["generation_date"]
+        )
+
+    def _checkpoint_config(self) -> Dict[str, Any]:
+        # settings that change the rewrites (prompts are covered by the code version)
+        return {
+            "model": self.model,
+            "temperature": self.temperature,
+            "rewrite_mode": self.rewrite_mode,
+            "batch": [self.batch_token_budget, self.max_batch_size],
+            "local_strategy": type(self.local_strategy).__name__ if self.local_strategy else None,
+        }
+
+    def build_daily_content(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Top 10 of the filter stage's articles, rewritten (the DAILY_CONTENT payload)."""
         top_articles = self._sort_and_take_top10(articles)
 
         final_items: List[Dict[str, Any]] = []
-
-        for art in top_articles:
+        with span("rewrite", items=len(top_articles), mode=self.rewrite_mode) as sp:
+            rewrites = self._rewrite_all(top_articles)
+            used: Dict[str, int] = {}
+            for r in rewrites:
+                used[r["strategy"]] = used.get(r["strategy"], 0) + 1
+            sp.set(strategies=used)
+
+        for art, deepseek_result in zip(top_articles, rewrites):
             aid = art.get("id")
-            print(f"\n📝 Processing article id={aid}")
-            deepseek_result = self._call_deepseek_for_article(art)
-
             sector = art.get("sector", "Unknown") or "Unknown"
             date_str = self._extract_date(art.get("published_at", "") or "")
 
@@ -254,27 +708,35 @@ Return ONLY a JSON object in this exact shape:
                     "date": date_str,
                     "title": deepseek_result["title"],
                     "description": deepseek_result["description"],
+                    "strategy": deepseek_result["strategy"],
                 }
             )
 
+        strategy_counts: Dict[str, int] = {}
+        for item in final_items:
+            strategy_counts[item["strategy"]] = strategy_counts.get(item["strategy"], 0) + 1
+
         out = {
-            "generation_date": datetime.utcnow().date().isoformat(),
+            "generation_date": self.run_date.isoformat(),
             "total_articles": len(final_items),
             "articles": final_items,
+            "metadata": {
+                "strategies": strategy_counts,
+                "speculative": self.speculative_stats,
+                "rewrite_reuse": (
+                    self.rewrite_store.snapshot() if self.rewrite_store is not None else None
+                ),
+                "llm_cache": self.llm_cache.snapshot(),
+                "prompt_cache": self.prompt_cache_stats.snapshot(),
+            },
         }
-
-        try:
-            with open(self.output_filename, "w", encoding="utf-8") as f:
-                json.dump(out, f, indent=2, ensure_ascii=False)
-            print("\n✅ DAILY CONTENT GENERATED")
-            print(f"💾 Saved -> {self.output_filename}")
-        except Exception as e:
-            print(f"❌ Error saving {self.output_filename}: {e}")
+        return out
 
 
 def main() -> None:
     gen = DailyContentGenerator()
-    gen.generate_daily_content()
+    with StageProfile("generate", gen.output_filename):  # BRIEFLY_PROFILE
+        gen.generate_daily_content()
 
 
 if __name__ == "__main__":
@@ -283,17 +745,17 @@ if __name__ == "__main__":
 def lambda_handler(event, context):
     import boto3
     import os
-    from datetime import datetime
 
     try:
         bucket = os.environ.get("BUCKET_NAME", "universityprojectbucket")
         filt_prefix = "Filteration/"
         final_prefix = "FinalArticles/"
 
-        s3 = boto3.client("s3")
+        s3 = TracedS3(boto3.client("s3"))
 
-        # Use same date stamp style as the generator
-        stamp = datetime.today().strftime("%m%d%Y")
+        # event {"run_date": "YYYY-MM-DD"} regenerates a past day, default today
+        run_date = resolve_run_date((event or {}).get("run_date"))
+        stamp = stamp_for(run_date)
 
         # 1) Ensure we write/read in /tmp
         os.chdir("/tmp")
@@ -305,20 +767,47 @@ def lambda_handler(event, context):
 
         s3.download_file(bucket, input_key, local_input)
 
-        # 3) Run daily content generator (it will read DEEPSEEKLISTFOR... from CWD)
-        gen = DailyContentGenerator()
-        gen.generate_daily_content()
+        # 2b) Speculative rewrites from the filter stage, if it made any
+        spec_name = speculative_filename(stamp)
+        try:
+            s3.download_file(bucket, f"{filt_prefix}{spec_name}", os.path.join("/tmp", spec_name))
+        except Exception:
+            pass
+
+        # 3) Run daily content generator (it will read DEEPSEEKLISTFOR... from CWD),
+        #    resuming from the manifest of an earlier run if there is one
+        gen = DailyContentGenerator(run_date=run_date)
+        local_output = os.path.join("/tmp", gen.output_filename)
+        s3_restore(s3, bucket, final_prefix, [local_output, manifest_path_for(local_output)])
+        gen.checkpoint_sync = lambda path: s3.upload_file(
+            path, bucket, f"{final_prefix}{os.path.basename(path)}"
+        )
+        with StageProfile("generate", local_output) as prof:
+            gen.generate_daily_content()
 
         # 4) Upload DAILY_CONTENT_MMDDYYYY.json to FinalArticles/
         output_name = gen.output_filename  # already set in __init__
-        local_output = os.path.join("/tmp", output_name)
         output_key = f"{final_prefix}{output_name}"
 
         s3.upload_file(local_output, bucket, output_key)
+        uploaded = [f"s3://{bucket}/{output_key}"]
+
+        # 5) LLM metrics for this stage
+        local_metrics = metrics_path_for(local_output)
+        if os.path.exists(local_metrics):
+            metrics_key = f"{final_prefix}{os.path.basename(local_metrics)}"
+            s3.upload_file(local_metrics, bucket, metrics_key)
+            uploaded.append(f"s3://{bucket}/{metrics_key}")
+
+        # 6) CPU / memory profile (BRIEFLY_PROFILE)
+        for path in prof.paths:
+            profile_key = f"{final_prefix}{os.path.basename(path)}"
+            s3.upload_file(path, bucket, profile_key)
+            uploaded.append(f"s3://{bucket}/{profile_key}")
 
         return {
             "statusCode": 200,
-            "body": f"Uploaded {output_name} to s3://{bucket}/{output_key}",
+            "body": "Uploaded: " + ", ".join(uploaded),
         }
 
     except Exception as e:
@@ -0,0 +1,310 @@
+"""
+Local stand-in for DeepSeek's /v1/chat/completions (OpenAI schema).
+
+Answers our three prompt types with deterministic JSON, so the filter and
+content stages can be benchmarked / soak-tested without spending tokens:
+
+- ranking   (filter pipeline)   -> {"selected_articles": [{id, final_rank, sector, section}]}
+- analyzer  (Filtration)        -> {"selected_articles": [{id, education_score, rank}]}
+- rewrite   (one article)       -> {"title", "description"}
+- batch rewrite                 -> [{id, title, description}, ...]
+
+Faults (all optional, drawn from a seeded RNG): extra latency, 429 with
+Retry-After, 5xx, truncated replies and ```json fenced replies.
+
+Run it and point the pipeline at it:
+    python -m backend.unipro_pipeline.deepseek_stub --port 8808 --rate-429 0.1 --latency-ms 300
+    DEEPSEEK_API_URL=http://127.0.0.1:8808/v1/chat/completions python -m backend.unipro_pipeline.educational_filter_pipeline
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .prompt_budget import estimate_tokens
+
+SECTORS = [
+    "Markets", "Economy", "Technology", "Finance", "Crypto", "Energy",
+    "Politics", "Sustainability", "Business", "Health", "Transport", "Industrials",
+]
+SECTIONS = {
+    "Markets": "Banking & Markets",
+    "Economy": "Economy & Policy",
+    "Technology": "AI & Software",
+    "Finance": "Banking & Markets",
+    "Crypto": "Crypto & Regulation",
+    "Energy": "Energy & Climate",
+    "Politics": "Economy & Policy",
+    "Sustainability": "Energy & Climate",
+    "Business": "Companies & Deals",
+    "Health": "Healthcare & Pharma",
+    "Transport": "Transport & Logistics",
+    "Industrials": "Industrial & Supply Chain",
+}
+
+
+class StubConfig:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_429: float = 0.0,
+        rate_5xx: float = 0.0,
+        rate_truncate: float = 0.0,
+        rate_fence: float = 0.0,
+        retry_after: Optional[float] = 1.0,
+        max_picks: int = 12,
+        seed: int = 7,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rate_truncate = rate_truncate
+        self.rate_fence = rate_fence
+        self.retry_after = retry_after
+        self.max_picks = max_picks
+        self.seed = seed
+
+
+# --------------------------------------------------
+# Deterministic answers
+# --------------------------------------------------
+def _table_ids(text: str) -> List[str]:
+    """ids from the first column of a "|" table whose header starts with id|."""
+    ids: List[str] = []
+    in_table = False
+    for line in text.splitlines():
+        if line.startswith("id|"):
+            in_table = True
+            continue
+        if in_table and "|" in line:
+            ids.append(line.split("|", 1)[0].strip())
+    return ids
+
+
+def _as_id(value: str) -> Any:
+    return int(value) if value.isdigit() else value
+
+
+def _rewrite(title: str, desc: str) -> Dict[str, str]:
+    title = " ".join((title or "this story").split())
+    return {
+        "title": f"What {title[:70]} means for you",
+        "description": (
+            f"{title} is the headline. "
+            f"{(desc or 'The details are still coming in.').strip()[:160]} "
+            "Here is why it matters for markets."
+        ),
+    }
+
+
+def answer(system: str, user: str, max_picks: int = 12) -> Any:
+    """The JSON value a well-behaved model would return for these messages."""
+    if "final_rank" in system:
+        ids = _table_ids(user)[:max_picks]
+        picks = []
+        for rank, aid in enumerate(ids, start=1):
+            sector = SECTORS[(rank - 1) % len(SECTORS)]
+            picks.append(
+                {"id": _as_id(aid), "final_rank": rank, "sector": sector, "section": SECTIONS[sector]}
+            )
+        return {"selected_articles": picks}
+
+    if "education_score" in system:
+        ids = _table_ids(user)[:max_picks]
+        return {
+            "total_analyzed": len(_table_ids(user)),
+            "selection_logic": "top_10_or_15",
+            "selected_articles": [
+                {"id": _as_id(aid), "education_score": max(1, 10 - i), "rank": i + 1}
+                for i, aid in enumerate(ids)
+            ],
+        }
+
+    if "JSON array" in system:
+        start = user.find("[")
+        try:
+            items = json.loads(user[start:]) if start != -1 else []
+        except ValueError:
+            items = []
+        return [
+            {"id": it.get("id"), **_rewrite(it.get("title", ""), it.get("description", ""))}
+            for it in items
+            if isinstance(it, dict)
+        ]
+
+    title = re.search(r"^Original title:\s*(.*)$", user, re.M)
+    desc = re.search(r"^Original description:\s*(.*)$", user, re.M)
+    return _rewrite(title.group(1) if title else "", desc.group(1) if desc else "")
+
+
+# --------------------------------------------------
+# Server
+# --------------------------------------------------
+class _State:
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.seen_prefixes: set = set()
+        self.requests = 0
+        self.faults: Dict[str, int] = {"429": 0, "5xx": 0, "truncated": 0, "fenced": 0}
+
+    def draw(self) -> Tuple[float, float, float, float, float]:
+        with self.lock:
+            self.requests += 1
+            return tuple(self.rng.random() for _ in range(5))  # type: ignore[return-value]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state: _State  # set by make_server
+
+    def log_message(self, fmt: str, *args: Any) -> None:  # keep test output quiet
+        pass
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        raw = json.dumps(body).encode("utf-8") if not isinstance(body, bytes) else body
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            messages = payload["messages"]
+        except (ValueError, KeyError, TypeError):
+            self._send(400, {"error": {"message": "bad request body"}})
+            return
+
+        state = self.state
+        cfg = state.config
+        r_latency, r_429, r_5xx, r_trunc, r_fence = state.draw()
+
+        delay = cfg.latency_ms + cfg.jitter_ms * r_latency
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        if r_429 < cfg.rate_429:
+            with state.lock:
+                state.faults["429"] += 1
+            headers = {"Retry-After": str(cfg.retry_after)} if cfg.retry_after is not None else {}
+            self._send(429, {"error": {"message": "rate limited (stub)"}}, headers)
+            return
+        if r_5xx < cfg.rate_5xx:
+            with state.lock:
+                state.faults["5xx"] += 1
+            self._send(503, {"error": {"message": "overloaded (stub)"}})
+            return
+
+        system = "\n".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        user = "\n".join(m.get("content", "") for m in messages if m.get("role") != "system")
+        content = json.dumps(answer(system, user, cfg.max_picks), ensure_ascii=False)
+        finish_reason = "stop"
+
+        if r_trunc < cfg.rate_truncate:
+            content = content[: max(1, int(len(content) * 0.6))]
+            finish_reason = "length"
+            with state.lock:
+                state.faults["truncated"] += 1
+        if r_fence < cfg.rate_fence:
+            content = f"```json\n{content}\n```"
+            with state.lock:
+                state.faults["fenced"] += 1
+
+        # mimic DeepSeek's prefix cache: a repeated system prompt is a hit
+        prompt_tokens = estimate_tokens(system) + estimate_tokens(user)
+        with state.lock:
+            hit = estimate_tokens(system) if system in state.seen_prefixes else 0
+            state.seen_prefixes.add(system)
+
+        self._send(200, {
+            "id": f"stub-{state.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "deepseek-chat"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": estimate_tokens(content),
+                "total_tokens": prompt_tokens + estimate_tokens(content),
+                "prompt_cache_hit_tokens": hit,
+                "prompt_cache_miss_tokens": prompt_tokens - hit,
+            },
+        })
+
+
+def make_server(
+    host: str = "127.0.0.1", port: int = 0, config: Optional[StubConfig] = None
+) -> ThreadingHTTPServer:
+    handler = type("BoundStubHandler", (StubHandler,), {"state": _State(config or StubConfig())})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_in_thread(config: Optional[StubConfig] = None) -> Tuple[ThreadingHTTPServer, str]:
+    """Start on a free port; returns (server, chat completions URL). Call server.shutdown()."""
+    server = make_server(config=config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/v1/chat/completions"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local DeepSeek stand-in for load / fault tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-truncate", type=float, default=0.0)
+    parser.add_argument("--rate-fence", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--max-picks", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_truncate=args.rate_truncate,
+        rate_fence=args.rate_fence,
+        retry_after=args.retry_after,
+        max_picks=args.max_picks,
+        seed=args.seed,
+    )
+    server = make_server(args.host, args.port, config)
+    print(f"[STUB] DeepSeek stand-in on http://{args.host}:{args.port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[STUB] {server.RequestHandlerClass.state.requests} requests, "
+              f"faults: {server.RequestHandlerClass.state.faults}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
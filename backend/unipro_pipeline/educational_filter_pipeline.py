@@ -14,70 +14,48 @@ Workflow:
 """
 
 import json
+import math
 import os
-from datetime import datetime
-from typing import List, Dict, Any, Optional
-
-import requests
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if not __package__:  # run as a script / top-level Lambda module rather than `python -m`
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    __package__ = "backend.unipro_pipeline"
+
+from ..Filtration.classification_memo import ClassificationMemo, default_memo
+from ..Filtration.rule_set import CompiledRuleSet, get_rule_set
+from ..Filtration.rule_telemetry import RuleTelemetry, summary_path_for, telemetry_enabled
+from ..Filtration.topk import label_score_key, top_k
+from .checkpoint import StageCheckpoint, hash_file, manifest_path_for, s3_restore
+from .llm_cache import LLMResponseCache, cache_key, default_llm_cache
+from .llm_client import LLMCallError, LLMClient, default_deepseek_url
+from .llm_json import parse_items
+from .llm_metrics import metrics_path_for
+from .llm_usage import PromptCacheStats
+from .speculative import SpeculativeRewriter, speculative_filename
+from .tracing import TracedS3, carry, span
+from .pre_ranker import PreRanker, load_default_pre_ranker
+from .profiling import StageProfile
+from .run_date import RunDate, resolve_run_date, stamp_for, utc_timestamp
+from .prompt_budget import compact_table, fit_to_budget, indented_json, savings_report
 
 
 # --------------------------------------------------------
 # BASIC MANUAL FILTER 
 # --------------------------------------------------------
 class BasicArticleFilter:
-    def __init__(self) -> None:
-        # 1) Filter OUT non-US content
-        self.non_us_keywords = [
-            "china", "india", "russia", "uk", "england", "europe", "africa",
-            "asia", "middle east", "mexico", "canada", "brazil", "australia",
-            "japan", "south america", "international", "global",
-        ]
-
-        # 2) Filter OUT political content
-        self.political_keywords = [
-            "election", "vote", "ballot", "president", "senator", "governor",
-            "congress", "parliament", "policy", "bill", "legislation",
-            "democrat", "republican", "campaign", "white house",
-            "supreme court", "lawmaker", "administration",
-        ]
-
-        # 3) IMPORTANT articles
-        self.important_keywords = [
-            "breaking", "urgent", "emergency", "crisis", "public safety",
-            "severe weather", "health advisory", "recall", "missing person",
-            "natural disaster", "major update",
-        ]
+    """
+    Label order + keyword lists come from backend/Filtration/rules.json.
+    """
 
-        # 4) NOT IMPORTANT articles
-        self.not_important_keywords = [
-            "celebrity", "gossip", "viral", "meme", "influencer",
-            "entertainment", "fashion", "sports rumor", "pop culture",
-        ]
+    def __init__(self, rules: Optional[CompiledRuleSet] = None) -> None:
+        self.rules = rules or get_rule_set()
 
     def classify_text(self, text: str) -> str:
-        t = (text or "").lower()
-
-        # 1) Non-US
-        for k in self.non_us_keywords:
-            if k in t:
-                return "REMOVE"
-
-        # 2) Political
-        for k in self.political_keywords:
-            if k in t:
-                return "REMOVE"
-
-        # 3) Important
-        for k in self.important_keywords:
-            if k in t:
-                return "IMPORTANT"
-
-        # 4) Not important
-        for k in self.not_important_keywords:
-            if k in t:
-                return "NOT IMPORTANT"
-
-        return "NEUTRAL"
+        return self.rules.classify(text)
 
 
 def classify_article(article: str) -> str:
@@ -90,6 +68,56 @@ def classify_article(article: str) -> str:
 # --------------------------------------------------------
 # PIPELINE
 # --------------------------------------------------------
+# Static instructions: sent as a byte-identical system message on every call
+# so DeepSeek can serve the prefix from its prompt cache. Candidates go in
+# the user message.
+RANKING_SYSTEM_PROMPT = """You are helping choose the most educational business/finance news articles
+for beginner readers.
+
+Candidates are given as a table, one article per line, columns separated by "|":
+id|base_label|educational_score|title|description
+- base_label: IMP = IMPORTANT, NEU = NEUTRAL, LOW = NOT IMPORTANT
+- educational_score: integer, rough complexity signal
+- descriptions may be shortened ("…") or, for long lists, left out
+
+You MUST:
+1) Pick the best 10–15 articles for learning.
+2) For each selected article:
+   - Assign **sector**: EXACTLY ONE of:
+     ['Markets', 'Economy', 'Technology', 'Finance', 'Crypto', 'Energy', 'Politics', 'Sustainability', 'Business', 'Health', 'Transport', 'Industrials']
+   - Assign **section**: a short newspaper-style subsection string (2–4 words),
+     for example:
+       "AI & Software"
+       "Banking & Markets"
+       "Economy & Policy"
+       "Crypto & Regulation"
+       "Energy & Climate"
+       "Healthcare & Pharma"
+       "Industrial & Supply Chain"
+       "Transport & Logistics"
+
+DIVERSITY RULE:
+- The final selection MUST include articles from **at least 4 different sectors**
+  if the content allows. Avoid concentrating everything in a single sector.
+
+RETURN JSON ONLY in EXACTLY this shape (no explanations, no markdown, no extra keys):
+
+{
+  "selected_articles": [
+    {"id": 1, "final_rank": 1, "sector": "Technology", "section": "AI & Software"},
+    {"id": 5, "final_rank": 2, "sector": "Finance", "section": "Banking & Markets"}
+  ]
+}
+"""
+
+
+def _as_rank(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 9999
+
+
 class EducationalFilterPipeline:
     """
     - Manual keyword filtering (BasicArticleFilter)
@@ -97,7 +125,19 @@ class EducationalFilterPipeline:
     - DeepSeek: final ranking + sector + section
     """
 
-    def __init__(self, deepseek_api_key: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        deepseek_api_key: Optional[str] = None,
+        memo: Optional[ClassificationMemo] = None,
+        pre_ranker: Optional[PreRanker] = None,
+        telemetry: Optional[RuleTelemetry] = None,
+        llm_cache: Optional[LLMResponseCache] = None,
+        llm_client: Optional[LLMClient] = None,
+        deepseek_url: Optional[str] = None,
+        rank_mode: Optional[str] = None,
+        speculative: Optional[bool] = None,
+        run_date: RunDate = None,
+    ) -> None:
         # Use env var if present, else your provided key
         self.deepseek_api_key: str = (
             deepseek_api_key
@@ -107,25 +147,83 @@ class EducationalFilterPipeline:
         if not self.deepseek_api_key:
             raise ValueError("DeepSeek API key is not set")
 
-        self.deepseek_url = "https://api.deepseek.com/v1/chat/completions"
+        self.deepseek_url = deepseek_url or default_deepseek_url()
+        # the day this run is for (BRIEFLY_RUN_DATE / today); stamps every file
+        self.run_date = resolve_run_date(run_date)
+        self.stamp = stamp_for(self.run_date)
+        # parsed DeepSeek results keyed by prompt hash (reruns are free)
+        self.llm_cache = llm_cache if llm_cache is not None else default_llm_cache()
+        # retries with backoff instead of losing the run to one bad response
+        self.llm_client = llm_client or LLMClient(
+            self.deepseek_api_key, self.deepseek_url, request_timeout=60
+        )
         self.base_filter = BasicArticleFilter()
+        self.prompt_token_budget = int(os.environ.get("DEEPSEEK_PROMPT_TOKEN_BUDGET", "6000"))
+        self.prompt_stats: Dict[str, Any] = {}
+        self.prompt_cache_stats = PromptCacheStats()
+        # label + score per normalized text, reused across runs
+        self.memo = memo if memo is not None else default_memo()
+
+        # optional local model (BRIEFLY_PRERANKER_MODEL): re-orders a wider
+        # keyword-ranked pool so fewer, better candidates go to DeepSeek
+        self.pre_ranker = pre_ranker if pre_ranker is not None else load_default_pre_ranker()
+        self.prerank_pool = int(os.environ.get("BRIEFLY_PRERANK_POOL", "90"))
+        self.prerank_keep = int(os.environ.get("BRIEFLY_PRERANK_KEEP", "20"))
+
+        # "single": one ranking call over the top 30 candidates.
+        # "sharded": up to DEEPSEEK_MAX_CANDIDATES candidates, ranked in
+        # parallel shards, then a final round over the shard winners.
+        self.rank_mode = (rank_mode or os.environ.get("DEEPSEEK_RANK_MODE", "single")).lower()
+        self.shard_size = int(os.environ.get("DEEPSEEK_SHARD_SIZE", "30"))
+        self.shard_keep = int(os.environ.get("DEEPSEEK_SHARD_KEEP", "8"))
+        self.rank_workers = int(os.environ.get("DEEPSEEK_RANK_WORKERS", "8"))
+        self.max_candidates = int(os.environ.get(
+            "DEEPSEEK_MAX_CANDIDATES", "200" if self.rank_mode == "sharded" else "30"
+        ))
+
+        # start rewriting the local top candidates while the ranking call
+        # is in flight (BRIEFLY_SPECULATIVE_REWRITE=1, see speculative.py)
+        if speculative is None:
+            speculative = (os.environ.get("BRIEFLY_SPECULATIVE_REWRITE") or "").lower() in (
+                "1", "on", "true",
+            )
+        self.speculative = speculative
+        self.speculative_count = int(os.environ.get("BRIEFLY_SPECULATIVE_COUNT", "12"))
+        self.speculative_grace = float(os.environ.get("BRIEFLY_SPECULATIVE_GRACE", "30"))
+        self.speculator: Optional[SpeculativeRewriter] = None
+        self.speculative_kept: Dict[str, Dict[str, str]] = {}
+
+        # called with the manifest path after every checkpoint write (the
+        # Lambda handler uploads it, see checkpoint.py)
+        self.checkpoint_sync: Optional[Callable[[str], None]] = None
+
+        # rule hit-rate / stage timing (BRIEFLY_RULE_TELEMETRY=1)
+        if telemetry is None and telemetry_enabled():
+            telemetry = RuleTelemetry(self.base_filter.rules)
+        self.telemetry = telemetry
+
+    @contextmanager
+    def _stage(self, name: str, **attrs: Any) -> Iterator[Any]:
+        # a trace span, plus rule telemetry timing when that is on
+        with span(name, **attrs) as sp:
+            with self.telemetry.stage(name) if self.telemetry else nullcontext():
+                yield sp
 
     # ---------- file helpers ----------
 
-    @staticmethod
-    def _today_raw_filename() -> str:
-        stamp = datetime.today().strftime("%m%d%Y")
-        return f"RAW_NEWS_{stamp}.json"
+    # all stamped with the run date (MMDDYYYY), not the wall clock
 
-    @staticmethod
-    def _today_filters_filename() -> str:
-        stamp = datetime.today().strftime("%m%d%Y")
-        return f"FILTERSFORDEEPSEEK_{stamp}.json"
+    def _raw_filename(self) -> str:
+        return f"RAW_NEWS_{self.stamp}.json"
 
-    @staticmethod
-    def _today_final_filename() -> str:
-        stamp = datetime.today().strftime("%m%d%Y")
-        return f"DEEPSEEKLISTFOR{stamp}.json"
+    def _filters_filename(self) -> str:
+        return f"FILTERSFORDEEPSEEK_{self.stamp}.json"
+
+    def _final_filename(self) -> str:
+        return f"DEEPSEEKLISTFOR{self.stamp}.json"
+
+    def _speculative_filename(self) -> str:
+        return speculative_filename(self.stamp)
 
     # ---------- basic text / scoring ----------
 
@@ -157,18 +255,7 @@ class EducationalFilterPipeline:
         if len(words) > 80:
             score += 1
 
-        triggers = {
-            "why": 2,
-            "how": 2,
-            "explained": 3,
-            "analysis": 2,
-            "impact": 3,
-            "implications": 3,
-            "consequences": 3,
-            "crisis": 4,
-            "geopolitical": 4,
-            "supply chain": 3,
-        }
+        triggers = get_rule_set().candidate_triggers
         for kw, pts in triggers.items():
             if kw in text:
                 score += pts
@@ -178,19 +265,55 @@ class EducationalFilterPipeline:
     # ---------- load + candidate selection ----------
 
     def load_raw_articles(self, path: str) -> List[Dict[str, Any]]:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        if isinstance(data, dict) and "articles" in data:
-            articles = data["articles"]
-        elif isinstance(data, list):
-            articles = data
-        else:
-            articles = []
+        with span("json_read", path=path, bytes=os.path.getsize(path)) as sp:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            if isinstance(data, dict) and "articles" in data:
+                articles = data["articles"]
+            elif isinstance(data, list):
+                articles = data
+            else:
+                articles = []
+            sp.set(items=len(articles))
 
         print(f"[IO] Loaded {len(articles)} raw articles from {path}")
         return articles
 
+    def _annotate_candidates(
+        self, articles: Iterable[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        for art in articles:
+            text = self._normalize_text(art)
+            if self.telemetry:
+                self.telemetry.observe_classify(text)
+
+            cached = self.memo.get("candidate", text)
+            if cached is None:
+                base_label = self.base_filter.classify_text(text)
+                score = (
+                    0 if base_label == "REMOVE"
+                    else self._simple_educational_score(text)
+                )
+                self.memo.put(
+                    "candidate", text,
+                    {"base_label": base_label, "educational_score": score},
+                )
+            else:
+                base_label = cached["base_label"]
+                score = cached["educational_score"]
+
+            if base_label == "REMOVE":
+                continue
+
+            yield {
+                "id": art.get("id"),
+                "title": art.get("title"),
+                "description": art.get("description"),
+                "base_label": base_label,
+                "educational_score": score,
+            }
+
     def build_candidates(
         self,
         articles: List[Dict[str, Any]],
@@ -199,37 +322,30 @@ class EducationalFilterPipeline:
         """
         Apply manual filter + simple scoring, return top `max_candidates`.
         """
-        annotated: List[Dict[str, Any]] = []
-
-        for art in articles:
-            text = self._normalize_text(art)
-            base_label = self.base_filter.classify_text(text)
-
-            if base_label == "REMOVE":
-                continue
-
-            score = self._simple_educational_score(text)
-
-            annotated.append(
-                {
-                    "id": art.get("id"),
-                    "title": art.get("title"),
-                    "description": art.get("description"),
-                    "base_label": base_label,
-                    "educational_score": score,
-                }
+        pool_size = max_candidates
+        if self.pre_ranker:
+            pool_size = max(max_candidates, self.prerank_pool)
+
+        # rank: IMPORTANT first, then score (streamed, only top N kept)
+        with self._stage("classify_and_score", items_in=len(articles)) as sp:
+            top = top_k(
+                self._annotate_candidates(articles),
+                pool_size,
+                key=label_score_key,
             )
-
-        # rank: IMPORTANT first, then score
-        label_priority = {"IMPORTANT": 0, "NEUTRAL": 1, "NOT IMPORTANT": 2}
-        annotated.sort(
-            key=lambda a: (
-                label_priority.get(a.get("base_label", "NEUTRAL"), 3),
-                -a.get("educational_score", 0),
-            )
-        )
-
-        top = annotated[:max_candidates]
+            self.memo.flush()
+            sp.set(items_out=len(top), memo=dict(self.memo.stats))
+
+        if self.pre_ranker:
+            # the keep cut is for the single ranking prompt; the sharded
+            # tournament wants its whole max_candidates pool, just re-ordered
+            keep = max_candidates
+            if self.rank_mode != "sharded":
+                keep = min(max_candidates, self.prerank_keep)
+            with self._stage("prerank", items_in=len(top)) as sp:
+                top = self.pre_ranker.rank(top)[:keep]
+                sp.set(items_out=len(top))
+            print(f"[PRERANK] Kept {len(top)} of a {pool_size}-article pool")
 
         summary = {
             "total_articles": len(articles),
@@ -241,132 +357,237 @@ class EducationalFilterPipeline:
             f"[FILTER] Candidates for DeepSeek: {summary['selected_count']} "
             f"out of {summary['total_articles']}"
         )
+        print(f"[MEMO] {self.memo.stats}")
         return summary
 
     def save_filters_for_deepseek(self, summary: Dict[str, Any]) -> str:
-        filename = self._today_filters_filename()
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+        filename = self._filters_filename()
+        with span("json_write", path=filename, items=len(summary.get("articles", []))) as sp:
+            with open(filename, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+            sp.set(bytes=os.path.getsize(filename))
         print(f"[IO] Saved DeepSeek prep file -> {filename}")
+        if self.telemetry:
+            self.telemetry.write(summary_path_for(filename))
         return filename
 
     # ---------- DeepSeek prompt + call ----------
 
+    CANDIDATE_FIELDS = ["id", "base_label", "educational_score", "title", "description"]
+
+    def _render_candidates(
+        self, candidates: List[Dict[str, Any]], desc_limit: Optional[int]
+    ) -> str:
+        table = compact_table(
+            candidates,
+            self.CANDIDATE_FIELDS,
+            limits={"description": desc_limit} if desc_limit is not None else None,
+        )
+        return "Here are the candidate articles:\n\n" + table + "\n"
+
+    def _fit_prompt(
+        self, candidates: List[Dict[str, Any]], label: str = "ranking"
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        User message: compact candidate table, trimmed so system + user stay
+        within `prompt_token_budget` (shorter descriptions first, then fewer
+        tail candidates). Returns (prompt, prompt stats).
+        """
+        kept, desc_limit, _ = fit_to_budget(
+            candidates,
+            lambda items, limit: RANKING_SYSTEM_PROMPT + self._render_candidates(items, limit),
+            self.prompt_token_budget,
+        )
+        if len(kept) < len(candidates):
+            print(
+                f"[PROMPT] {label}: token budget {self.prompt_token_budget}, "
+                f"sending {len(kept)} of {len(candidates)} candidates"
+            )
+        prompt = self._render_candidates(kept, desc_limit)
+
+        json_prompt = RANKING_SYSTEM_PROMPT + indented_json(candidates)
+        stats = {
+            **savings_report(json_prompt, RANKING_SYSTEM_PROMPT + prompt),
+            "token_budget": self.prompt_token_budget,
+            "candidates_in": len(candidates),
+            "candidates_sent": len(kept),
+            "description_chars": desc_limit,
+        }
+        print(
+            f"[PROMPT] {label}: ~{stats['compact_tokens']} tokens "
+            f"(~{stats['json_tokens']} as indented JSON, -{stats['saved_pct']}%)"
+        )
+        return prompt, stats
+
     def _build_deepseek_prompt(self, summary: Dict[str, Any]) -> str:
-        candidates = summary.get("articles", [])
+        prompt, self.prompt_stats = self._fit_prompt(summary.get("articles", []))
+        return prompt
 
-        allowed_sectors = [
-            "Markets", "Economy", "Technology", "Finance",
-            "Crypto", "Energy", "Politics", "Sustainability",
-            "Business", "Health", "Transport", "Industrials",
-        ]
+    def _rank_candidates(
+        self, candidates: List[Dict[str, Any]], label: str = "ranking"
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        One DeepSeek ranking call over `candidates`.
+        Returns (selected_articles, prompt stats); [] on any failure.
+        """
+        prompt, stats = self._fit_prompt(candidates, label)
+        payload = {
+            "model": "deepseek-chat",
+            "messages": [
+                {"role": "system", "content": RANKING_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.3,
+            "max_tokens": 1500,
+        }
 
-        return f"""
-You are helping choose the most educational business/finance news articles
-for beginner readers.
+        key = cache_key(
+            payload["model"], payload["temperature"], payload["max_tokens"], payload["messages"]
+        )
+        cached = self.llm_cache.get(key)
+        if cached is not None:
+            print(f"[DeepSeek] {label}: cache hit, reusing {len(cached)} selected articles.")
+            return cached, stats
 
-Each candidate article has:
-- id
-- title
-- description
-- base_label  ("IMPORTANT", "NEUTRAL", "NOT IMPORTANT")
-- educational_score  (integer, rough complexity signal)
+        print(f"[DeepSeek] {label}: sending request to DeepSeek API...")
+        try:
+            result = self.llm_client.chat(
+                payload, f"[DeepSeek] {label}", stage=self._metrics_stage(label)
+            )
+            content = result["choices"][0]["message"]["content"].strip()
+        except LLMCallError as e:
+            print(f"[DeepSeek] {label}: request failed: {e}")
+            return [], stats
+        except Exception as e:
+            print(f"[DeepSeek] {label}: error reading response JSON: {e}")
+            return [], stats
 
-You MUST:
-1) Pick the best 10–15 articles for learning.
-2) For each selected article:
-   - Assign **sector**: EXACTLY ONE of:
-     {allowed_sectors}
-   - Assign **section**: a short newspaper-style subsection string (2–4 words),
-     for example:
-       "AI & Software"
-       "Banking & Markets"
-       "Economy & Policy"
-       "Crypto & Regulation"
-       "Energy & Climate"
-       "Healthcare & Pharma"
-       "Industrial & Supply Chain"
-       "Transport & Logistics"
+        self.prompt_cache_stats.record(result.get("usage"))
 
-DIVERSITY RULE:
-- The final selection MUST include articles from **at least 4 different sectors**
-  if the content allows. Avoid concentrating everything in a single sector.
+        # fences / chatter / a reply cut off mid-list: keep every complete pick
+        parsed = parse_items(content, list_key="selected_articles")
+        selected = parsed.items
+        if not selected:
+            print(f"[DeepSeek] {label}: could not parse JSON.")
+            print("[DeepSeek] Raw content was:")
+            print(content)
+            return [], stats
+        if not parsed.complete:
+            print(f"[DeepSeek] {label}: reply was not clean JSON, recovered {len(selected)} picks.")
 
-RETURN JSON ONLY in EXACTLY this shape (no explanations, no markdown, no extra keys):
+        print(f"[DeepSeek] {label}: selected {len(selected)} articles.")
+        if parsed.complete:
+            self.llm_cache.set(key, selected)
+        return selected, stats
 
-{{
-  "selected_articles": [
-    {{"id": 1, "final_rank": 1, "sector": "Technology", "section": "AI & Software"}},
-    {{"id": 5, "final_rank": 2, "sector": "Finance", "section": "Banking & Markets"}}
-  ]
-}}
+    @staticmethod
+    def _metrics_stage(label: str) -> str:
+        if label.startswith("shard"):
+            return "ranking_shard"
+        if label == "final round":
+            return "ranking_final"
+        return "ranking"
 
-Here are the candidate articles:
+    # ---------- sharded ("tournament") ranking ----------
 
-{json.dumps(candidates, indent=2)}
-"""
+    def _make_shards(self, candidates: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Deal candidates round-robin into ceil(n / shard_size) shards, so every
+        shard gets a mix of high and low keyword ranks.
+        """
+        n = max(1, math.ceil(len(candidates) / self.shard_size))
+        return [candidates[i::n] for i in range(n)]
+
+    def _rank_sharded(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Round 1: rank every shard in parallel, keep each shard's top
+        `shard_keep`. Round 2: rank the winners together with the same
+        prompt (so the sector diversity rule applies to the final pick).
+        If round 2 fails, the interleaved round-1 picks are used.
+        """
+        shards = self._make_shards(candidates)
+        print(
+            f"[DeepSeek] Sharded ranking: {len(candidates)} candidates "
+            f"in {len(shards)} shards"
+        )
+        by_id = {str(c.get("id")): c for c in candidates}
+
+        with ThreadPoolExecutor(max_workers=min(self.rank_workers, len(shards))) as pool:
+            futures = [
+                pool.submit(carry(self._rank_candidates), shard, f"shard {i + 1}/{len(shards)}")
+                for i, shard in enumerate(shards)
+            ]
+            rounds = [f.result() for f in futures]
+
+        winners: List[List[Dict[str, Any]]] = []
+        for picks, _ in rounds:
+            picks = [p for p in picks if str(p.get("id")) in by_id]
+            picks.sort(key=lambda p: _as_rank(p.get("final_rank")))
+            winners.append(picks[: self.shard_keep])
+
+        # shard #1 picks of every shard first, then #2s, ...
+        longest = max((len(w) for w in winners), default=0)
+        merged = [w[i] for i in range(longest) for w in winners if i < len(w)]
+        if not merged:
+            self.prompt_stats = {"mode": "sharded", "shards": [s for _, s in rounds]}
+            return []
+
+        finalists = [by_id[str(p.get("id"))] for p in merged]
+        final, final_stats = self._rank_candidates(finalists, "final round")
+        self.prompt_stats = {
+            "mode": "sharded",
+            "shards": [s for _, s in rounds],
+            "final": final_stats,
+        }
+        if final:
+            return final
+
+        print("[DeepSeek] Final round failed, using interleaved shard winners.")
+        return [
+            {**p, "final_rank": i + 1} for i, p in enumerate(merged[:15])
+        ]
 
     def call_deepseek(self, filters_file: str) -> List[Dict[str, Any]]:
         with open(filters_file, "r", encoding="utf-8") as f:
             prep = json.load(f)
+        return self.rank_summary(prep)
 
-        candidates = prep.get("articles", [])
+    def rank_summary(self, summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """DeepSeek ranking of build_candidates() output, no file needed."""
+        candidates = summary.get("articles", [])
         if not candidates:
             print("[DeepSeek] No candidates to rank.")
             return []
 
-        prompt = self._build_deepseek_prompt(prep)
-
-        headers = {
-            "Authorization": f"Bearer {self.deepseek_api_key}",
-            "Content-Type": "application/json",
-        }
-        payload = {
-            "model": "deepseek-chat",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3,
-            "max_tokens": 1500,
-        }
+        if self.rank_mode == "sharded" and len(candidates) > self.shard_size:
+            return self._rank_sharded(candidates)
 
-        print("[DeepSeek] Sending request to DeepSeek API...")
-        try:
-            r = requests.post(
-                self.deepseek_url, headers=headers, json=payload, timeout=60
-            )
-        except Exception as e:
-            print(f"[DeepSeek] Request failed: {e}")
-            return []
-
-        if r.status_code != 200:
-            print(f"[DeepSeek] HTTP {r.status_code}: {r.text}")
-            return []
-
-        try:
-            result = r.json()
-            content = result["choices"][0]["message"]["content"].strip()
-        except Exception as e:
-            print(f"[DeepSeek] Error reading response JSON: {e}")
-            return []
+        selected, self.prompt_stats = self._rank_candidates(candidates)
+        return selected
 
-        # handle optional ```json fences
-        if content.startswith("```"):
-            # remove ```json ... ``` wrapper
-            start = content.find("{")
-            end = content.rfind("}")
-            if start != -1 and end != -1:
-                content = content[start : end + 1]
+    # ---------- speculative rewrites ----------
 
-        try:
-            parsed = json.loads(content)
-        except json.JSONDecodeError as e:
-            print(f"[DeepSeek] Could not parse JSON: {e}")
-            print("[DeepSeek] Raw content was:")
-            print(content)
-            return []
+    def _start_speculation(
+        self, summary: Dict[str, Any], raw_articles: List[Dict[str, Any]]
+    ) -> SpeculativeRewriter:
+        # imported here so the plain filter run doesn't load the generator
+        from .daily_content_generator import DailyContentGenerator
 
-        selected = parsed.get("selected_articles", [])
-        print(f"[DeepSeek] Selected {len(selected)} articles.")
-        return selected
+        generator = DailyContentGenerator(
+            deepseek_api_key=self.deepseek_api_key,
+            llm_cache=self.llm_cache,
+            llm_client=self.llm_client,  # calls land in this stage's metrics
+            local_strategy="none",
+            run_date=self.run_date,
+        )
+        raw_by_id = {a.get("id"): a for a in raw_articles}
+        top = [
+            raw_by_id.get(c.get("id"), c)
+            for c in summary.get("articles", [])[: self.speculative_count]
+        ]
+        speculator = SpeculativeRewriter(generator)
+        speculator.start(top)
+        return speculator
 
     # ---------- final output ----------
 
@@ -379,6 +600,23 @@ Here are the candidate articles:
             print("[FINAL] No DeepSeek results to save.")
             return ""
 
+        output = self.build_final_output(deepseek_results, original_articles)
+        filename = self._final_filename()
+        with span("json_write", path=filename, items=len(output["articles"])) as sp:
+            with open(filename, "w", encoding="utf-8") as f:
+                json.dump(output, f, indent=2, ensure_ascii=False)
+            sp.set(bytes=os.path.getsize(filename))
+
+        print(f"[FINAL] Saved final article list -> {filename}")
+        print(f"[FINAL] Final articles: {len(output['articles'])}")
+        return filename
+
+    def build_final_output(
+        self,
+        deepseek_results: List[Dict[str, Any]],
+        original_articles: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """The DEEPSEEKLISTFOR… payload: picked raw articles + sector / rank."""
         # build mapping from id -> {sector, section, rank}
         id_to_meta: Dict[int, Dict[str, Any]] = {}
         for item in deepseek_results:
@@ -416,32 +654,75 @@ Here are the candidate articles:
             key=lambda x: x.get("educational_ranking", {}).get("rank", 9999)
         )
 
-        filename = self._today_final_filename()
-        output = {
+        return {
             "metadata": {
                 "version": "education_v1_deepseek_sector",
-                "generated_at": datetime.utcnow().isoformat() + "Z",
+                "generated_at": utc_timestamp(),
+                "run_date": self.run_date.isoformat(),
                 "total_final_articles": len(final_articles),
                 "notes": (
                     "Manual keyword filter + simple scoring; "
                     "DeepSeek assigns sector + section"
                 ),
+                "llm_cache": self.llm_cache.snapshot(),
+                "prompt_tokens": self.prompt_stats,
+                "prompt_cache": self.prompt_cache_stats.snapshot(),
             },
             "articles": final_articles,
         }
 
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+    # ---------- top-level orchestration ----------
+
+    def _checkpoint_config(self) -> Dict[str, Any]:
+        # everything that changes which articles / ranks come out
+        return {
+            "rules": self.base_filter.rules.version,
+            "pre_ranker": os.environ.get("BRIEFLY_PRERANKER_MODEL") if self.pre_ranker else None,
+            "prerank": [self.prerank_pool, self.prerank_keep],
+            "max_candidates": self.max_candidates,
+            "rank_mode": self.rank_mode,
+            "shards": [self.shard_size, self.shard_keep],
+            "prompt_token_budget": self.prompt_token_budget,
+            "model": "deepseek-chat",
+        }
 
-        print(f"[FINAL] Saved final article list -> {filename}")
-        print(f"[FINAL] Final articles: {len(final_articles)}")
-        return filename
+    def _rank_with_speculation(
+        self, summary: Dict[str, Any], raw_articles: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        self.speculator = self._start_speculation(summary, raw_articles) if self.speculative else None
+        with self._stage("deepseek", items_in=len(summary.get("articles", []))) as sp:
+            deepseek_results = self.rank_summary(summary)
+            sp.set(items_out=len(deepseek_results), mode=self.rank_mode)
+        if self.speculator is not None:
+            self.speculative_kept = self.speculator.finish(
+                [r.get("id") for r in deepseek_results], self.speculative_grace
+            )
+        return deepseek_results
 
-    # ---------- top-level orchestration ----------
+    def run_in_memory(self, raw_articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Steps 2-5 without touching disk (used by runner.py).
+        Returns {"summary": candidates, "final": DEEPSEEKLISTFOR payload or
+        None if the ranking failed}; speculative rewrites stay in
+        self.speculative_kept.
+        """
+        print(f"[INFO] Starting with {len(raw_articles)} raw articles (in memory).")
+        summary = self.build_candidates(raw_articles, max_candidates=self.max_candidates)
+        deepseek_results = self._rank_with_speculation(summary, raw_articles)
+        if not deepseek_results:
+            print("[ERROR] DeepSeek did not return a valid ranking.")
+            return {"summary": summary, "final": None}
+        final = self.build_final_output(deepseek_results, raw_articles)
+        print(f"[FINAL] Final articles: {len(final['articles'])}")
+        return {"summary": summary, "final": final}
 
     def run_complete_pipeline(self, input_path: Optional[str] = None) -> None:
+        with span("filter_stage", run_date=self.run_date.isoformat()):
+            self._run_complete_pipeline(input_path)
+
+    def _run_complete_pipeline(self, input_path: Optional[str]) -> None:
         if input_path is None:
-            input_path = self._today_raw_filename()
+            input_path = self._raw_filename()
 
         print("=" * 70)
         print("🚀 Educational Filter Pipeline (DeepSeek = sectors)")
@@ -452,6 +733,13 @@ Here are the candidate articles:
             print(f"[ERROR] Input file not found: {input_path}")
             return
 
+        ckpt = StageCheckpoint(
+            "filter", self._final_filename(), hash_file(input_path),
+            self._checkpoint_config(), on_write=self.checkpoint_sync,
+        )
+        if ckpt.is_fresh():
+            return
+
         raw_articles = self.load_raw_articles(input_path)
         if not raw_articles:
             print("[ERROR] No articles loaded, aborting.")
@@ -459,39 +747,73 @@ Here are the candidate articles:
 
         print(f"[INFO] Starting with {len(raw_articles)} raw articles.")
 
-        print("[STEP 2] Manual keyword filtering + simple scoring...")
-        summary = self.build_candidates(raw_articles, max_candidates=30)
+        filters_file = ckpt.partial.get("filters_file")
+        if filters_file and os.path.exists(filters_file):
+            print(f"[CKPT] Reusing candidates from {filters_file} (steps 2-3 done)")
+            with open(filters_file, "r", encoding="utf-8") as f:
+                summary = json.load(f)
+        else:
+            print("[STEP 2] Manual keyword filtering + simple scoring...")
+            summary = self.build_candidates(raw_articles, max_candidates=self.max_candidates)
 
-        print("[STEP 3] Saving candidates for DeepSeek...")
-        filters_file = self.save_filters_for_deepseek(summary)
+            print("[STEP 3] Saving candidates for DeepSeek...")
+            filters_file = self.save_filters_for_deepseek(summary)
+            ckpt.record("filters_file", filters_file)
 
         print("[STEP 4] Calling DeepSeek for final ranking + sectors...")
-        deepseek_results = self.call_deepseek(filters_file)
+        deepseek_results = ckpt.partial.get("ranking")
+        if deepseek_results:
+            print(f"[CKPT] Reusing DeepSeek ranking ({len(deepseek_results)} picks)")
+        else:
+            deepseek_results = self._rank_with_speculation(summary, raw_articles)
+            if deepseek_results:
+                ckpt.record("ranking", deepseek_results)
+        if self.speculator is not None and deepseek_results:
+            self.speculator.write(self._speculative_filename(), self.speculative_kept)
+        if self.telemetry:
+            # rewrite the summary so it includes the DeepSeek stage time
+            self.telemetry.write(summary_path_for(filters_file))
+        self.llm_client.meter.write(
+            metrics_path_for(self._final_filename()),
+            self.run_date.isoformat(),
+        )
         if not deepseek_results:
             print("[ERROR] DeepSeek did not return a valid ranking, aborting.")
             return
 
         print("[STEP 5] Creating final output file...")
         self.create_final_output_file(deepseek_results, raw_articles)
+        ckpt.complete()
 
         print("=" * 70)
         print("✅ Pipeline complete. Ready for content generation.")
         print("=" * 70)
 
+def main() -> None:
+    # run date: BRIEFLY_RUN_DATE or today, BRIEFLY_PROFILE=all to profile
+    pipeline = EducationalFilterPipeline()
+    with StageProfile("filter", pipeline._final_filename()):
+        pipeline.run_complete_pipeline()
+
+
+if __name__ == "__main__":
+    main()
+
+
 def lambda_handler(event, context):
     import boto3
     import os
-    from datetime import datetime
 
     try:
         bucket = os.environ.get("BUCKET_NAME", "universityprojectbucket")
         news_prefix = "NewsCollector/"
         filt_prefix = "Filteration/"
 
-        s3 = boto3.client("s3")
+        s3 = TracedS3(boto3.client("s3"))
 
-        # Use same date stamp convention as the rest of the pipeline
-        stamp = datetime.today().strftime("%m%d%Y")
+        # event {"run_date": "YYYY-MM-DD"} reprocesses a past day, default today
+        run_date = resolve_run_date((event or {}).get("run_date"))
+        stamp = stamp_for(run_date)
 
         # 1) Download RAW_NEWS_MMDDYYYY.json from S3 to /tmp
         raw_name = f"RAW_NEWS_{stamp}.json"
@@ -502,12 +824,24 @@ def lambda_handler(event, context):
 
         # 2) Run pipeline in /tmp so all new files are created there
         os.chdir("/tmp")
-        pipeline = EducationalFilterPipeline()
-        pipeline.run_complete_pipeline(input_path=local_raw_path)
+        pipeline = EducationalFilterPipeline(run_date=run_date)
+        pipeline.checkpoint_sync = lambda path: s3.upload_file(
+            path, bucket, f"{filt_prefix}{os.path.basename(path)}"
+        )
+
+        # 2b) Manifest + outputs of an earlier (maybe timed out) run today
+        final_local = os.path.join("/tmp", pipeline._final_filename())
+        s3_restore(s3, bucket, filt_prefix, [
+            final_local,
+            manifest_path_for(final_local),
+            os.path.join("/tmp", pipeline._filters_filename()),
+        ])
+        with StageProfile("filter", final_local) as prof:
+            pipeline.run_complete_pipeline(input_path=local_raw_path)
 
         # 3) Figure out output filenames (pipeline uses these naming helpers)
-        filters_name = pipeline._today_filters_filename()
-        final_name = pipeline._today_final_filename()
+        filters_name = pipeline._filters_filename()
+        final_name = pipeline._final_filename()
 
         filters_path = os.path.join("/tmp", filters_name)
         final_path = os.path.join("/tmp", final_name)
@@ -521,6 +855,33 @@ def lambda_handler(event, context):
 
         uploaded = [f"s3://{bucket}/{filters_key}"]
 
+        # 4b) Rule telemetry summary, if instrumentation was on
+        telemetry_path = summary_path_for(filters_path)
+        if os.path.exists(telemetry_path):
+            telemetry_key = f"{filt_prefix}{os.path.basename(telemetry_path)}"
+            s3.upload_file(telemetry_path, bucket, telemetry_key)
+            uploaded.append(f"s3://{bucket}/{telemetry_key}")
+
+        # 4c) LLM token / cost / latency metrics
+        metrics_path = metrics_path_for(final_path)
+        if os.path.exists(metrics_path):
+            metrics_key = f"{filt_prefix}{os.path.basename(metrics_path)}"
+            s3.upload_file(metrics_path, bucket, metrics_key)
+            uploaded.append(f"s3://{bucket}/{metrics_key}")
+
+        # 4d) CPU / memory profile (BRIEFLY_PROFILE)
+        for path in prof.paths:
+            profile_key = f"{filt_prefix}{os.path.basename(path)}"
+            s3.upload_file(path, bucket, profile_key)
+            uploaded.append(f"s3://{bucket}/{profile_key}")
+
+        # 4e) Speculative rewrites (BRIEFLY_SPECULATIVE_REWRITE=1)
+        spec_path = os.path.join("/tmp", pipeline._speculative_filename())
+        if os.path.exists(spec_path):
+            spec_key = f"{filt_prefix}{os.path.basename(spec_path)}"
+            s3.upload_file(spec_path, bucket, spec_key)
+            uploaded.append(f"s3://{bucket}/{spec_key}")
+
         # 5) Upload final DeepSeek file ONLY if it was created
         if os.path.exists(final_path):
             final_key = f"{filt_prefix}{final_name}"
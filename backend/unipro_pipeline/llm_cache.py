@@ -0,0 +1,243 @@
+"""
+Content-addressed cache for parsed DeepSeek results.
+
+Key = sha256 of (model, temperature, max_tokens, prompt/messages), so a rerun
+after a partial failure gets identical prompts back for free. Only results
+that parsed successfully are stored (callers call `set` after parsing).
+
+Backends:
+- "disk": one JSON file per key under DEEPSEEK_CACHE_DIR (default: the
+  shared briefly cache dir), oldest files evicted past max_entries
+- "s3":   objects under s3://DEEPSEEK_CACHE_BUCKET/DEEPSEEK_CACHE_PREFIX,
+  for Lambdas that don't share /tmp
+- "off":  no caching
+
+Entries older than DEEPSEEK_CACHE_TTL seconds (default 7 days) are misses.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..Filtration.rule_set import default_cache_dir
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def cache_key(model: str, temperature: float, max_tokens: int, prompt: Any) -> str:
+    """`prompt` is the prompt string or the full messages list."""
+    raw = json.dumps(
+        [model, temperature, max_tokens, prompt],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCacheBackend:
+    def __init__(self, directory: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            return entry["stored_at"], entry["value"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, stored_at: float, value: Any) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[LLM-CACHE] Could not write {path}: {e}")
+            return
+
+        self._writes += 1
+        if self._writes % 50 == 1:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def evict(self) -> int:
+        """Drop the oldest files beyond max_entries. Returns how many went."""
+        files: List[Tuple[float, str]] = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        files.append((os.path.getmtime(path), path))
+                    except OSError:
+                        continue
+        extra = len(files) - self.max_entries
+        if extra <= 0:
+            return 0
+        files.sort()
+        for _, path in files[:extra]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return extra
+
+
+class S3CacheBackend:
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "LLMCache/",
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        client: Any = None,
+    ) -> None:
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self._client = client
+        self._writes = 0
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("s3")
+        return self._client
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+            entry = json.loads(obj["Body"].read().decode("utf-8"))
+            return entry["stored_at"], entry["value"]
+        except Exception:
+            return None
+
+    def set(self, key: str, stored_at: float, value: Any) -> None:
+        body = json.dumps({"stored_at": stored_at, "value": value}, ensure_ascii=False)
+        try:
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=self._key(key),
+                Body=body.encode("utf-8"),
+                ContentType="application/json",
+            )
+        except Exception as e:
+            print(f"[LLM-CACHE] Could not write s3://{self.bucket}/{self._key(key)}: {e}")
+            return
+
+        self._writes += 1
+        if self._writes % 50 == 1:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+        except Exception:
+            pass
+
+    def evict(self) -> int:
+        try:
+            objects: List[Dict[str, Any]] = []
+            paginator = self.client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+                objects += page.get("Contents", [])
+            extra = len(objects) - self.max_entries
+            if extra <= 0:
+                return 0
+            objects.sort(key=lambda o: o["LastModified"])
+            for obj in objects[:extra]:
+                self.client.delete_object(Bucket=self.bucket, Key=obj["Key"])
+            return extra
+        except Exception as e:
+            print(f"[LLM-CACHE] S3 eviction skipped: {e}")
+            return 0
+
+
+class LLMResponseCache:
+    def __init__(self, backend: Any = None, ttl: float = DEFAULT_TTL) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "backend": type(backend).__name__ if backend else "off",
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+        }
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.backend is None:
+            return None
+        entry = self.backend.get(key)
+        if entry is None:
+            self._bump("misses")
+            return None
+        stored_at, value = entry
+        if self.ttl and time.time() - stored_at > self.ttl:
+            self.backend.delete(key)
+            self._bump("expired")
+            self._bump("misses")
+            return None
+        self._bump("hits")
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.backend is None:
+            return
+        self.backend.set(key, time.time(), value)
+        self._bump("stores")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats)
+
+
+def default_llm_cache() -> LLMResponseCache:
+    """
+    Built from env: DEEPSEEK_CACHE=disk|s3|off (default disk),
+    DEEPSEEK_CACHE_DIR, DEEPSEEK_CACHE_BUCKET, DEEPSEEK_CACHE_PREFIX,
+    DEEPSEEK_CACHE_TTL, DEEPSEEK_CACHE_MAX_ENTRIES.
+    """
+    mode = (os.environ.get("DEEPSEEK_CACHE") or "disk").lower()
+    ttl = float(os.environ.get("DEEPSEEK_CACHE_TTL", DEFAULT_TTL))
+    max_entries = int(os.environ.get("DEEPSEEK_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+    if mode == "s3":
+        bucket = os.environ.get("DEEPSEEK_CACHE_BUCKET") or os.environ.get(
+            "BUCKET_NAME", "universityprojectbucket"
+        )
+        prefix = os.environ.get("DEEPSEEK_CACHE_PREFIX", "LLMCache/")
+        return LLMResponseCache(S3CacheBackend(bucket, prefix, max_entries), ttl)
+    if mode == "disk":
+        directory = os.environ.get("DEEPSEEK_CACHE_DIR") or os.path.join(
+            default_cache_dir(), "llm"
+        )
+        return LLMResponseCache(DiskCacheBackend(directory, max_entries), ttl)
+    return LLMResponseCache(None, ttl)
@@ -0,0 +1,225 @@
+"""
+Shared, retrying DeepSeek chat-completion call.
+
+One failed request used to cost the whole stage (the ranking call returned
+[] on the first non-200, the analyzer had no timeout at all). LLMClient.chat
+wraps requests.post with:
+
+- bounded attempts (DEEPSEEK_MAX_ATTEMPTS, default 4)
+- full-jitter exponential backoff: sleep uniform(0, min(cap, base * 2**n))
+  (DEEPSEEK_RETRY_BASE, default 1s; DEEPSEEK_RETRY_CAP, default 20s)
+- Retry-After honoured on 429 / 503 (seconds or an HTTP date)
+- retryable vs fatal statuses: 408/425/429/5xx and timeouts / dropped
+  connections are retried; 400/401/403/404/409/422 fail at once
+- a deadline per call (DEEPSEEK_CALL_DEADLINE, default 90s): every
+  attempt's timeout is cut to the time left, and no retry starts past it
+
+Every call (success or not) is recorded in `client.meter` (llm_metrics.LLMMeter).
+
+limit_concurrency(semaphore) caps requests in flight across every client
+in the process - across processes too when it is a multiprocessing
+semaphore (backfill.py). Only the POST holds a slot, not the backoff sleep.
+
+`requests` (~100 ms of imports) is loaded on the first real API call, so a
+stage served from the caches / a checkpoint never pays for it.
+"""
+
+import os
+import random
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .llm_metrics import LLMMeter
+from .tracing import span
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+DEFAULT_DEEPSEEK_URL = "https://api.deepseek.com/v1/chat/completions"
+
+_call_slots: Any = None
+
+
+def limit_concurrency(slots: Any) -> None:
+    """Share `slots` (a Semaphore-like, or None to lift the cap) by every LLMClient."""
+    global _call_slots
+    _call_slots = slots
+
+
+def default_deepseek_url() -> str:
+    """DEEPSEEK_API_URL (e.g. the local stub in deepseek_stub.py) or the real API."""
+    return os.environ.get("DEEPSEEK_API_URL") or DEFAULT_DEEPSEEK_URL
+
+
+class LLMCallError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None, attempts: int = 0) -> None:
+        super().__init__(message)
+        self.status = status
+        self.attempts = attempts
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, or None if absent / junk."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (now if now is not None else time.time()))
+
+
+class LLMClient:
+    def __init__(
+        self,
+        api_key: str,
+        url: str,
+        request_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        deadline: Optional[float] = None,
+        post: Optional[Callable[..., Any]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+        meter: Optional[LLMMeter] = None,
+    ) -> None:
+        self.api_key = api_key
+        self.url = url
+        self.request_timeout = float(
+            request_timeout or os.environ.get("DEEPSEEK_REQUEST_TIMEOUT", "60")
+        )
+        self.max_attempts = max(1, int(
+            max_attempts or os.environ.get("DEEPSEEK_MAX_ATTEMPTS", "4")
+        ))
+        self.base_delay = float(
+            base_delay if base_delay is not None else os.environ.get("DEEPSEEK_RETRY_BASE", "1")
+        )
+        self.max_delay = float(
+            max_delay if max_delay is not None else os.environ.get("DEEPSEEK_RETRY_CAP", "20")
+        )
+        self.deadline = float(
+            deadline if deadline is not None else os.environ.get("DEEPSEEK_CALL_DEADLINE", "90")
+        )
+        self._post = post  # None: requests.post, imported on first use
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self.meter = meter or LLMMeter()
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform(0, min(cap, base * 2**attempt)), attempt from 0."""
+        return self._rng.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def chat(
+        self,
+        payload: Dict[str, Any],
+        label: str = "",
+        deadline: Optional[float] = None,
+        stage: str = "llm",
+    ) -> Dict[str, Any]:
+        """
+        POST `payload` and return the decoded response JSON.
+        `deadline` (seconds from now) overrides the default for this call;
+        `stage` is the metrics bucket the call is recorded under.
+        Raises LLMCallError once attempts or time run out, or on a fatal status.
+        """
+        started = time.perf_counter()
+        with span("llm", stage=stage, model=payload.get("model", ""), label=label) as sp:
+            try:
+                data, attempts = self._chat(payload, label, deadline)
+            except LLMCallError as e:
+                sp.set(http_status=e.status, attempts=e.attempts)
+                self.meter.record(
+                    stage, payload.get("model", ""), e.status, e.attempts,
+                    time.perf_counter() - started,
+                )
+                raise
+            usage = data.get("usage") or {}
+            sp.set(
+                http_status=200,
+                attempts=attempts,
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+                cached_tokens=usage.get("prompt_cache_hit_tokens"),
+            )
+            self.meter.record(
+                stage, payload.get("model", ""), 200, attempts,
+                time.perf_counter() - started, data.get("usage"),
+            )
+            return data
+
+    def _chat(
+        self, payload: Dict[str, Any], label: str, deadline: Optional[float]
+    ) -> Tuple[Dict[str, Any], int]:
+        import requests
+
+        post = self._post or requests.post
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        budget = self.deadline if deadline is None else deadline
+        ends = time.monotonic() + budget
+        last_error = "deadline passed before the first attempt"
+        last_status: Optional[int] = None
+        attempts = 0  # requests actually sent
+
+        for attempt in range(self.max_attempts):
+            left = ends - time.monotonic()
+            if left <= 0:
+                break
+            attempts = attempt + 1
+
+            retry_after: Optional[float] = None
+            try:
+                with _call_slots if _call_slots is not None else nullcontext():
+                    resp = post(
+                        self.url,
+                        headers=headers,
+                        json=payload,
+                        timeout=min(self.request_timeout, left),
+                    )
+            except (requests.Timeout, requests.ConnectionError) as e:
+                last_error, last_status = f"{type(e).__name__}: {e}", None
+            except requests.RequestException as e:
+                raise LLMCallError(f"request error: {e}", attempts=attempt + 1)
+            else:
+                if resp.status_code == 200:
+                    try:
+                        return resp.json(), attempt + 1
+                    except ValueError as e:
+                        # truncated body from a proxy - worth another try
+                        last_error, last_status = f"bad JSON body: {e}", 200
+                else:
+                    last_status = resp.status_code
+                    last_error = f"HTTP {resp.status_code}: {resp.text[:200]}"
+                    if resp.status_code not in RETRYABLE_STATUSES:
+                        raise LLMCallError(last_error, last_status, attempt + 1)
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+
+            if attempt + 1 >= self.max_attempts:
+                break
+            delay = retry_after if retry_after is not None else self.backoff(attempt)
+            left = ends - time.monotonic()
+            if delay >= left:
+                print(f"[LLM] {label}: {last_error}; no time left to retry")
+                break
+            print(
+                f"[LLM] {label}: {last_error}; retry {attempt + 2}/{self.max_attempts} "
+                f"in {delay:.1f}s"
+            )
+            self._sleep(delay)
+
+        raise LLMCallError(
+            f"{label}: gave up after {attempts} attempt(s): {last_error}",
+            last_status,
+            attempts,
+        )
@@ -0,0 +1,117 @@
+"""
+Tolerant JSON extraction from LLM replies.
+
+The model sometimes wraps its answer in ```json fences, adds a sentence
+before/after it, or gets cut off by max_tokens in the middle of the last
+item. json.loads on the whole reply then throws everything away.
+
+- parse_object: one JSON object out of a reply (fences / chatter ignored)
+- parse_items:  every *complete* item of a (possibly truncated) array, plus
+  the expected ids that did not come back, so callers can re-ask for just
+  those
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*|\s*```\s*$")
+_decoder = json.JSONDecoder()
+
+
+class ParsedItems(NamedTuple):
+    items: List[Dict[str, Any]]
+    missing_ids: List[Any]
+    complete: bool  # True if the whole reply parsed as-is
+
+
+def strip_fences(text: str) -> str:
+    return _FENCE_RE.sub("", (text or "").strip())
+
+
+def parse_object(text: str) -> Optional[Dict[str, Any]]:
+    """First JSON object in `text`, or None."""
+    text = strip_fences(text)
+    try:
+        value = json.loads(text)
+        return value if isinstance(value, dict) else None
+    except ValueError:
+        pass
+    pos = text.find("{")
+    while pos != -1:
+        try:
+            value, _ = _decoder.raw_decode(text, pos)
+            if isinstance(value, dict):
+                return value
+        except ValueError:
+            pass
+        pos = text.find("{", pos + 1)
+    return None
+
+
+def _items_of(value: Any, list_key: Optional[str]) -> Optional[List[Any]]:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict) and list_key and isinstance(value.get(list_key), list):
+        return value[list_key]
+    return None
+
+
+def _recover(text: str, list_key: Optional[str], id_key: str) -> List[Dict[str, Any]]:
+    """
+    Walk every "{" and keep each object that decodes on its own. A decoded
+    wrapper (stray text after it) contributes its list; an object with an
+    id is an item; anything else (e.g. a truncated wrapper) is stepped into.
+    """
+    found: List[Dict[str, Any]] = []
+    pos = text.find("{")
+    while pos != -1:
+        try:
+            value, end = _decoder.raw_decode(text, pos)
+        except ValueError:
+            pos = text.find("{", pos + 1)
+            continue
+        items = _items_of(value, list_key)
+        if items is not None:
+            found += [i for i in items if isinstance(i, dict)]
+        elif isinstance(value, dict) and id_key in value:
+            found.append(value)
+        else:
+            pos = text.find("{", pos + 1)
+            continue
+        pos = text.find("{", end)
+    return found
+
+
+def parse_items(
+    text: str,
+    list_key: Optional[str] = None,
+    expected_ids: Optional[Iterable[Any]] = None,
+    id_key: str = "id",
+) -> ParsedItems:
+    """
+    Items from a JSON array reply (or from `list_key` of a wrapper object).
+    Ids are compared as strings; duplicates keep the first copy.
+    """
+    text = strip_fences(text)
+    complete = True
+    try:
+        items = _items_of(json.loads(text), list_key)
+        if items is None:
+            raise ValueError("no item list")
+        items = [i for i in items if isinstance(i, dict)]
+    except ValueError:
+        complete = False
+        items = _recover(text, list_key, id_key)
+
+    seen = set()
+    unique: List[Dict[str, Any]] = []
+    for item in items:
+        key = str(item.get(id_key))
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(item)
+
+    missing = [i for i in (expected_ids or []) if str(i) not in seen]
+    return ParsedItems(unique, missing, complete)
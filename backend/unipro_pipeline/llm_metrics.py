@@ -0,0 +1,200 @@
+"""
+Per-call LLM metering: tokens, cost, latency, retries, status.
+
+Every LLMClient.chat call lands in the client's LLMMeter as one record
+{stage, model, status, attempts, latency_ms, prompt/completion/cached tokens,
+cost_usd}. Each pipeline stage writes them next to its artifact as
+<artifact>.metrics.json (uploaded with it), e.g.
+DEEPSEEKLISTFOR11012025.metrics.json and DAILY_CONTENT_11012025.metrics.json.
+
+Prices are USD per 1M tokens, from env (defaults: deepseek-chat list prices):
+DEEPSEEK_PRICE_INPUT_HIT, DEEPSEEK_PRICE_INPUT_MISS, DEEPSEEK_PRICE_OUTPUT.
+
+Report latency percentiles per stage and token spend per day:
+    python -m backend.unipro_pipeline.llm_metrics ./archive
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+METRICS_SUFFIX = ".metrics.json"
+
+
+def metrics_path_for(artifact_path: str) -> str:
+    base, _ = os.path.splitext(artifact_path)
+    return base + METRICS_SUFFIX
+
+
+def prices() -> Dict[str, float]:
+    return {
+        "input_hit": float(os.environ.get("DEEPSEEK_PRICE_INPUT_HIT", "0.07")),
+        "input_miss": float(os.environ.get("DEEPSEEK_PRICE_INPUT_MISS", "0.27")),
+        "output": float(os.environ.get("DEEPSEEK_PRICE_OUTPUT", "1.10")),
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _summarize(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = [c["latency_ms"] for c in calls]
+    return {
+        "calls": len(calls),
+        "failures": sum(1 for c in calls if c["status"] != 200),
+        "retries": sum(max(0, c["attempts"] - 1) for c in calls),
+        "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+        "completion_tokens": sum(c["completion_tokens"] for c in calls),
+        "cached_tokens": sum(c["cached_tokens"] for c in calls),
+        "cost_usd": round(sum(c["cost_usd"] for c in calls), 6),
+        "latency_ms_p50": round(percentile(latencies, 50), 1),
+        "latency_ms_p95": round(percentile(latencies, 95), 1),
+        "latency_ms_max": round(max(latencies), 1) if latencies else 0.0,
+    }
+
+
+class LLMMeter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls: List[Dict[str, Any]] = []
+        self.prices = prices()
+
+    def record(
+        self,
+        stage: str,
+        model: str,
+        status: Optional[int],
+        attempts: int,
+        latency_s: float,
+        usage: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        usage = usage or {}
+        prompt = int(usage.get("prompt_tokens") or 0)
+        completion = int(usage.get("completion_tokens") or 0)
+        cached = int(usage.get("prompt_cache_hit_tokens") or 0)
+        p = self.prices
+        cost = (
+            cached * p["input_hit"]
+            + max(0, prompt - cached) * p["input_miss"]
+            + completion * p["output"]
+        ) / 1_000_000
+        with self._lock:
+            self.calls.append({
+                "stage": stage,
+                "model": model,
+                "status": status,
+                "attempts": attempts,
+                "latency_ms": round(latency_s * 1000.0, 1),
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "cached_tokens": cached,
+                "cost_usd": round(cost, 8),
+            })
+
+    def latency_percentile(
+        self, pct: float, stages: Optional[Tuple[str, ...]] = None
+    ) -> Optional[float]:
+        """Latency (ms) percentile of successful calls so far, or None if none."""
+        with self._lock:
+            values = [
+                c["latency_ms"] for c in self.calls
+                if c["status"] == 200 and (stages is None or c["stage"] in stages)
+            ]
+        return percentile(values, pct) if values else None
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self.calls)
+        stages: Dict[str, List[Dict[str, Any]]] = {}
+        for c in calls:
+            stages.setdefault(c["stage"], []).append(c)
+        return {
+            "total": _summarize(calls),
+            "stages": {name: _summarize(cs) for name, cs in stages.items()},
+        }
+
+    def payload(self, run_date: Optional[str] = None) -> Dict[str, Any]:
+        """What write() saves: prices, summary and every call."""
+        with self._lock:
+            calls = list(self.calls)
+        return {"run_date": run_date, "prices_per_1m": self.prices, **self.summary(), "calls": calls}
+
+    def write(self, path: str, run_date: Optional[str] = None) -> str:
+        out = self.payload(run_date)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(out, f, indent=2)
+        print(f"[METRICS] {out['total']['calls']} LLM calls, "
+              f"${out['total']['cost_usd']:.4f} -> {path}")
+        return path
+
+
+# --------------------------------------------------
+# Report CLI
+# --------------------------------------------------
+def _day_of(path: str, data: Dict[str, Any]) -> str:
+    if data.get("run_date"):
+        return str(data["run_date"])
+    m = re.search(r"(\d{2})(\d{2})(\d{4})", os.path.basename(path))
+    return f"{m.group(3)}-{m.group(1)}-{m.group(2)}" if m else "unknown"
+
+
+def report(paths: List[str]) -> Dict[str, Any]:
+    files: List[str] = []
+    for p in paths:
+        if os.path.isdir(p):
+            files += glob.glob(os.path.join(p, "**", f"*{METRICS_SUFFIX}"), recursive=True)
+        else:
+            files.append(p)
+
+    by_stage: Dict[str, List[Dict[str, Any]]] = {}
+    by_day: Dict[str, List[Dict[str, Any]]] = {}
+    for path in sorted(files):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        day = _day_of(path, data)
+        for c in data.get("calls", []):
+            by_stage.setdefault(c["stage"], []).append(c)
+            by_day.setdefault(day, []).append(c)
+
+    return {
+        "files": len(files),
+        "stages": {name: _summarize(cs) for name, cs in sorted(by_stage.items())},
+        "days": {day: _summarize(cs) for day, cs in sorted(by_day.items())},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="LLM latency / token spend report from *.metrics.json")
+    parser.add_argument("paths", nargs="+", help="metrics files or directories")
+    parser.add_argument("--json", dest="json_out", help="write the full report here")
+    args = parser.parse_args(argv)
+
+    rep = report(args.paths)
+    print(f"[METRICS] {rep['files']} metrics files")
+    print(f"{'stage':<16} {'calls':>6} {'fail':>5} {'retry':>6} {'p50 ms':>8} {'p95 ms':>8} {'cost $':>9}")
+    for name, s in rep["stages"].items():
+        print(f"{name:<16} {s['calls']:>6} {s['failures']:>5} {s['retries']:>6} "
+              f"{s['latency_ms_p50']:>8.0f} {s['latency_ms_p95']:>8.0f} {s['cost_usd']:>9.4f}")
+    print(f"\n{'day':<12} {'calls':>6} {'prompt':>9} {'cached':>9} {'output':>8} {'cost $':>9}")
+    for day, s in rep["days"].items():
+        print(f"{day:<12} {s['calls']:>6} {s['prompt_tokens']:>9} {s['cached_tokens']:>9} "
+              f"{s['completion_tokens']:>8} {s['cost_usd']:>9.4f}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(rep, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Per-stage accounting of DeepSeek's provider-side prompt cache.
+
+DeepSeek reports, in the `usage` block of every chat completion, how many
+prompt tokens were served from its prefix cache (prompt_cache_hit_tokens)
+and how many were not (prompt_cache_miss_tokens). Our prompts start with a
+byte-identical system message, so repeated calls should mostly hit.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+
+class PromptCacheStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cache_hit_tokens = 0
+        self.cache_miss_tokens = 0
+
+    def record(self, usage: Optional[Dict[str, Any]]) -> None:
+        if not usage:
+            return
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+            self.cache_hit_tokens += int(usage.get("prompt_cache_hit_tokens") or 0)
+            self.cache_miss_tokens += int(usage.get("prompt_cache_miss_tokens") or 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            seen = self.cache_hit_tokens + self.cache_miss_tokens
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "cache_hit_tokens": self.cache_hit_tokens,
+                "cache_miss_tokens": self.cache_miss_tokens,
+                "hit_rate": round(self.cache_hit_tokens / seen, 4) if seen else 0.0,
+            }
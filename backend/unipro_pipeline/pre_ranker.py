@@ -0,0 +1,323 @@
+"""
+Local pre-ranker trained on past DeepSeek picks.
+
+Training data is our own archive: every FILTERSFORDEEPSEEK_MMDDYYYY.json
+(the candidates we sent) paired with DEEPSEEKLISTFORMMDDYYYY.json (what
+DeepSeek picked). Candidates that DeepSeek selected are positives.
+
+Model: hashed TF-IDF features (title/description unigrams + bigrams and the
+keyword label/score) with a logistic regression trained by SGD. Everything is
+sparse dicts, so it needs no extra dependency and scores an article in tens
+of microseconds on a Lambda CPU.
+
+CLI:
+    python -m backend.unipro_pipeline.pre_ranker train --archive ./archive --model preranker.json
+    python -m backend.unipro_pipeline.pre_ranker evaluate --archive ./archive --model preranker.json
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..Filtration.rule_set import tokenize
+
+MODEL_VERSION = 1
+DEFAULT_BUCKETS = 1 << 18
+
+Features = Dict[int, float]
+
+
+# --------------------------------------------------
+# Archive loading
+# --------------------------------------------------
+def load_archive(archive_dir: str) -> List[Dict[str, Any]]:
+    """
+    Returns one entry per day that has both files:
+    {"stamp": "MMDDYYYY", "candidates": [...], "picked": {id, ...}}
+    """
+    days: List[Dict[str, Any]] = []
+    pattern = os.path.join(archive_dir, "**", "FILTERSFORDEEPSEEK_*.json")
+    for filters_path in sorted(glob.glob(pattern, recursive=True)):
+        m = re.search(r"FILTERSFORDEEPSEEK_(\d{8})\.json$", filters_path)
+        if not m:
+            continue
+        stamp = m.group(1)
+        final_path = os.path.join(os.path.dirname(filters_path), f"DEEPSEEKLISTFOR{stamp}.json")
+        if not os.path.exists(final_path):
+            continue
+
+        with open(filters_path, "r", encoding="utf-8") as f:
+            candidates = json.load(f).get("articles", [])
+        with open(final_path, "r", encoding="utf-8") as f:
+            picked = {a.get("id") for a in json.load(f).get("articles", [])}
+
+        if candidates and picked:
+            days.append({"stamp": stamp, "candidates": candidates, "picked": picked})
+
+    # MMDDYYYY does not sort by date
+    days.sort(key=lambda d: (d["stamp"][4:], d["stamp"][:4]))
+    return days
+
+
+# --------------------------------------------------
+# Model
+# --------------------------------------------------
+class PreRanker:
+    def __init__(
+        self,
+        n_buckets: int = DEFAULT_BUCKETS,
+        idf: Optional[Dict[int, float]] = None,
+        weights: Optional[Dict[int, float]] = None,
+        bias: float = 0.0,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.n_buckets = n_buckets
+        self.idf: Dict[int, float] = idf or {}
+        self.weights: Dict[int, float] = weights or {}
+        self.bias = bias
+        self.meta: Dict[str, Any] = meta or {}
+        self._default_idf = 1.0
+
+    # ---------- features ----------
+
+    def _bucket(self, feature: str) -> int:
+        return zlib.crc32(feature.encode("utf-8")) % self.n_buckets
+
+    def _raw_terms(self, article: Dict[str, Any]) -> List[str]:
+        title = tokenize(article.get("title") or "")
+        desc = tokenize(article.get("description") or "")
+        terms = [f"t:{w}" for w in title] + [f"d:{w}" for w in desc]
+        terms += [f"b:{a}_{b}" for a, b in zip(title, title[1:])]
+        terms += [f"b:{a}_{b}" for a, b in zip(desc, desc[1:])]
+        return terms
+
+    def features(self, article: Dict[str, Any]) -> Features:
+        counts: Dict[int, int] = {}
+        for term in self._raw_terms(article):
+            b = self._bucket(term)
+            counts[b] = counts.get(b, 0) + 1
+
+        feats: Features = {}
+        for b, c in counts.items():
+            feats[b] = (1.0 + math.log(c)) * self.idf.get(b, self._default_idf)
+
+        norm = math.sqrt(sum(v * v for v in feats.values())) or 1.0
+        for b in feats:
+            feats[b] /= norm
+
+        # keyword-filter signals (not IDF weighted)
+        label = article.get("base_label") or "NEUTRAL"
+        feats[self._bucket(f"label:{label}")] = 1.0
+        score = article.get("educational_score") or 0
+        feats[self._bucket("edu_score")] = min(float(score), 20.0) / 10.0
+        return feats
+
+    def fit_idf(self, articles: List[Dict[str, Any]]) -> None:
+        doc_freq: Dict[int, int] = {}
+        for art in articles:
+            for b in {self._bucket(t) for t in self._raw_terms(art)}:
+                doc_freq[b] = doc_freq.get(b, 0) + 1
+        n = len(articles)
+        self.idf = {b: math.log((1 + n) / (1 + df)) + 1.0 for b, df in doc_freq.items()}
+        self._default_idf = math.log(1 + n) + 1.0
+
+    # ---------- scoring ----------
+
+    def score(self, article: Dict[str, Any]) -> float:
+        z = self.bias
+        w = self.weights
+        for b, v in self.features(article).items():
+            z += w.get(b, 0.0) * v
+        return z
+
+    def rank(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Best first; ties keep input order."""
+        scored = [(-self.score(a), i, a) for i, a in enumerate(candidates)]
+        scored.sort(key=lambda x: (x[0], x[1]))
+        return [a for _, _, a in scored]
+
+    # ---------- training ----------
+
+    def train(
+        self,
+        days: List[Dict[str, Any]],
+        epochs: int = 15,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        seed: int = 13,
+    ) -> None:
+        all_articles = [a for d in days for a in d["candidates"]]
+        self.fit_idf(all_articles)
+
+        examples: List[Tuple[Features, int]] = []
+        for d in days:
+            for a in d["candidates"]:
+                examples.append((self.features(a), 1 if a.get("id") in d["picked"] else 0))
+        if not examples:
+            raise ValueError("No training examples found in archive")
+
+        # positives are the minority -> weight them up
+        n_pos = sum(y for _, y in examples) or 1
+        pos_weight = max(1.0, (len(examples) - n_pos) / n_pos)
+
+        rng = random.Random(seed)
+        w: Dict[int, float] = {}
+        bias = 0.0
+        for epoch in range(epochs):
+            rng.shuffle(examples)
+            lr = learning_rate / (1.0 + epoch)
+            for feats, y in examples:
+                z = bias + sum(w.get(b, 0.0) * v for b, v in feats.items())
+                p = 1.0 / (1.0 + math.exp(-max(min(z, 30.0), -30.0)))
+                g = (p - y) * (pos_weight if y else 1.0)
+                for b, v in feats.items():
+                    w[b] = w.get(b, 0.0) - lr * (g * v + l2 * w.get(b, 0.0))
+                bias -= lr * g
+
+        self.weights = {b: round(v, 6) for b, v in w.items() if abs(v) > 1e-6}
+        self.bias = bias
+        self.meta = {
+            "days": len(days),
+            "examples": len(examples),
+            "positives": n_pos,
+            "epochs": epochs,
+        }
+
+    # ---------- persistence ----------
+
+    def save(self, path: str) -> None:
+        data = {
+            "version": MODEL_VERSION,
+            "n_buckets": self.n_buckets,
+            "bias": self.bias,
+            "default_idf": self._default_idf,
+            "idf": {str(b): round(v, 4) for b, v in self.idf.items()},
+            "weights": {str(b): v for b, v in self.weights.items()},
+            "meta": self.meta,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> "PreRanker":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"Unsupported pre-ranker model version: {data.get('version')}")
+        model = cls(
+            n_buckets=data["n_buckets"],
+            idf={int(b): v for b, v in data["idf"].items()},
+            weights={int(b): v for b, v in data["weights"].items()},
+            bias=data["bias"],
+            meta=data.get("meta"),
+        )
+        model._default_idf = data.get("default_idf", 1.0)
+        return model
+
+
+def load_default_pre_ranker() -> Optional[PreRanker]:
+    """
+    Model path from BRIEFLY_PRERANKER_MODEL; None if unset or unreadable.
+    """
+    path = os.environ.get("BRIEFLY_PRERANKER_MODEL")
+    if not path:
+        return None
+    try:
+        return PreRanker.load(path)
+    except Exception as e:
+        print(f"[PRERANK] Could not load model {path}: {e}")
+        return None
+
+
+# --------------------------------------------------
+# Evaluation
+# --------------------------------------------------
+def recall_at_k(
+    days: List[Dict[str, Any]],
+    ks: List[int],
+    model: Optional[PreRanker] = None,
+) -> Dict[int, float]:
+    """
+    Mean share of DeepSeek's picks that land in the top k.
+    With model=None the archived candidate order (keyword heuristic) is used.
+    """
+    totals = {k: 0.0 for k in ks}
+    counted = 0
+    for d in days:
+        ordered = model.rank(d["candidates"]) if model else d["candidates"]
+        picked = d["picked"] & {a.get("id") for a in d["candidates"]}
+        if not picked:
+            continue
+        counted += 1
+        for k in ks:
+            hits = sum(1 for a in ordered[:k] if a.get("id") in picked)
+            totals[k] += hits / len(picked)
+    return {k: (totals[k] / counted if counted else 0.0) for k in ks}
+
+
+def evaluation_report(
+    days: List[Dict[str, Any]], model: PreRanker, ks: List[int]
+) -> Dict[str, Any]:
+    return {
+        "days": len(days),
+        "recall_at_k": {str(k): round(v, 4) for k, v in recall_at_k(days, ks, model).items()},
+        "baseline_recall_at_k": {
+            str(k): round(v, 4) for k, v in recall_at_k(days, ks).items()
+        },
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"[PRERANK] Evaluated on {report['days']} day(s)")
+    print(f"{'k':>4}  {'model':>7}  {'baseline':>8}")
+    for k, v in report["recall_at_k"].items():
+        print(f"{k:>4}  {v:>7.3f}  {report['baseline_recall_at_k'][k]:>8.3f}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Train / evaluate the local pre-ranker")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_train = sub.add_parser("train")
+    p_train.add_argument("--archive", required=True, help="dir with FILTERSFORDEEPSEEK_* + DEEPSEEKLISTFOR* files")
+    p_train.add_argument("--model", required=True, help="output model path (.json)")
+    p_train.add_argument("--holdout-days", type=int, default=0, help="keep the latest N days for evaluation")
+    p_train.add_argument("--epochs", type=int, default=15)
+    p_train.add_argument("--k", type=int, nargs="+", default=[10, 15, 20])
+
+    p_eval = sub.add_parser("evaluate")
+    p_eval.add_argument("--archive", required=True)
+    p_eval.add_argument("--model", required=True)
+    p_eval.add_argument("--k", type=int, nargs="+", default=[10, 15, 20])
+    p_eval.add_argument("--report", help="optional path to write the report JSON")
+
+    args = parser.parse_args(argv)
+    days = load_archive(args.archive)
+    if not days:
+        raise SystemExit(f"No FILTERSFORDEEPSEEK/DEEPSEEKLISTFOR pairs under {args.archive}")
+
+    if args.command == "train":
+        holdout = days[-args.holdout_days:] if args.holdout_days else []
+        train_days = days[: len(days) - len(holdout)] or days
+        model = PreRanker()
+        model.train(train_days, epochs=args.epochs)
+        model.save(args.model)
+        print(f"[PRERANK] Trained on {len(train_days)} day(s) -> {args.model}")
+        _print_report(evaluation_report(holdout or train_days, model, args.k))
+    else:
+        model = PreRanker.load(args.model)
+        report = evaluation_report(days, model, args.k)
+        _print_report(report)
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Opt-in CPU / memory profiling of a whole stage run.
+
+BRIEFLY_PROFILE turns it on for the main() / lambda_handler entry points
+of raw_news, educational_filter_pipeline, daily_content_generator and
+content_gen.service:
+
+- unset / off  nothing (no overhead)
+- cpu          cProfile
+- mem          tracemalloc (slows allocation-heavy code down noticeably)
+- all / 1      both
+
+Results go next to the stage's artifact and are uploaded with it:
+
+- <artifact>.profile.json  seconds, top functions by cumulative time,
+                           tracemalloc peak and top allocation sites
+- <artifact>.prof          raw cProfile stats, for
+                           python -m pstats DAILY_CONTENT_11012025.prof
+                           (or snakeviz)
+
+BRIEFLY_PROFILE_TOP sets how many functions / allocation sites are kept (25).
+
+cProfile only sees the thread that entered the stage; the rewrite and
+ranking pools mostly wait on HTTP (their time shows up in the "llm" spans,
+see tracing.py). tracemalloc sees every thread. The allocation sites are
+what is still alive when the stage ends, next to the peak of the run.
+
+cProfile / pstats / tracemalloc are imported only when profiling is on,
+so the handlers don't load them on every cold start.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+PROFILE_SUFFIX = ".profile.json"
+PSTATS_SUFFIX = ".prof"
+MODES = {"cpu": {"cpu"}, "mem": {"mem"}, "all": {"cpu", "mem"}, "1": {"cpu", "mem"}}
+
+
+def profile_path_for(artifact_path: str) -> str:
+    base, _ = os.path.splitext(artifact_path)
+    return base + PROFILE_SUFFIX
+
+
+def pstats_path_for(artifact_path: str) -> str:
+    base, _ = os.path.splitext(artifact_path)
+    return base + PSTATS_SUFFIX
+
+
+def profile_modes(value: Optional[str] = None) -> Set[str]:
+    value = os.environ.get("BRIEFLY_PROFILE", "") if value is None else value
+    modes: Set[str] = set()
+    for part in (value or "").lower().replace("+", ",").split(","):
+        modes |= MODES.get(part.strip(), set())
+    return modes
+
+
+class StageProfile:
+    """
+    with StageProfile("generate", gen.output_filename) as prof:
+        gen.generate_daily_content()
+    upload(prof.paths)
+
+    Writes the profile even when the stage raises (the exception still
+    propagates). `artifact_path` may be set on the object until the block ends.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        artifact_path: str,
+        modes: Optional[Set[str]] = None,
+        top: Optional[int] = None,
+    ) -> None:
+        self.stage = stage
+        self.artifact_path = artifact_path
+        self.modes = profile_modes() if modes is None else set(modes)
+        self.top = top if top is not None else int(os.environ.get("BRIEFLY_PROFILE_TOP", "25"))
+        self.paths: List[str] = []
+        self.report: Optional[Dict[str, Any]] = None
+        self._profiler: Any = None
+        self._started_tracemalloc = False
+        self._t0 = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.modes)
+
+    def __enter__(self) -> "StageProfile":
+        if "mem" in self.modes:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+        if "cpu" in self.modes:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        if not self.enabled:
+            return False
+        seconds = time.perf_counter() - self._t0
+        if self._profiler is not None:
+            self._profiler.disable()
+        try:
+            self._write(seconds, exc)
+        except Exception as e:  # never fail a run because of its profile
+            print(f"⚠️ Could not write {self.stage} profile: {e}")
+        finally:
+            if self._started_tracemalloc:
+                import tracemalloc
+
+                tracemalloc.stop()
+        return False
+
+    def _write(self, seconds: float, exc: Any) -> None:
+        report: Dict[str, Any] = {
+            "stage": self.stage,
+            "artifact": os.path.basename(self.artifact_path),
+            "modes": sorted(self.modes),
+            "seconds": round(seconds, 3),
+            "status": "error" if exc is not None else "ok",
+        }
+        if self._profiler is not None:
+            import pstats
+
+            stats = pstats.Stats(self._profiler)
+            report["cpu"] = self._cpu_report(stats)
+            path = pstats_path_for(self.artifact_path)
+            stats.dump_stats(path)
+            self.paths.append(path)
+        if "mem" in self.modes:
+            report["memory"] = self._memory_report()
+
+        path = profile_path_for(self.artifact_path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        self.paths.insert(0, path)
+        self.report = report
+
+        line = f"[PROFILE] {self.stage}: {report['seconds']}s"
+        if "cpu" in report:
+            line += f", {report['cpu']['calls']} calls"
+        if "memory" in report:
+            line += f", peak {report['memory']['peak_bytes'] / 1e6:.1f} MB"
+        print(f"{line} -> {path}")
+
+    def _cpu_report(self, stats: Any) -> Dict[str, Any]:
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                "function": f"{_short(filename)}:{line}({func})",
+                "calls": nc,
+                "self_s": round(tt, 4),
+                "cumulative_s": round(ct, 4),
+            })
+        by_cum = sorted(rows, key=lambda r: r["cumulative_s"], reverse=True)[: self.top]
+        by_self = sorted(rows, key=lambda r: r["self_s"], reverse=True)[: self.top]
+        return {
+            "calls": stats.total_calls,
+            "seconds": round(stats.total_tt, 3),
+            "top_cumulative": by_cum,
+            "top_self": by_self,
+        }
+
+    def _memory_report(self) -> Dict[str, Any]:
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ])
+        top = [
+            {
+                "where": f"{_short(st.traceback[0].filename)}:{st.traceback[0].lineno}",
+                "size_bytes": st.size,
+                "count": st.count,
+            }
+            for st in snapshot.statistics("lineno")[: self.top]
+        ]
+        return {"peak_bytes": peak, "current_bytes": current, "top_allocators": top}
+
+
+def _short(filename: str) -> str:
+    """Path from the package root (or site-packages) instead of the full one."""
+    for marker in ("site-packages" + os.sep, "backend" + os.sep):
+        i = filename.rfind(marker)
+        if i >= 0:
+            return filename[i + len(marker):] if marker.startswith("site") else filename[i:]
+    return filename
@@ -0,0 +1,122 @@
+"""
+Token-lean prompt building blocks.
+
+- estimate_tokens: local, dependency-free estimate of how many tokens a
+  string costs (roughly what BPE tokenizers do with English + JSON)
+- compact_table: candidates as a pipe-separated table with short label
+  codes and truncated text, instead of indented JSON / Python repr
+- fit_to_budget: trim a ranked candidate list so the rendered prompt
+  stays under a token budget
+- savings_report: tokens of the prompt as sent vs. the same instructions
+  with every candidate as indented JSON (the encoding the prompts used
+  before compact_table)
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LABEL_CODES = {"IMPORTANT": "IMP", "NEUTRAL": "NEU", "NOT IMPORTANT": "LOW"}
+
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|\s+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    ~1 token per short word, long words split every ~6 chars, digits in
+    groups of 3, every punctuation mark 1, runs of spaces/newlines ~4 chars
+    per token (indentation is not free).
+    """
+    total = 0
+    for piece in _PIECE_RE.findall(text or ""):
+        c = piece[0]
+        if c.isalpha():
+            total += 1 + (len(piece) - 1) // 6
+        elif c.isdigit():
+            total += 1 + (len(piece) - 1) // 3
+        elif c.isspace():
+            # a single space is merged into the next word
+            total += (len(piece) - 1) // 4 if c == " " else 1 + (len(piece) - 1) // 4
+        else:
+            total += 1
+    return total
+
+
+def _cell(value: Any, limit: Optional[int] = None) -> str:
+    text = " ".join(str(value if value is not None else "").split())
+    text = text.replace("|", "/")
+    if limit is not None and len(text) > limit:
+        text = text[: max(0, limit - 1)].rstrip() + "…"
+    return text
+
+
+def compact_table(
+    items: List[Dict[str, Any]],
+    fields: List[str],
+    limits: Optional[Dict[str, int]] = None,
+) -> str:
+    """
+    One header line + one line per item, "|" separated. base_label values
+    become IMP / NEU / LOW. A field limited to 0 chars is left out entirely
+    (a column of lone "…" costs tokens and says nothing).
+    """
+    limits = limits or {}
+    fields = [f for f in fields if limits.get(f) != 0]
+    lines = ["|".join(fields)]
+    for item in items:
+        cells = []
+        for f in fields:
+            value = item.get(f)
+            if f == "base_label":
+                value = LABEL_CODES.get(value, value)
+            cells.append(_cell(value, limits.get(f)))
+        lines.append("|".join(cells))
+    return "\n".join(lines)
+
+
+def fit_to_budget(
+    items: List[Dict[str, Any]],
+    render: Callable[[List[Dict[str, Any]], Optional[int]], str],
+    budget: int,
+    desc_limits: Tuple[Optional[int], ...] = (160, 80, 0),
+) -> Tuple[List[Dict[str, Any]], Optional[int], str]:
+    """
+    Fit a ranked list into `budget` tokens: first shorten descriptions
+    (desc_limits, in order), then drop items from the tail.
+    Returns (kept_items, desc_limit_used, rendered_prompt).
+    """
+    for limit in desc_limits:
+        prompt = render(items, limit)
+        if estimate_tokens(prompt) <= budget:
+            return items, limit, prompt
+
+    limit = desc_limits[-1]
+    kept = list(items)
+    while len(kept) > 1:
+        kept = kept[:-1]
+        prompt = render(kept, limit)
+        if estimate_tokens(prompt) <= budget:
+            return kept, limit, prompt
+    return kept, limit, render(kept, limit)
+
+
+def savings_report(json_prompt: str, compact_prompt: str) -> Dict[str, Any]:
+    """
+    `json_prompt`: the same instructions with all candidates as
+    indented_json(); `compact_prompt`: what is actually sent. The saving is
+    the table encoding plus the budget trimming, not a comparison with the
+    old prompt text word for word.
+    """
+    as_json = estimate_tokens(json_prompt)
+    compact = estimate_tokens(compact_prompt)
+    return {
+        "json_tokens": as_json,
+        "compact_tokens": compact,
+        "saved_tokens": as_json - compact,
+        "saved_pct": round(100.0 * (as_json - compact) / as_json, 1) if as_json else 0.0,
+    }
+
+
+def indented_json(items: List[Dict[str, Any]]) -> str:
+    """Candidates the way the prompts embedded them before compact_table."""
+    return json.dumps(items, indent=2)
@@ -8,9 +8,19 @@
 import os
 import json
 import time
+import sys
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-import requests
+
+if not __package__:  # run as a script / top-level Lambda module rather than `python -m`
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    __package__ = "backend.unipro_pipeline"
+
+from ..Filtration.rule_set import get_rule_set
+from .checkpoint import StageCheckpoint, hash_json, manifest_path_for, s3_restore
+from .profiling import StageProfile
+from .run_date import RunDate, fetch_window, resolve_run_date, stamp_for, utc_now, utc_timestamp
+from .tracing import TracedS3, span
 
 
 
@@ -23,9 +33,19 @@ API_KEYS = {
 
 DEFAULT_QUERIES = ["finance", "economy", "federal reserve", "market", "business"]
 
-def _today_filename(prefix: str = "RAW_NEWS", ext: str = "json") -> str:
+
+def _get(provider: str, query: str, url: str, params: Dict[str, Any], timeout: float):
+    # one "fetch" span per provider request: status, bytes, duration
+    import requests  # here, not at the top: a checkpointed rerun never fetches
+
+    with span("fetch", provider=provider, query=query) as sp:
+        resp = requests.get(url, params=params, timeout=timeout)
+        sp.set(status=resp.status_code, bytes=len(resp.content or b""))
+        return resp
+
+def _today_filename(prefix: str = "RAW_NEWS", ext: str = "json", run_date: RunDate = None) -> str:
     # teammate style (MMDDYYYY), but with RAW_NEWS name
-    stamp = datetime.today().strftime("%m%d%Y")
+    stamp = stamp_for(resolve_run_date(run_date))
     return f"{prefix}_{stamp}.{ext}"
 
 def _extract_domain(url: str) -> str:
@@ -57,9 +77,8 @@ def _basic_valid(a: Dict[str, Any]) -> bool:
     if not a.get("title") or not a.get("url"):
         return False
     t = (a.get("title") or "").lower()
-    # keep it broad; just avoid obvious junk
-    banned = ["celebrity", "horoscope", "lottery", "gossip"]
-    if any(b in t for b in banned):
+    # keep it broad; just avoid obvious junk (banned_title_keywords in rules.json)
+    if get_rule_set().matches("banned_title", t):
         return False
     return True
 
@@ -83,22 +102,28 @@ def _dedup(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return out
 
 
-def fetch_newsapi(queries: List[str]) -> List[Dict[str, Any]]:
+def fetch_newsapi(
+    queries: List[str], since: Optional[datetime] = None, until: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
     key = API_KEYS.get("newsapi")
     if not key:
         return []
     url = "https://newsapi.org/v2/everything"
     out = []
-    since = (datetime.utcnow() - timedelta(hours=24)).strftime("%Y-%m-%d")
+    until = until or utc_now()
+    since = since or until - timedelta(hours=24)
     for q in queries:
         try:
-            resp = requests.get(
+            resp = _get(
+                "newsapi",
+                q,
                 url,
                 params={
                     "apiKey": key,
                     "q": q,
                     "language": "en",
-                    "from": since,
+                    "from": since.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "to": until.strftime("%Y-%m-%dT%H:%M:%S"),
                     "sortBy": "relevancy",
                     "pageSize": 30,
                 },
@@ -129,15 +154,25 @@ def fetch_newsapi(queries: List[str]) -> List[Dict[str, Any]]:
             continue
     return out
 
-def fetch_thenewsapi(queries: List[str]) -> List[Dict[str, Any]]:
+def fetch_thenewsapi(
+    queries: List[str], since: Optional[datetime] = None, until: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
     key = API_KEYS.get("thenewsapi")
     if not key:
         return []
     url = "https://api.thenewsapi.com/v1/news/all"
     out = []
+    window = {}
+    if since and until:
+        window = {
+            "published_after": since.strftime("%Y-%m-%dT%H:%M:%S"),
+            "published_before": until.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
     for q in queries:
         try:
-            resp = requests.get(
+            resp = _get(
+                "thenewsapi",
+                q,
                 url,
                 params={
                     "api_token": key,
@@ -145,6 +180,7 @@ def fetch_thenewsapi(queries: List[str]) -> List[Dict[str, Any]]:
                     "language": "en",
                     "categories": "business",
                     "limit": 50,
+                    **window,
                 },
                 timeout=15,
             )
@@ -169,12 +205,15 @@ def fetch_thenewsapi(queries: List[str]) -> List[Dict[str, Any]]:
             continue
     return out
 
-def fetch_newsdata(queries: List[str], max_pages: int = 1) -> List[Dict[str, Any]]:
+def fetch_newsdata(
+    queries: List[str], max_pages: int = 1, day: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
     # merge style from teammate: simple params + optional pagination
     key = API_KEYS.get("newsdata")
     if not key:
         return []
-    base_url = "https://newsdata.io/api/1/latest"
+    # /latest only covers the last 48h; a past day needs /archive
+    base_url = "https://newsdata.io/api/1/archive" if day else "https://newsdata.io/api/1/latest"
     out = []
     for q in queries:
         next_page = None
@@ -187,9 +226,11 @@ def fetch_newsdata(queries: List[str], max_pages: int = 1) -> List[Dict[str, Any
                     "language": "en",
                     "size": 10,
                 }
+                if day:
+                    params["from_date"] = params["to_date"] = day.strftime("%Y-%m-%d")
                 if next_page:
                     params["page"] = next_page
-                resp = requests.get(base_url, params=params, timeout=15)
+                resp = _get("newsdata", q, base_url, params=params, timeout=15)
                 if resp.status_code != 200:
                     break
                 data = resp.json()
@@ -217,24 +258,29 @@ def fetch_newsdata(queries: List[str], max_pages: int = 1) -> List[Dict[str, Any
         time.sleep(0.5)
     return out
 
-def fetch_alphavantage() -> List[Dict[str, Any]]:
+def fetch_alphavantage(
+    since: Optional[datetime] = None, until: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
     key = API_KEYS.get("alphavantage")
     if not key:
         return []
     url = "https://www.alphavantage.co/query"
     topics = ["financial_markets", "economy_fiscal", "earnings"]
     out = []
+    until = until or utc_now()
+    since = since or until - timedelta(hours=24)
     for t in topics:
         try:
             params = {
                 "function": "NEWS_SENTIMENT",
                 "apikey": key,
                 "topics": t,
-                "time_from": (datetime.utcnow() - timedelta(hours=24)).strftime("%Y%m%dT%H%M"),
+                "time_from": since.strftime("%Y%m%dT%H%M"),
+                "time_to": until.strftime("%Y%m%dT%H%M"),
                 "limit": 40,
                 "sort": "RELEVANCE",
             }
-            resp = requests.get(url, params=params, timeout=20)
+            resp = _get("alphavantage", t, url, params=params, timeout=20)
             if resp.status_code != 200:
                 continue
             data = resp.json()
@@ -262,16 +308,30 @@ def fetch_alphavantage() -> List[Dict[str, Any]]:
     return out
 
 
-def collect_news(target_count: int = 100) -> List[Dict[str, Any]]:
-    # Phase 1: fetch
+def collect_news(target_count: int = 100, run_date: RunDate = None) -> List[Dict[str, Any]]:
+    # Phase 1: fetch (the 24h up to now, or the whole run_date if it's in the past)
+    day = resolve_run_date(run_date)
+    since, until = fetch_window(day)
+    past_day = day < until.date()
+    fetchers = [
+        ("newsapi", lambda: fetch_newsapi(DEFAULT_QUERIES, since, until)),
+        ("thenewsapi", lambda: fetch_thenewsapi(DEFAULT_QUERIES, since, until)),
+        ("newsdata", lambda: fetch_newsdata(
+            DEFAULT_QUERIES, max_pages=1, day=since if past_day else None
+        )),
+        ("alphavantage", lambda: fetch_alphavantage(since, until)),
+    ]
     items: List[Dict[str, Any]] = []
-    items += fetch_newsapi(DEFAULT_QUERIES)
-    items += fetch_thenewsapi(DEFAULT_QUERIES)
-    items += fetch_newsdata(DEFAULT_QUERIES, max_pages=1)
-    items += fetch_alphavantage()
+    for provider, fetch in fetchers:
+        with span("fetch_provider", provider=provider) as sp:
+            got = fetch()
+            sp.set(items=len(got))
+        items += got
 
     # Phase 2: dedup + trim
-    unique = _dedup(items)
+    with span("dedup", items_in=len(items)) as sp:
+        unique = _dedup(items)
+        sp.set(items_out=len(unique))
     # keep it simple: just cap count
     final = unique[:target_count]
 
@@ -281,28 +341,67 @@ def collect_news(target_count: int = 100) -> List[Dict[str, Any]]:
 
     return final
 
-def save_json_articles(articles: List[Dict[str, Any]], filename: Optional[str] = None) -> str:
-    if not filename:
-        filename = _today_filename(prefix="RAW_NEWS", ext="json")
-    out = {
+def build_raw_payload(articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
         "metadata": {
-            "generated_at": datetime.utcnow().isoformat() + "Z",
+            "generated_at": utc_timestamp(),
             "total_articles": len(articles),
             "sources": list({a.get("api_source") for a in articles}),
         },
         "articles": articles,
     }
-    path = os.path.join("/tmp", filename) if os.environ.get("AWS_EXECUTION_ENV") else filename
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+
+
+def _output_path(filename: str) -> str:
+    return os.path.join("/tmp", filename) if os.environ.get("AWS_EXECUTION_ENV") else filename
+
+
+def collect_checkpoint(target_count: int = 100, run_date: RunDate = None) -> StageCheckpoint:
+    # the "input" of this stage is the day itself: one collection per day,
+    # so a rerun keeps the articles everything downstream was built from
+    filename = _today_filename(prefix="RAW_NEWS", ext="json", run_date=run_date)
+    return StageCheckpoint(
+        "collect",
+        _output_path(filename),
+        hash_json({"file": filename}),
+        {"target_count": target_count, "queries": DEFAULT_QUERIES, "sources": sorted(API_KEYS)},
+    )
+
+
+def collect_and_save(target_count: int = 100, run_date: RunDate = None) -> str:
+    """collect_news + save_json_articles, unless that day's file is already done."""
+    with span("collect_stage", run_date=str(resolve_run_date(run_date))) as sp:
+        ckpt = collect_checkpoint(target_count, run_date)
+        if ckpt.is_fresh():
+            sp.set(skipped=True)
+            return ckpt.output
+        articles = collect_news(target_count=target_count, run_date=run_date)
+        sp.set(items=len(articles))
+        path = save_json_articles(articles, run_date=run_date)
+        ckpt.complete()
+        return path
+
+
+def save_json_articles(
+    articles: List[Dict[str, Any]], filename: Optional[str] = None, run_date: RunDate = None
+) -> str:
+    if not filename:
+        filename = _today_filename(prefix="RAW_NEWS", ext="json", run_date=run_date)
+    out = build_raw_payload(articles)
+    path = _output_path(filename)
+    with span("json_write", path=path, items=len(articles)) as sp:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(out, f, ensure_ascii=False, indent=2)
+        sp.set(bytes=os.path.getsize(path))
     print(f"[IO] saved -> {path}")
     return path
 
 
 def main():
     print("NEWS Collector — minimal, multi-source, deduped")
-    arts = collect_news(target_count=100)
-    save_json_articles(arts)  # RAW_NEWS_MMDDYYYY.json
+    # run date: BRIEFLY_RUN_DATE or today, BRIEFLY_PROFILE=all to profile
+    with StageProfile("collect", collect_checkpoint(100, None).output):
+        collect_and_save(target_count=100)  # RAW_NEWS_MMDDYYYY.json
 
 if __name__ == "__main__":
     main()
@@ -313,18 +412,31 @@ def lambda_handler(event, context):
     import os
 
     try:
+        bucket = os.environ.get("BUCKET_NAME", "universityprojectbucket")
+        s3 = TracedS3(boto3.client("s3"))
+
+        # event {"run_date": "YYYY-MM-DD"} collects a past day, default today
+        run_date = resolve_run_date((event or {}).get("run_date"))
+
+        # 0) That day's file + manifest from an earlier run, if any
+        expected = collect_checkpoint(100, run_date).output
+        s3_restore(s3, bucket, "NewsCollector/", [expected, manifest_path_for(expected)])
+
         # 1) Collect news + save locally (this uses /tmp automatically in Lambda)
-        articles = collect_news(target_count=100)
-        local_path = save_json_articles(articles)  # e.g. /tmp/RAW_NEWS_MMDDYYYY.json
+        with StageProfile("collect", expected) as prof:
+            local_path = collect_and_save(target_count=100, run_date=run_date)  # e.g. /tmp/RAW_NEWS_MMDDYYYY.json
         base_name = os.path.basename(local_path)
 
-        # 2) Bucket + key config
-        bucket = os.environ.get("BUCKET_NAME", "universityprojectbucket")
+        # 2) Key config
         key = f"NewsCollector/{base_name}"   # s3://bucket/NewsCollector/RAW_NEWS_MMDDYYYY.json
 
-        # 3) Upload to S3
-        s3 = boto3.client("s3")
+        # 3) Upload to S3 (+ manifest)
         s3.upload_file(local_path, bucket, key)
+        manifest = manifest_path_for(local_path)
+        if os.path.exists(manifest):
+            s3.upload_file(manifest, bucket, f"NewsCollector/{os.path.basename(manifest)}")
+        for path in prof.paths:  # BRIEFLY_PROFILE
+            s3.upload_file(path, bucket, f"NewsCollector/{os.path.basename(path)}")
 
         return {
             "statusCode": 200,
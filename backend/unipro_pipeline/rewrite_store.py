@@ -0,0 +1,237 @@
+"""
+Similarity-keyed store of past rewrites, for near-duplicate stories.
+
+The same story comes back on later days / from a second provider with a
+slightly different headline ("Fed holds rates steady" vs "Fed keeps rates
+steady as inflation cools"). The exact-prompt LLM cache misses those, so we
+also keep every DeepSeek rewrite under a fingerprint of its original title:
+
+- shingles: word unigrams + bigrams of the tokenized title
+- MinHash signature (NUM_PERM hashes) of the shingle set
+- LSH: the signature is cut into BANDS bands; each band hash is indexed in
+  SQLite, so a lookup only touches rows sharing at least one band
+  (sublinear in archive size), then the best candidate is checked with
+  the real Jaccard similarity of the stored shingles
+
+Env:
+- DEEPSEEK_REUSE=off               disable
+- DEEPSEEK_REUSE_THRESHOLD=0.6     minimum title Jaccard to reuse
+- DEEPSEEK_REUSE_MAX_AGE_DAYS=30   older rewrites are not reused
+- DEEPSEEK_REUSE_REFRESH=1         never reuse, but still store (re-rewrite)
+- DEEPSEEK_REUSE_PATH              SQLite file (default: shared cache dir)
+
+Backfill workers share the file: WAL mode, a busy timeout, and a commit per
+write. If SQLite still fails ("database is locked"), the store turns itself
+off for the rest of the run instead of failing the stage.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..Filtration.rule_set import default_cache_dir, tokenize
+
+NUM_PERM = 64
+BANDS = 16
+_ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+_BUSY_TIMEOUT = 5.0  # seconds to wait for another process's write lock
+
+
+def _seeds(n: int) -> List[Tuple[int, int]]:
+    # fixed pseudo-random (a, b) pairs so signatures are stable across runs
+    out, x = [], 0x9E3779B97F4A7C15
+    for _ in range(n):
+        x = (x * 6364136223846793005 + 1442695040888963407) & ((1 << 64) - 1)
+        a = (x >> 16) | 1
+        x = (x * 6364136223846793005 + 1442695040888963407) & ((1 << 64) - 1)
+        out.append((a % _PRIME, (x >> 16) % _PRIME))
+    return out
+
+
+_PERMS = _seeds(NUM_PERM)
+
+
+def shingles(title: str) -> Set[str]:
+    words = tokenize(title or "")
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash(shingle_set: Set[str]) -> List[int]:
+    hashed = [zlib.crc32(s.encode("utf-8")) for s in shingle_set]
+    if not hashed:
+        return [_MASK] * NUM_PERM
+    return [min(((a * h + b) % _PRIME) & _MASK for h in hashed) for a, b in _PERMS]
+
+
+def band_keys(signature: List[int]) -> List[str]:
+    return [
+        f"{i}:{zlib.crc32(json.dumps(signature[i * _ROWS:(i + 1) * _ROWS]).encode()):08x}"
+        for i in range(BANDS)
+    ]
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class RewriteStore:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.6,
+        max_age_days: float = 30.0,
+        refresh: bool = False,
+    ) -> None:
+        self.path = path or os.path.join(default_cache_dir(), "rewrites.sqlite")
+        self.threshold = threshold
+        self.max_age_days = max_age_days
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "reused": 0, "stored": 0, "candidates_checked": 0}
+        self._db = self._open_db(self.path)
+
+    def _open_db(self, path: str) -> Optional[sqlite3.Connection]:
+        try:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            db = sqlite3.connect(path, timeout=_BUSY_TIMEOUT, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS rewrites ("
+                " id INTEGER PRIMARY KEY, title TEXT, shingles TEXT,"
+                " rewrite TEXT, stored_at REAL)"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS bands (band TEXT, rewrite_id INTEGER)")
+            db.execute("CREATE INDEX IF NOT EXISTS bands_by_key ON bands (band)")
+            db.execute("CREATE INDEX IF NOT EXISTS rewrites_by_title ON rewrites (title)")
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"[REUSE] Rewrite store disabled ({path}): {e}")
+            return None
+
+    def _drop_db(self, error: Exception) -> None:
+        print(f"[REUSE] Rewrite store disabled ({self.path}): {error}")
+        try:
+            self._db.rollback()
+            self._db.close()
+        except sqlite3.Error:
+            pass
+        self._db = None
+
+    def lookup(self, title: str) -> Optional[Dict[str, Any]]:
+        """Best stored rewrite whose original title is similar enough, else None."""
+        with self._lock:
+            self.stats["lookups"] += 1
+            if self._db is None or self.refresh:
+                return None
+            try:
+                return self._lookup(title)
+            except sqlite3.Error as e:
+                self._drop_db(e)
+                return None
+
+    def _lookup(self, title: str) -> Optional[Dict[str, Any]]:
+        sh = shingles(title)
+        if not sh:
+            return None
+        keys = band_keys(minhash(sh))
+        min_time = time.time() - self.max_age_days * 86400
+        marks = ",".join("?" * len(keys))
+        rows = self._db.execute(
+            f"SELECT DISTINCT r.id, r.shingles, r.rewrite FROM bands b"
+            f" JOIN rewrites r ON r.id = b.rewrite_id"
+            f" WHERE b.band IN ({marks}) AND r.stored_at >= ?",
+            (*keys, min_time),
+        ).fetchall()
+
+        best, best_sim = None, self.threshold
+        for _, stored, rewrite in rows:
+            self.stats["candidates_checked"] += 1
+            sim = jaccard(sh, set(json.loads(stored)))
+            if sim >= best_sim:
+                best, best_sim = rewrite, sim
+        if best is None:
+            return None
+        self.stats["reused"] += 1
+        return {**json.loads(best), "similarity": round(best_sim, 3)}
+
+    def store(self, title: str, rewrite: Dict[str, Any]) -> None:
+        sh = shingles(title)
+        if not sh:
+            return
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                self._store(title, sh, rewrite)
+            except sqlite3.Error as e:
+                self._drop_db(e)
+                return
+            self.stats["stored"] += 1
+
+    def _store(self, title: str, sh: Set[str], rewrite: Dict[str, Any]) -> None:
+        row = self._db.execute("SELECT id FROM rewrites WHERE title = ?", (title,)).fetchone()
+        if row is not None:
+            # same headline again (e.g. a rerun or a refresh): replace it
+            self._db.execute(
+                "UPDATE rewrites SET rewrite = ?, stored_at = ? WHERE id = ?",
+                (json.dumps(rewrite, ensure_ascii=False), time.time(), row[0]),
+            )
+            self._db.commit()
+            return
+        cur = self._db.execute(
+            "INSERT INTO rewrites (title, shingles, rewrite, stored_at) VALUES (?, ?, ?, ?)",
+            (title, json.dumps(sorted(sh)), json.dumps(rewrite, ensure_ascii=False), time.time()),
+        )
+        self._db.executemany(
+            "INSERT INTO bands (band, rewrite_id) VALUES (?, ?)",
+            [(k, cur.lastrowid) for k in band_keys(minhash(sh))],
+        )
+        self._db.commit()
+
+    def prune(self) -> int:
+        """Delete rewrites past max_age_days. Returns how many went."""
+        with self._lock:
+            if self._db is None:
+                return 0
+            min_time = time.time() - self.max_age_days * 86400
+            try:
+                old = [r[0] for r in self._db.execute(
+                    "SELECT id FROM rewrites WHERE stored_at < ?", (min_time,)
+                )]
+                self._db.executemany("DELETE FROM bands WHERE rewrite_id = ?", [(i,) for i in old])
+                self._db.executemany("DELETE FROM rewrites WHERE id = ?", [(i,) for i in old])
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._drop_db(e)
+                return 0
+            return len(old)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self.stats)
+        s["reuse_rate"] = round(s["reused"] / s["lookups"], 4) if s["lookups"] else 0.0
+        return s
+
+
+def default_rewrite_store() -> Optional[RewriteStore]:
+    if (os.environ.get("DEEPSEEK_REUSE") or "on").lower() in ("0", "off", "false"):
+        return None
+    store = RewriteStore(
+        path=os.environ.get("DEEPSEEK_REUSE_PATH"),
+        threshold=float(os.environ.get("DEEPSEEK_REUSE_THRESHOLD", "0.6")),
+        max_age_days=float(os.environ.get("DEEPSEEK_REUSE_MAX_AGE_DAYS", "30")),
+        refresh=(os.environ.get("DEEPSEEK_REUSE_REFRESH") or "").lower() in ("1", "on", "true"),
+    )
+    store.prune()
+    return store
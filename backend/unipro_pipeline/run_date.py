@@ -0,0 +1,72 @@
+"""
+The day a pipeline run is for.
+
+Every stage used to stamp its files with datetime.today(), so a past day
+could not be reprocessed and a chain that crossed midnight looked for the
+wrong files. Stages now take a run date (constructor / function argument,
+Lambda event "run_date") and fall back to BRIEFLY_RUN_DATE, then today.
+
+Accepted forms: a date / datetime, "YYYY-MM-DD" or the file stamp "MMDDYYYY".
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple, Union
+
+RunDate = Union[None, str, date, datetime]
+
+
+def resolve_run_date(value: RunDate = None) -> date:
+    if value is None or value == "":
+        value = os.environ.get("BRIEFLY_RUN_DATE") or None
+    if value is None:
+        return date.today()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%m%d%Y"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Bad run date {value!r} (expected YYYY-MM-DD or MMDDYYYY)")
+
+
+def stamp_for(day: date) -> str:
+    """MMDDYYYY, the stamp in every artifact name."""
+    return day.strftime("%m%d%Y")
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def utc_timestamp() -> str:
+    """Now as ISO 8601 with a "Z", for generated_at / updated_at fields."""
+    return utc_now().isoformat().replace("+00:00", "Z")
+
+
+def fetch_window(day: date, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """
+    (since, until) for the news fetch, both aware UTC: the last 24h for
+    today (as before), the 24h ending at midnight UTC after `day` for a past
+    day. A naive `now` is taken to be UTC. The providers get these as UTC
+    wall-clock strings (strftime, no offset).
+    """
+    now = utc_now() if now is None else now
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    if day >= now.date():
+        return now - timedelta(hours=24), now
+    until = datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    return until - timedelta(hours=24), until
+
+
+def date_range(start: RunDate, end: RunDate) -> List[date]:
+    """Every day from start to end, both included."""
+    first, last = resolve_run_date(start), resolve_run_date(end)
+    if last < first:
+        raise ValueError(f"End date {last} is before start date {first}")
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
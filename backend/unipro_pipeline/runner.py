@@ -0,0 +1,256 @@
+"""
+All three stages in one process, articles passed along in memory.
+
+The Lambda chain (raw_news -> educational_filter_pipeline ->
+daily_content_generator) hands every list over as a JSON file in S3, so each
+stage pays a dump + upload + download + load before it can start. This
+runner calls the same stage code directly:
+
+    collect_news -> EducationalFilterPipeline.run_in_memory
+                 -> DailyContentGenerator.build_daily_content
+
+Speculative rewrites (BRIEFLY_SPECULATIVE_REWRITE=1) are handed to the
+generator as a dict instead of SPECULATIVE_REWRITES_*.json.
+
+The usual artifacts are optional and written on a background thread, so
+the next stage never waits for a save / upload (BRIEFLY_PERSIST):
+
+- off    nothing is written
+- local  same filenames as the chained run, in --out-dir (default: cwd, /tmp on Lambda)
+- s3     local + upload under the usual prefixes of BUCKET_NAME
+
+    python -m backend.unipro_pipeline.runner --persist local --count 100
+"""
+
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ..Filtration.rule_telemetry import summary_path_for
+from .daily_content_generator import DailyContentGenerator
+from .educational_filter_pipeline import EducationalFilterPipeline
+from .llm_metrics import metrics_path_for
+from .raw_news import build_raw_payload, collect_news
+from .run_date import RunDate, resolve_run_date, stamp_for
+from .speculative import speculative_filename
+from .tracing import TracedS3, carry, span
+
+PERSIST_MODES = ("off", "local", "s3")
+NEWS_PREFIX = "NewsCollector/"
+FILT_PREFIX = "Filteration/"
+FINAL_PREFIX = "FinalArticles/"
+
+
+class ArtifactWriter:
+    """
+    Saves (and uploads) stage artifacts on one background thread.
+    Payloads are serialized in submit(), so the caller may keep mutating
+    them; the file write and S3 upload happen off the critical path.
+    """
+
+    def __init__(
+        self,
+        mode: str = "local",
+        out_dir: Optional[str] = None,
+        bucket: Optional[str] = None,
+        s3: Any = None,
+    ) -> None:
+        mode = (mode or "local").lower()
+        if mode not in PERSIST_MODES:
+            raise ValueError(f"persist mode must be one of {PERSIST_MODES}, got {mode!r}")
+        self.mode = mode
+        self.out_dir = out_dir or ("/tmp" if os.environ.get("AWS_EXECUTION_ENV") else ".")
+        self.bucket = bucket or os.environ.get("BUCKET_NAME", "universityprojectbucket")
+        self._s3 = s3
+        self._pool = ThreadPoolExecutor(max_workers=1) if mode != "off" else None
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        self.written: List[str] = []
+        self.errors: List[str] = []
+
+    def submit(self, name: str, payload: Any, prefix: str = "") -> None:
+        if self._pool is None:
+            return
+        text = json.dumps(payload, indent=2, ensure_ascii=False)
+        self._futures.append(self._pool.submit(carry(self._save), name, text, prefix))
+
+    def _client(self) -> Any:
+        if self._s3 is None:
+            import boto3
+
+            self._s3 = TracedS3(boto3.client("s3"))
+        return self._s3
+
+    def _save(self, name: str, text: str, prefix: str) -> None:
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            path = os.path.join(self.out_dir, name)
+            with span("json_write", path=path, bytes=len(text.encode("utf-8"))):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+            location = path
+            if self.mode == "s3":
+                key = f"{prefix}{name}"
+                self._client().upload_file(path, self.bucket, key)
+                location = f"s3://{self.bucket}/{key}"
+            with self._lock:
+                self.written.append(location)
+            print(f"[IO] saved -> {location}")
+        except Exception as e:  # an artifact is never worth failing the run
+            with self._lock:
+                self.errors.append(f"{name}: {e}")
+            print(f"⚠️ Could not persist {name}: {e}")
+
+    def close(self) -> List[str]:
+        """Wait for every pending save; returns where things were written."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        return list(self.written)
+
+
+def run_in_memory(
+    target_count: int = 100,
+    writer: Optional[ArtifactWriter] = None,
+    collect: Optional[Callable[[int], List[Dict[str, Any]]]] = None,
+    pipeline: Optional[EducationalFilterPipeline] = None,
+    generator: Optional[DailyContentGenerator] = None,
+    run_date: RunDate = None,
+) -> Dict[str, Any]:
+    """
+    Collect -> filter / rank -> rewrite, in one process, for `run_date`.
+    Returns {"daily": DAILY_CONTENT payload or None, "counts", "seconds",
+    "artifacts"} once pending artifact writes are done.
+    """
+    writer = writer or ArtifactWriter("off")
+    day = resolve_run_date(run_date)
+    stamp = stamp_for(day)
+    collect = collect or functools.partial(collect_news, run_date=day)
+    seconds: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    daily: Optional[Dict[str, Any]] = None
+
+    with span("run_in_memory", run_date=day.isoformat()):
+        try:
+            started = time.perf_counter()
+            with span("collect_stage", run_date=day.isoformat()) as sp:
+                raw_articles = collect(target_count)
+                sp.set(items=len(raw_articles))
+            seconds["collect"] = round(time.perf_counter() - started, 3)
+            counts["raw"] = len(raw_articles)
+            writer.submit(f"RAW_NEWS_{stamp}.json", build_raw_payload(raw_articles), NEWS_PREFIX)
+            if not raw_articles:
+                print("[ERROR] No articles collected, aborting.")
+                return {"daily": None, "counts": counts, "seconds": seconds,
+                        "artifacts": writer.close()}
+
+            started = time.perf_counter()
+            pipeline = pipeline or EducationalFilterPipeline(run_date=day)
+            with span("filter_stage", run_date=day.isoformat(), items_in=len(raw_articles)) as sp:
+                filtered = pipeline.run_in_memory(raw_articles)
+                sp.set(items_out=len((filtered["final"] or {}).get("articles", [])))
+            seconds["filter"] = round(time.perf_counter() - started, 3)
+            counts["candidates"] = len(filtered["summary"].get("articles", []))
+            filters_name = pipeline._filters_filename()
+            final_name = pipeline._final_filename()
+            writer.submit(filters_name, filtered["summary"], FILT_PREFIX)
+            if pipeline.telemetry:
+                writer.submit(
+                    os.path.basename(summary_path_for(filters_name)),
+                    pipeline.telemetry.summary(),
+                    FILT_PREFIX,
+                )
+            writer.submit(
+                os.path.basename(metrics_path_for(final_name)),
+                pipeline.llm_client.meter.payload(day.isoformat()),
+                FILT_PREFIX,
+            )
+            if pipeline.speculator is not None and filtered["final"]:
+                writer.submit(
+                    speculative_filename(stamp),
+                    {"stats": pipeline.speculator.stats, "rewrites": pipeline.speculative_kept},
+                    FILT_PREFIX,
+                )
+
+            final = filtered["final"]
+            if not final or not final.get("articles"):
+                print("[ERROR] Filter stage produced no articles, aborting.")
+                return {"daily": None, "counts": counts, "seconds": seconds,
+                        "artifacts": writer.close()}
+            counts["final"] = len(final["articles"])
+            writer.submit(final_name, final, FILT_PREFIX)
+
+            started = time.perf_counter()
+            generator = generator or DailyContentGenerator(run_date=day)
+            generator.speculative_rewrites = pipeline.speculative_kept
+            with span("generate_stage", run_date=day.isoformat(), items_in=len(final["articles"])) as sp:
+                daily = generator.build_daily_content(final["articles"])
+                sp.set(items_out=daily["total_articles"])
+            seconds["generate"] = round(time.perf_counter() - started, 3)
+            counts["daily"] = daily["total_articles"]
+            writer.submit(os.path.basename(generator.output_filename), daily, FINAL_PREFIX)
+            writer.submit(
+                os.path.basename(metrics_path_for(generator.output_filename)),
+                generator.llm_client.meter.payload(daily["generation_date"]),
+                FINAL_PREFIX,
+            )
+        finally:
+            artifacts = writer.close()
+
+    print(f"✅ In-memory run done: {counts}, stage seconds {seconds}")
+    return {"daily": daily, "counts": counts, "seconds": seconds, "artifacts": artifacts}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run collect -> filter -> generate in one process")
+    parser.add_argument("--count", type=int, default=100, help="target raw article count")
+    parser.add_argument(
+        "--persist",
+        choices=PERSIST_MODES,
+        default=os.environ.get("BRIEFLY_PERSIST", "local"),
+    )
+    parser.add_argument("--out-dir", default=None)
+    parser.add_argument("--date", default=None, help="run date YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    result = run_in_memory(
+        args.count, ArtifactWriter(args.persist, args.out_dir), run_date=args.date
+    )
+    for location in result["artifacts"]:
+        print(f"  {location}")
+
+
+def lambda_handler(event, context):
+    """One Lambda for the whole chain; uploads artifacts unless BRIEFLY_PERSIST says otherwise."""
+    try:
+        event = event or {}
+        writer = ArtifactWriter(
+            event.get("persist") or os.environ.get("BRIEFLY_PERSIST", "s3"),
+            out_dir="/tmp",
+        )
+        result = run_in_memory(int(event.get("count", 100)), writer, run_date=event.get("run_date"))
+        status = 200 if result["daily"] else 500
+        return {
+            "statusCode": status,
+            "body": json.dumps({
+                "counts": result["counts"],
+                "seconds": result["seconds"],
+                "artifacts": result["artifacts"],
+                "persist_errors": writer.errors,
+            }),
+        }
+
+    except Exception as e:
+        return {
+            "statusCode": 500,
+            "body": f"Error in runner lambda_handler: {e}",
+        }
+
+
+if __name__ == "__main__":
+    main()
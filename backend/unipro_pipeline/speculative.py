@@ -0,0 +1,113 @@
+"""
+Speculative rewriting, overlapped with the DeepSeek ranking call.
+
+Opt-in with BRIEFLY_SPECULATIVE_REWRITE=1 in the filter stage. While the
+ranking request is in flight, the top BRIEFLY_SPECULATIVE_COUNT local
+candidates (keyword / pre-ranker order) are already being rewritten. When
+the ranking returns:
+
+- rewrites of picked articles are kept (hits)
+- not-yet-started rewrites of unpicked articles are cancelled
+- finished / running ones for unpicked articles are thrown away (waste)
+
+Kept rewrites go to SPECULATIVE_REWRITES_MMDDYYYY.json next to the final
+list; DailyContentGenerator uses them instead of calling DeepSeek again.
+"""
+
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional
+
+from .tracing import carry
+
+
+def speculative_filename(stamp: str) -> str:
+    return f"SPECULATIVE_REWRITES_{stamp}.json"
+
+
+class SpeculativeRewriter:
+    def __init__(self, generator: Any, max_workers: Optional[int] = None) -> None:
+        # generator: a DailyContentGenerator (its per-article DeepSeek path)
+        self.generator = generator
+        self.max_workers = max_workers or generator.max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+        self._articles: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, Any] = {}
+
+    def start(self, articles: List[Dict[str, Any]]) -> None:
+        if not articles:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(articles)))
+        for art in articles:
+            aid = str(art.get("id"))
+            self._articles[aid] = art
+            self._futures[aid] = self._pool.submit(carry(self.generator._call_deepseek_for_article), art)
+        print(f"[SPEC] Speculatively rewriting {len(articles)} top candidates")
+
+    def finish(self, picked_ids: Iterable[Any], timeout: float) -> Dict[str, Dict[str, str]]:
+        """
+        Keep rewrites for `picked_ids` (waiting up to `timeout` seconds for
+        ones still running), cancel / discard the rest.
+        Returns {str(id): {title, description, source_title}}.
+        """
+        picked = {str(i) for i in picked_ids}
+        cancelled = 0
+        for aid, fut in self._futures.items():
+            if aid not in picked and fut.cancel():
+                cancelled += 1
+
+        kept_futures = [f for aid, f in self._futures.items() if aid in picked]
+        if kept_futures:
+            wait(kept_futures, timeout=timeout)
+
+        kept: Dict[str, Dict[str, str]] = {}
+        for aid, fut in self._futures.items():
+            if aid not in picked or not fut.done() or fut.cancelled() or fut.exception():
+                continue
+            res = fut.result()
+            if "strategy" in res:  # DeepSeek failed, local fallback - not worth shipping
+                continue
+            kept[aid] = {
+                "title": res["title"],
+                "description": res["description"],
+                "source_title": self._articles[aid].get("title") or "",
+            }
+
+        speculated = len(self._futures)
+        wasted = sum(
+            1 for aid, f in self._futures.items() if aid not in picked and not f.cancelled()
+        )
+        hits = len(kept)
+        self.stats = {
+            "speculated": speculated,
+            "picked": len(picked),
+            "hits": hits,
+            "cancelled": cancelled,
+            "wasted": wasted,
+            "hit_rate": round(hits / len(picked), 4) if picked else 0.0,
+            "waste_rate": round(wasted / speculated, 4) if speculated else 0.0,
+        }
+        print(f"[SPEC] {self.stats}")
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        return kept
+
+    def write(self, path: str, kept: Dict[str, Dict[str, str]]) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"stats": self.stats, "rewrites": kept}, f, indent=2, ensure_ascii=False)
+        print(f"[SPEC] Saved {len(kept)} speculative rewrites -> {path}")
+        return path
+
+
+def load_speculative(path: str) -> Dict[str, Dict[str, str]]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("rewrites", {})
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read speculative rewrites {path}: {e}")
+        return {}
@@ -0,0 +1,196 @@
+"""
+Nested timing spans, written as JSON lines.
+
+    with span("fetch", provider="newsapi", query=q) as sp:
+        resp = requests.get(...)
+        sp.set(status=resp.status_code, bytes=len(resp.content), items=len(out))
+
+Every finished span is one line:
+
+    {"ts": 1730450000.12, "trace": "a1b2c3d4", "span": 7, "parent": 3,
+     "name": "fetch", "duration_ms": 412.5, "status": "ok",
+     "provider": "newsapi", "query": "finance", "items": 28, "bytes": 51234}
+
+status is "error" (plus "error": "Type: message") when the block raised.
+Parents nest per thread. Work handed to a thread pool starts a new root
+unless it is submitted as pool.submit(carry(fn), ...), which runs fn under
+the submitting thread's current span; the trace id ties everything together.
+
+BRIEFLY_TRACE:
+- unset / off  nothing is written (span() is a near no-op)
+- stdout       one JSON object per log line, so CloudWatch Logs Insights can
+               query it directly, e.g.
+               filter name="llm" | stats pct(duration_ms, 95) by stage
+- <path>       append to that file
+
+BRIEFLY_TRACE_ID overrides the trace id (default: random per process).
+"""
+
+import contextvars
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO
+
+_current: ContextVar[Optional[int]] = ContextVar("briefly_span", default=None)
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_configured = False
+_sink: Optional[TextIO] = None
+_trace_id = ""
+
+
+def configure(target: Optional[str] = None, trace_id: Optional[str] = None) -> None:
+    """Set the sink: None/"off", "stdout" or a file path (default: BRIEFLY_TRACE)."""
+    global _configured, _sink, _trace_id
+    with _lock:
+        if _sink is not None and _sink is not sys.stdout:
+            _sink.close()
+        target = os.environ.get("BRIEFLY_TRACE") if target is None else target
+        target = (target or "").strip()
+        if not target or target.lower() in ("0", "off", "false"):
+            _sink = None
+        elif target.lower() == "stdout":
+            _sink = sys.stdout
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            _sink = open(target, "a", encoding="utf-8")
+        _trace_id = trace_id or os.environ.get("BRIEFLY_TRACE_ID") or os.urandom(4).hex()
+        _configured = True
+
+
+def enabled() -> bool:
+    if not _configured:
+        configure()
+    return _sink is not None
+
+
+def _emit(record: Dict[str, Any]) -> None:
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _lock:
+        if _sink is None:
+            return
+        _sink.write(line + "\n")
+        _sink.flush()
+
+
+class Span:
+    __slots__ = ("id", "parent", "name", "attrs", "_ts", "_t0")
+
+    def __init__(self, name: str, parent: Optional[int], attrs: Dict[str, Any]) -> None:
+        self.id = next(_ids)
+        self.parent = parent
+        self.name = name
+        self.attrs = attrs
+        self._ts = time.time()
+        self._t0 = time.perf_counter()
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, key: str, n: float = 1) -> None:
+        self.attrs[key] = self.attrs.get(key, 0) + n
+
+    def _finish(self, status: str, error: Optional[str]) -> None:
+        record = {
+            "ts": round(self._ts, 3),
+            "trace": _trace_id,
+            "span": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "duration_ms": round((time.perf_counter() - self._t0) * 1000.0, 2),
+            "status": status,
+        }
+        if error:
+            record["error"] = error
+        record.update(self.attrs)
+        _emit(record)
+
+
+class _NoopSpan:
+    id = None
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def add(self, key: str, n: float = 1) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+@contextmanager
+def span(name: str, parent: Any = None, **attrs: Any) -> Iterator[Any]:
+    """Time the block; `parent` (a span) links work running on another thread."""
+    if not enabled():
+        yield _NOOP
+        return
+    sp = Span(name, parent.id if parent is not None else _current.get(), attrs)
+    token = _current.set(sp.id)
+    status, error = "ok", None
+    try:
+        yield sp
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        sp._finish(status, error)
+
+
+def carry(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    fn, bound to a snapshot of the caller's context (so spans in another
+    thread nest). Each call runs in its own copy of the snapshot: a Context
+    can only be entered by one thread at a time.
+    """
+    ctx = contextvars.copy_context()
+
+    def inner(*args: Any, **kwargs: Any) -> Any:
+        return ctx.copy().run(fn, *args, **kwargs)
+    return inner
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator: run the function inside span(name)."""
+    def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def inner(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def _size(path: str) -> Optional[int]:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+class TracedS3:
+    """boto3 S3 client whose upload_file / download_file are spans."""
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+
+    def upload_file(self, path: str, bucket: str, key: str, *args: Any, **kwargs: Any) -> Any:
+        with span("s3_upload", bucket=bucket, key=key, bytes=_size(path)):
+            return self._client.upload_file(path, bucket, key, *args, **kwargs)
+
+    def download_file(self, bucket: str, key: str, path: str, *args: Any, **kwargs: Any) -> Any:
+        with span("s3_download", bucket=bucket, key=key) as sp:
+            result = self._client.download_file(bucket, key, path, *args, **kwargs)
+            sp.set(bytes=_size(path))
+            return result
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
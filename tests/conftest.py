@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.Filtration import classification_memo
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path_factory, monkeypatch):
+    """
+    Memo, rewrite store, LLM cache and compiled rules go to a fresh temp
+    dir per test instead of ~/.cache/briefly, so no test sees another
+    run's (or the developer's) cached results.
+    """
+    monkeypatch.setenv("BRIEFLY_CACHE_DIR", str(tmp_path_factory.mktemp("briefly_cache")))
+    for name in ("BRIEFLY_MEMO_PATH", "DEEPSEEK_REUSE_PATH", "DEEPSEEK_CACHE_DIR"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(classification_memo, "_DEFAULT_MEMO", None)
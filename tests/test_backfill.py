@@ -0,0 +1,100 @@
+import os
+import sys
+from datetime import date, datetime, timezone
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline import backfill as backfill_mod
+from backend.unipro_pipeline.daily_content_generator import DailyContentGenerator
+from backend.unipro_pipeline.educational_filter_pipeline import EducationalFilterPipeline
+from backend.unipro_pipeline.llm_cache import LLMResponseCache
+from backend.unipro_pipeline.raw_news import _today_filename
+from backend.unipro_pipeline.run_date import date_range, fetch_window, resolve_run_date
+
+
+def test_resolve_run_date_forms(monkeypatch):
+    monkeypatch.delenv("BRIEFLY_RUN_DATE", raising=False)
+    assert resolve_run_date("2025-03-04") == date(2025, 3, 4)
+    assert resolve_run_date("03042025") == date(2025, 3, 4)
+    assert resolve_run_date(datetime(2025, 3, 4, 23, 59)) == date(2025, 3, 4)
+    assert resolve_run_date(None) == date.today()
+    monkeypatch.setenv("BRIEFLY_RUN_DATE", "2025-01-02")
+    assert resolve_run_date(None) == date(2025, 1, 2)
+    with pytest.raises(ValueError):
+        resolve_run_date("March 4th")
+
+
+def test_date_range_and_fetch_window():
+    assert [d.day for d in date_range("2025-01-30", "2025-02-02")] == [30, 31, 1, 2]
+    with pytest.raises(ValueError):
+        date_range("2025-02-02", "2025-01-30")
+
+    utc = timezone.utc
+    since, until = fetch_window(date(2025, 1, 5), now=datetime(2025, 3, 1, 12, tzinfo=utc))
+    assert (since, until) == (datetime(2025, 1, 5, tzinfo=utc), datetime(2025, 1, 6, tzinfo=utc))
+    now = datetime(2025, 3, 1, 12, tzinfo=utc)
+    assert fetch_window(date(2025, 3, 1), now=now) == (datetime(2025, 2, 28, 12, tzinfo=utc), now)
+    # a naive `now` is UTC; the window is always aware
+    since, until = fetch_window(date(2025, 3, 1), now=datetime(2025, 3, 1, 12))
+    assert until == now and since.tzinfo is utc
+    assert since.strftime("%Y-%m-%dT%H:%M:%S") == "2025-02-28T12:00:00"
+
+
+def test_every_stage_stamps_files_with_the_run_date():
+    pipe = EducationalFilterPipeline(
+        deepseek_api_key="k", llm_cache=LLMResponseCache(None), run_date="2024-12-31"
+    )
+    gen = DailyContentGenerator(
+        deepseek_api_key="k", llm_cache=LLMResponseCache(None), run_date="2024-12-31"
+    )
+    assert _today_filename(run_date="2024-12-31") == "RAW_NEWS_12312024.json"
+    assert pipe._raw_filename() == "RAW_NEWS_12312024.json"
+    assert pipe._final_filename() == "DEEPSEEKLISTFOR12312024.json"
+    assert gen.input_filename == pipe._final_filename()
+    assert gen.output_filename == "DAILY_CONTENT_12312024.json"
+
+
+def test_backfill_runs_each_day_in_its_data_dir(tmp_path, monkeypatch):
+    seen = []
+
+    class FakePipeline:
+        def __init__(self, run_date):
+            self.stamp = resolve_run_date(run_date).strftime("%m%d%Y")
+
+        def _final_filename(self):
+            return f"DEEPSEEKLISTFOR{self.stamp}.json"
+
+        def run_complete_pipeline(self):
+            seen.append(("filter", os.getcwd()))
+            if self.stamp != "01022025":  # one bad day
+                open(self._final_filename(), "w").write("{}")
+
+    class FakeGenerator:
+        def __init__(self, run_date):
+            self.output_filename = f"DAILY_CONTENT_{resolve_run_date(run_date):%m%d%Y}.json"
+
+        def generate_daily_content(self):
+            seen.append(("generate", os.getcwd()))
+            open(self.output_filename, "w").write("{}")
+
+    monkeypatch.setattr(backfill_mod, "EducationalFilterPipeline", FakePipeline)
+    monkeypatch.setattr(backfill_mod, "DailyContentGenerator", FakeGenerator)
+
+    results = backfill_mod.backfill("2025-01-01", "2025-01-03", data_dir=str(tmp_path), workers=1)
+
+    assert [r["date"] for r in results] == ["2025-01-01", "2025-01-02", "2025-01-03"]
+    assert [r["ok"] for r in results] == [True, False, True]
+    assert "DEEPSEEKLISTFOR01022025" in results[1]["error"]
+    assert [stage for stage, _ in seen] == ["filter", "generate", "filter", "filter", "generate"]
+    assert {cwd for _, cwd in seen} == {os.path.realpath(str(tmp_path))}
+    assert sorted(os.listdir(tmp_path)) == [
+        "DAILY_CONTENT_01012025.json", "DAILY_CONTENT_01032025.json",
+        "DEEPSEEKLISTFOR01012025.json", "DEEPSEEKLISTFOR01032025.json",
+    ]
+
+
+def test_backfill_rejects_unknown_stage(tmp_path):
+    with pytest.raises(ValueError):
+        backfill_mod.backfill("2025-01-01", "2025-01-01", data_dir=str(tmp_path), stages=["rank"])
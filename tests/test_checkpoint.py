@@ -0,0 +1,137 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.checkpoint import StageCheckpoint, hash_json, manifest_path_for
+from backend.unipro_pipeline.daily_content_generator import DailyContentGenerator
+from backend.unipro_pipeline.llm_cache import LLMResponseCache
+from backend.unipro_pipeline.rewrite_store import RewriteStore
+
+
+def test_complete_manifest_skips_same_inputs_only(tmp_path):
+    out = tmp_path / "OUT.json"
+    out.write_text("{}")
+    first = StageCheckpoint("s", str(out), "in-1", {"k": 1}, enabled=True)
+    assert not first.is_fresh()
+    first.complete()
+
+    assert StageCheckpoint("s", str(out), "in-1", {"k": 1}, enabled=True).is_fresh()
+    assert not StageCheckpoint("s", str(out), "in-2", {"k": 1}, enabled=True).is_fresh()
+    assert not StageCheckpoint("s", str(out), "in-1", {"k": 2}, enabled=True).is_fresh()
+
+    out.unlink()
+    assert not StageCheckpoint("s", str(out), "in-1", {"k": 1}, enabled=True).is_fresh()
+
+
+def test_partial_progress_survives_only_for_same_inputs(tmp_path, monkeypatch):
+    out = str(tmp_path / "OUT.json")
+    synced = []
+    ckpt = StageCheckpoint("s", out, "in", {}, enabled=True, on_write=synced.append, sync_every=1)
+    ckpt.record_item("rewrites", "3", {"title": "t"})
+    ckpt.record_item("rewrites", "5", {"title": "u"})
+
+    saved = json.loads(open(manifest_path_for(out)).read())
+    assert saved["complete"] is False and sorted(saved["partial"]["rewrites"]) == ["3", "5"]
+    assert synced == [manifest_path_for(out)] * 2
+
+    assert StageCheckpoint("s", out, "in", {}, enabled=True).partial["rewrites"]["3"] == {"title": "t"}
+    assert StageCheckpoint("s", out, "other", {}, enabled=True).partial == {}
+
+    monkeypatch.setenv("BRIEFLY_CHECKPOINT", "off")
+    off = StageCheckpoint("s", out, "in", {})
+    assert off.partial == {}
+    off.complete()
+    assert json.loads(open(manifest_path_for(out)).read())["complete"] is False
+
+
+def make_generator():
+    return DailyContentGenerator(
+        deepseek_api_key="k", llm_cache=LLMResponseCache(None),
+        rewrite_store=RewriteStore(":memory:"), local_strategy="none", max_workers=3,
+    )
+
+
+def test_generator_resumes_rewrites_after_a_crash(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BRIEFLY_CHECKPOINT", "on")
+    articles = [
+        {"id": i, "title": f"Title {i}", "description": "d", "educational_ranking": {"rank": i}}
+        for i in range(1, 11)
+    ]
+    calls = []
+
+    gen = make_generator()
+    with open(gen.input_filename, "w", encoding="utf-8") as f:
+        json.dump({"articles": articles}, f)
+
+    def flaky_call(article):
+        calls.append(article["id"])
+        if article["id"] == 7:
+            raise RuntimeError("boom")
+        return {"title": f"New {article['id']}", "description": "d"}
+
+    def crash(article):
+        raise SystemExit("lambda died")
+
+    monkeypatch.setattr(gen, "_call_deepseek_for_article", flaky_call)
+    monkeypatch.setattr(gen, "_local_rewrite", crash)
+    try:
+        gen.generate_daily_content()
+    except SystemExit:
+        pass
+    assert not os.path.exists(gen.output_filename)
+
+    calls.clear()
+    rerun = make_generator()
+    monkeypatch.setattr(
+        rerun, "_call_deepseek_for_article",
+        lambda a: calls.append(a["id"]) or {"title": f"New {a['id']}", "description": "d"},
+    )
+    rerun.generate_daily_content()
+
+    assert calls == [7]
+    out = json.loads(open(rerun.output_filename).read())
+    assert out["metadata"]["strategies"] == {"resumed": 9, "deepseek": 1}
+
+    # third run: nothing changed, nothing to do
+    calls.clear()
+    again = make_generator()
+    monkeypatch.setattr(again, "_call_deepseek_for_article", lambda a: calls.append(a["id"]))
+    again.generate_daily_content()
+    assert calls == []
+    assert hash_json(articles) == again.checkpoint.input_hash
+
+
+def test_item_uploads_are_debounced_and_run_outside_the_lock(tmp_path):
+    out = str(tmp_path / "OUT.json")
+    synced = []
+
+    def upload(path):
+        # a record from another rewrite thread must not wait on this "S3" call
+        assert not ckpt._lock.locked()
+        synced.append(json.loads(open(path).read())["complete"])
+
+    ckpt = StageCheckpoint("s", out, "in", {}, enabled=True, on_write=upload, sync_every=3)
+    for i in range(7):
+        ckpt.record_item("rewrites", str(i), {"title": str(i)})
+    assert synced == [False, False]  # after items 3 and 6
+
+    ckpt.record("ranking", [1, 2])
+    ckpt.complete()
+    assert synced == [False, False, False, True]
+
+
+def test_records_after_complete_keep_the_manifest_finished(tmp_path):
+    out = tmp_path / "OUT.json"
+    out.write_text("{}")
+    ckpt = StageCheckpoint("s", str(out), "in", {}, enabled=True)
+    ckpt.complete()
+    # a rewrite that outlived the deadline finishes after the stage did
+    ckpt.record_item("rewrites", "late", {"title": "late"})
+    ckpt.record("ranking", [1])
+
+    again = StageCheckpoint("s", str(out), "in", {}, enabled=True)
+    assert again.is_fresh()
+    assert again.partial == {}
@@ -0,0 +1,117 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.Filtration.classification_memo import ClassificationMemo
+from backend.Filtration.educational_article_analyzer import EducationalArticleAnalyzer
+
+
+def test_memory_layer_hits_and_lru_eviction():
+    memo = ClassificationMemo(rules_version="v1", max_items=2, use_disk=False)
+
+    memo.put("candidate", "a", {"base_label": "NEUTRAL"})
+    memo.put("candidate", "b", {"base_label": "IMPORTANT"})
+    assert memo.get("candidate", "a") == {"base_label": "NEUTRAL"}
+
+    memo.put("candidate", "c", {"base_label": "REMOVE"})  # evicts "b"
+
+    assert memo.get("candidate", "b") is None
+    assert memo.get("candidate", "c") == {"base_label": "REMOVE"}
+    assert memo.stats["memory_hits"] == 2
+    assert memo.stats["misses"] == 1
+
+
+def test_disk_layer_survives_new_instance(tmp_path):
+    path = str(tmp_path / "memo.sqlite")
+
+    first = ClassificationMemo(path=path, rules_version="v1")
+    first.put("candidate", "some text", {"educational_score": 4})
+    first.close()
+
+    second = ClassificationMemo(path=path, rules_version="v1")
+    assert second.get("candidate", "some text") == {"educational_score": 4}
+    assert second.stats["disk_hits"] == 1
+
+
+def test_rules_version_change_invalidates_disk_rows(tmp_path):
+    path = str(tmp_path / "memo.sqlite")
+
+    old = ClassificationMemo(path=path, rules_version="v1")
+    old.put("candidate", "some text", {"educational_score": 4})
+    old.close()
+
+    new = ClassificationMemo(path=path, rules_version="v2")
+    assert new.get("candidate", "some text") is None
+    count = new._db.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+    assert count == 0
+
+
+def test_analyzer_reuses_memoized_annotation():
+    memo = ClassificationMemo(rules_version="v1", use_disk=False)
+    analyzer = EducationalArticleAnalyzer(memo=memo)
+    article = {"id": 7, "title": "Why bank loans matter", "description": "", "content": ""}
+
+    first = analyzer.annotate_article(article)
+    second = analyzer.annotate_article(dict(article, id=8))
+
+    assert memo.stats["memory_hits"] == 1
+    assert second["id"] == 8
+    assert second["sector"] == first["sector"]
+    assert second["educational_score"] == first["educational_score"]
+
+
+def test_custom_filter_does_not_share_memoized_labels():
+    class RemoveEverything:
+        def classify_text(self, text):
+            return "REMOVE"
+
+    memo = ClassificationMemo(rules_version="v1", use_disk=False)
+    article = {"id": 7, "title": "Why bank loans matter", "description": "", "content": ""}
+    default_label = EducationalArticleAnalyzer(memo=memo).annotate_article(article)["base_label"]
+
+    custom = EducationalArticleAnalyzer(base_filter=RemoveEverything(), memo=memo)
+    assert custom.memo is None
+    assert custom.annotate_article(article)["base_label"] == "REMOVE"
+    assert default_label != "REMOVE"
+    assert memo.stats["memory_hits"] == 0
+
+
+def test_concurrent_writers_share_the_file(tmp_path):
+    import threading
+
+    path = str(tmp_path / "memo.sqlite")
+    memos = [ClassificationMemo(path=path, rules_version="v1") for _ in range(4)]
+
+    def write(i, memo):
+        for j in range(100):
+            memo.put("candidate", f"text {i} {j}", {"n": j})
+
+    threads = [threading.Thread(target=write, args=(i, m)) for i, m in enumerate(memos)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(m._db is not None for m in memos)
+    fresh = ClassificationMemo(path=path, rules_version="v1")
+    assert fresh.get("candidate", "text 3 99") == {"n": 99}
+
+
+def test_locked_file_falls_back_to_memory(tmp_path, monkeypatch):
+    import sqlite3
+
+    from backend.Filtration import classification_memo
+
+    monkeypatch.setattr(classification_memo, "_BUSY_TIMEOUT", 0.05)
+    path = str(tmp_path / "memo.sqlite")
+    memo = ClassificationMemo(path=path, rules_version="v1")
+
+    other = sqlite3.connect(path)
+    other.execute("BEGIN EXCLUSIVE")  # another worker holding the write lock
+    memo.put("candidate", "text", {"base_label": "IMPORTANT"})
+    other.rollback()
+
+    assert memo._db is None
+    assert memo.get("candidate", "text") == {"base_label": "IMPORTANT"}
+    memo.put("candidate", "more", {"base_label": "NEUTRAL"})  # memory only, no error
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline import coldstart
+from backend.unipro_pipeline.coldstart import HANDLER_MODULES, audit, parse_importtime
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:      1848 |      48087 | site
+import time:       198 |        198 |     backend
+import time:       149 |        346 |   backend.unipro_pipeline
+import time:     99000 |      99500 |   requests
+import time:      4817 |     104663 | backend.unipro_pipeline.raw_news
+"""
+
+
+def test_parse_importtime_rows_and_depth():
+    rows = parse_importtime(SAMPLE)
+    assert [r["name"] for r in rows] == [
+        "site", "backend", "backend.unipro_pipeline", "requests", "backend.unipro_pipeline.raw_news",
+    ]
+    assert [r["depth"] for r in rows] == [0, 2, 1, 1, 0]
+    assert rows[-1]["cumulative_us"] == 104663 and rows[-1]["self_us"] == 4817
+
+
+def test_eager_heavy_import_fails_the_budget(monkeypatch):
+    monkeypatch.setattr(coldstart, "measure", lambda module: parse_importtime(SAMPLE))
+    (r,) = audit(["backend.unipro_pipeline.raw_news"], budget_ms=500, repeat=1)
+    assert r["import_ms"] == 104.7
+    assert r["eager_heavy"] == ["requests"]
+    assert r["slowest"][0]["name"] == "requests"
+    assert not r["ok"]
+
+
+def test_handler_modules_import_without_heavy_dependencies():
+    # generous budget: the timing budget is for `make coldstart`, this pins the lazy imports
+    results = audit(HANDLER_MODULES, budget_ms=10_000, repeat=1)
+    for r in results:
+        assert r["eager_heavy"] == [], r
+        assert r["ok"]
+
+
+STANDALONE_FILES = (
+    "backend/unipro_pipeline/daily_content_generator.py",
+    "backend/unipro_pipeline/educational_filter_pipeline.py",
+    "backend/unipro_pipeline/raw_news.py",
+    "backend/Filtration/article_filter.py",
+    "backend/Filtration/educational_article_analyzer.py",
+    "backend/Filtration/deepseek_educational_article_analyzer.py",
+)
+
+
+@pytest.mark.parametrize("path", STANDALONE_FILES)
+def test_stage_files_load_outside_the_package(path):
+    # `python backend/unipro_pipeline/<stage>.py`, or a Lambda handler loaded as a top-level module
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    script = f"import runpy; runpy.run_path({os.path.basename(path)!r}, run_name='handler')"
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.join(coldstart.REPO_ROOT, os.path.dirname(path)), env=env, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
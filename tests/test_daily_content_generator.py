@@ -0,0 +1,238 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.daily_content_generator import DailyContentGenerator
+from backend.unipro_pipeline.llm_cache import LLMResponseCache
+from backend.unipro_pipeline.rewrite_store import RewriteStore
+
+
+def make_generator(**kwargs):
+    # no response cache, so every test really goes through the call path
+    return DailyContentGenerator(
+        deepseek_api_key="k",
+        llm_cache=LLMResponseCache(None),
+        rewrite_store=RewriteStore(":memory:"),
+        **kwargs,
+    )
+
+
+def make_articles(n):
+    return [
+        {"id": i, "title": f"Title {i}", "description": f"Desc {i}",
+         "educational_ranking": {"rank": i}}
+        for i in range(1, n + 1)
+    ]
+
+
+def test_rewrite_all_runs_concurrently_and_keeps_order(monkeypatch):
+    gen = make_generator(max_workers=5)
+    in_flight = []
+    lock = threading.Lock()
+    peak = [0]
+
+    def fake_call(article):
+        with lock:
+            in_flight.append(article["id"])
+            peak[0] = max(peak[0], len(in_flight))
+        # later ids finish first
+        time.sleep(0.05 * (6 - article["id"]))
+        with lock:
+            in_flight.remove(article["id"])
+        return {"title": f"New {article['id']}", "description": "d"}
+
+    monkeypatch.setattr(gen, "_call_deepseek_for_article", fake_call)
+
+    results = gen._rewrite_all(make_articles(5))
+
+    assert [r["title"] for r in results] == [f"New {i}" for i in range(1, 6)]
+    assert peak[0] > 1
+
+
+def test_rewrite_all_falls_back_on_error_and_deadline(monkeypatch):
+    gen = make_generator(max_workers=3, overall_deadline=0.2, local_strategy="none")
+
+    def fake_call(article):
+        if article["id"] == 2:
+            raise RuntimeError("boom")
+        if article["id"] == 3:
+            time.sleep(1.0)
+        return {"title": "ok", "description": "d"}
+
+    monkeypatch.setattr(gen, "_call_deepseek_for_article", fake_call)
+
+    results = gen._rewrite_all(make_articles(3))
+
+    assert results[0]["title"] == "ok"
+    assert results[1]["title"] == "Explainer: Title 2"
+    assert results[2]["title"] == "Explainer: Title 3"
+    assert [r["strategy"] for r in results] == ["deepseek", "fallback", "fallback"]
+
+
+def test_rewrite_all_degrades_to_local_strategy_when_deadline_at_risk(monkeypatch):
+    gen = make_generator(max_workers=1, overall_deadline=0.5, local_strategy="fast")
+    gen.expected_latency = 0.3
+    called = []
+
+    def fake_call(article):
+        called.append(article["id"])
+        time.sleep(0.3)
+        return {"title": "ok", "description": "d"}
+
+    monkeypatch.setattr(gen, "_call_deepseek_for_article", fake_call)
+    results = gen._rewrite_all(make_articles(4))
+
+    # one call fits in the budget; the rest are routed locally up front
+    assert called == [1]
+    assert [r["strategy"] for r in results] == ["deepseek"] + ["FastAIStrategy"] * 3
+    assert results[1]["title"] == "Title 2. Desc 2"
+    assert results[1]["description"] == "Title 2. Desc 2."
+
+
+def test_plan_batches_respects_size_and_token_budget():
+    gen = make_generator(rewrite_mode="batch")
+    gen.max_batch_size = 3
+    articles = make_articles(7)
+
+    assert [len(b) for b in gen._plan_batches(articles)] == [3, 3, 1]
+
+    overhead = gen._batch_overhead_tokens()
+    gen.batch_token_budget = overhead + 1
+    assert [len(b) for b in gen._plan_batches(articles)] == [1] * 7
+
+
+def test_rewrite_batch_bisects_on_bad_reply_and_retries_missing_ids(monkeypatch):
+    gen = make_generator(rewrite_mode="batch")
+    calls = []
+
+    def fake_batch(articles):
+        ids = [a["id"] for a in articles]
+        calls.append(ids)
+        if len(articles) == 4:
+            return None  # unparseable -> split
+        # model silently drops the last id of each half
+        return {str(a["id"]): {"title": f"B{a['id']}", "description": "d"} for a in articles[:-1]}
+
+    def fake_single(article):
+        return {"title": f"S{article['id']}", "description": "d"}
+
+    monkeypatch.setattr(gen, "_call_deepseek_for_batch", fake_batch)
+    monkeypatch.setattr(gen, "_call_deepseek_for_article", fake_single)
+
+    result = gen._rewrite_batch(make_articles(4))
+
+    assert calls == [[1, 2, 3, 4], [1, 2], [3, 4]]
+    assert {k: v["title"] for k, v in result.items()} == {
+        "1": "B1", "2": "S2", "3": "B3", "4": "S4",
+    }
+
+
+def test_batch_reply_with_only_unknown_ids_does_not_loop(monkeypatch):
+    gen = make_generator(rewrite_mode="batch")
+    calls = []
+
+    def fake_post(messages, max_tokens, label):
+        calls.append(label)
+        return '[{"id": "a1", "title": "T", "description": "D"}]'
+
+    def fake_single(article):
+        return {"title": f"S{article['id']}", "description": "d"}
+
+    monkeypatch.setattr(gen, "_post_deepseek", fake_post)
+    monkeypatch.setattr(gen, "_call_deepseek_for_article", fake_single)
+
+    result = gen._rewrite_batch(make_articles(4))
+
+    # 4 -> bisect into 2 + 2 -> bisect into singles on the per-article path
+    assert calls == ["batch ids=1,2,3,4", "batch ids=1,2", "batch ids=3,4"]
+    assert {k: v["title"] for k, v in result.items()} == {
+        "1": "S1", "2": "S2", "3": "S3", "4": "S4",
+    }
+
+
+def test_rewrite_batch_goes_one_by_one_when_a_batch_makes_no_progress(monkeypatch):
+    gen = make_generator(rewrite_mode="batch")
+    calls = []
+
+    def fake_batch(articles):
+        calls.append([a["id"] for a in articles])
+        return {}
+
+    monkeypatch.setattr(gen, "_call_deepseek_for_batch", fake_batch)
+    monkeypatch.setattr(
+        gen, "_call_deepseek_for_article",
+        lambda art: {"title": f"S{art['id']}", "description": "d"},
+    )
+
+    result = gen._rewrite_batch(make_articles(3))
+
+    assert calls == [[1, 2, 3]]
+    assert sorted(result) == ["1", "2", "3"]
+
+
+def test_batch_mode_parses_array_reply(monkeypatch):
+    gen = make_generator(rewrite_mode="batch")
+    reply = '```json\n[{"id": 1, "title": " A ", "description": "x"}, {"id": "2", "title": "B", "description": "y"}]\n```'
+    monkeypatch.setattr(gen, "_post_deepseek", lambda messages, max_tokens, label: reply)
+
+    results = gen._rewrite_all(make_articles(2))
+
+    assert [r["title"] for r in results] == ["A", "B"]
+
+
+def test_batch_mode_keeps_complete_items_from_truncated_reply(monkeypatch):
+    gen = make_generator(rewrite_mode="batch")
+    reply = '[{"id": 1, "title": "T1", "description": "D1"}, {"id": 2, "title": "T2", "desc'
+    monkeypatch.setattr(gen, "_post_deepseek", lambda messages, max_tokens, label: reply)
+    out = gen._call_deepseek_for_batch([{"id": 1, "title": "a"}, {"id": 2, "title": "b"}])
+    assert list(out) == ["1"]
+    assert out["1"]["title"] == "T1"
+
+
+def test_rewrite_all_reuses_near_duplicate_rewrites(monkeypatch):
+    gen = make_generator()
+    gen.rewrite_store.store("Title 1 about markets today", {"title": "Old 1", "description": "od"})
+    called = []
+
+    def fake_call(article):
+        called.append(article["id"])
+        return {"title": f"New {article['id']}", "description": "d"}
+
+    monkeypatch.setattr(gen, "_call_deepseek_for_article", fake_call)
+    articles = [
+        {"id": 1, "title": "Title 1 about markets today!"},
+        {"id": 2, "title": "Something else entirely"},
+    ]
+    results = gen._rewrite_all(articles)
+
+    assert called == [2]
+    assert results[0]["title"] == "Old 1" and results[0]["strategy"] == "reused"
+    # the fresh rewrite is stored for next time
+    assert gen.rewrite_store.lookup("Something else entirely")["title"] == "New 2"
+
+
+def test_rewrite_all_uses_speculative_rewrites(tmp_path, monkeypatch):
+    import json
+
+    gen = make_generator()
+    gen.speculative_filename = str(tmp_path / "spec.json")
+    with open(gen.speculative_filename, "w") as f:
+        json.dump({"rewrites": {
+            "1": {"title": "S1", "description": "sd", "source_title": "Title 1"},
+            "2": {"title": "S2", "description": "sd", "source_title": "an older headline"},
+        }}, f)
+    called = []
+
+    def fake_call(article):
+        called.append(article["id"])
+        return {"title": f"New {article['id']}", "description": "d"}
+
+    monkeypatch.setattr(gen, "_call_deepseek_for_article", fake_call)
+    results = gen._rewrite_all(make_articles(2))
+
+    assert called == [2]  # title changed since the speculation -> not used
+    assert results[0] == {"title": "S1", "description": "sd", "strategy": "speculative"}
+    assert gen.speculative_stats == {"available": 2, "used": 1}
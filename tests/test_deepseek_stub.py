@@ -0,0 +1,66 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.daily_content_generator import DailyContentGenerator
+from backend.unipro_pipeline.deepseek_stub import StubConfig, serve_in_thread
+from backend.unipro_pipeline.educational_filter_pipeline import EducationalFilterPipeline
+from backend.unipro_pipeline.llm_cache import LLMResponseCache
+from backend.unipro_pipeline.rewrite_store import RewriteStore
+from backend.unipro_pipeline.llm_client import LLMClient
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**kwargs):
+        server, url = serve_in_thread(StubConfig(**kwargs))
+        servers.append(server)
+        return url
+
+    yield start
+    for s in servers:
+        s.shutdown()
+        s.server_close()
+
+
+def fast_client(url, **kwargs):
+    return LLMClient("k", url, base_delay=0.01, max_delay=0.05, **kwargs)
+
+
+def test_ranking_against_fenced_stub(stub, tmp_path):
+    url = stub(rate_fence=1.0)
+    pipe = EducationalFilterPipeline(
+        deepseek_api_key="k", llm_cache=LLMResponseCache(None), deepseek_url=url
+    )
+    candidates = [
+        {"id": i, "title": f"t{i}", "description": "d", "base_label": "IMPORTANT", "educational_score": 1}
+        for i in range(1, 21)
+    ]
+    path = tmp_path / "filters.json"
+    path.write_text(json.dumps({"articles": candidates}))
+
+    picks = pipe.call_deepseek(str(path))
+    assert [p["id"] for p in picks] == list(range(1, 13))
+    assert len({p["sector"] for p in picks}) >= 4
+    assert pipe.prompt_cache_stats.snapshot()["calls"] == 1
+
+
+def test_rewrites_survive_429_and_truncation(stub):
+    url = stub(rate_429=0.3, rate_truncate=0.3, retry_after=0.01, seed=3)
+    gen = DailyContentGenerator(
+        deepseek_api_key="k",
+        llm_cache=LLMResponseCache(None),
+        rewrite_mode="batch",
+        llm_client=fast_client(url, max_attempts=6),
+        rewrite_store=RewriteStore(":memory:"),
+    )
+    articles = [{"id": i, "title": f"Rates story {i}", "description": "d"} for i in range(1, 9)]
+    out = gen._rewrite_all(articles)
+    assert len(out) == 8
+    assert sum(r["title"].startswith("What Rates story") for r in out) >= 6
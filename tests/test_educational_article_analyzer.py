@@ -183,3 +183,35 @@ def test_select_top_for_deepseek_limits_and_shapes_output():
 
     assert first["rank"] == 1
     assert second["rank"] == 2
+
+
+def test_infer_sector_matches_whole_tokens_only():
+    analyzer = make_analyzer_with_fake_filter()
+    article = {
+        "title": "Retail sales slow, CEO said",
+        "description": "Shoppers pull back at big-box stores",
+        "content": "",
+    }
+
+    sector, confidence = analyzer.infer_sector_with_confidence(article)
+
+    # "ai" inside "said"/"retail" no longer votes for Technology
+    assert sector == "Consumer"
+    assert confidence == 1.0
+
+
+def test_infer_sector_weighted_vote_and_confidence():
+    analyzer = make_analyzer_with_fake_filter()
+    article = {
+        "title": "Banks fund new semiconductor factory",
+        "description": "Chip makers expand manufacturing",
+        "content": "",
+    }
+
+    sector, confidence = analyzer.infer_sector_with_confidence(article)
+
+    # Technology 3.0 (semiconductor + chip) ties Industrials 3.0
+    # (factory + manufacturing); the sector mentioned first wins
+    assert sector == "Technology"
+    assert confidence == 0.4
+    assert analyzer.infer_sector({"title": "Quiet day", "description": ""}) == "Unknown"
@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.educational_filter_pipeline import EducationalFilterPipeline
+from backend.unipro_pipeline.llm_cache import LLMResponseCache
+
+
+def make_pipeline(**kwargs):
+    return EducationalFilterPipeline(
+        deepseek_api_key="k", llm_cache=LLMResponseCache(None), **kwargs
+    )
+
+
+def make_candidates(n):
+    return [
+        {"id": i, "title": f"story {i}", "description": "d", "base_label": "NEUTRAL",
+         "educational_score": n - i}
+        for i in range(1, n + 1)
+    ]
+
+
+def write_filters(tmp_path, candidates):
+    path = tmp_path / "FILTERSFORDEEPSEEK_01012025.json"
+    path.write_text(json.dumps({"articles": candidates}))
+    return str(path)
+
+
+def test_sharded_ranking_runs_shards_then_final_round(tmp_path, monkeypatch):
+    pipe = make_pipeline(rank_mode="sharded")
+    pipe.shard_size, pipe.shard_keep = 10, 3
+    calls = []
+    lock = threading.Lock()
+
+    def fake_rank(candidates, label="ranking"):
+        with lock:
+            calls.append((label, [c["id"] for c in candidates]))
+        # pick the highest ids, best first
+        ordered = sorted(candidates, key=lambda c: -c["id"])
+        return [
+            {"id": c["id"], "final_rank": r + 1, "sector": "Markets", "section": "S"}
+            for r, c in enumerate(ordered)
+        ], {"candidates_sent": len(candidates)}
+
+    monkeypatch.setattr(pipe, "_rank_candidates", fake_rank)
+    picks = pipe.call_deepseek(write_filters(tmp_path, make_candidates(45)))
+
+    shard_calls = [c for c in calls if c[0].startswith("shard")]
+    final_calls = [c for c in calls if c[0] == "final round"]
+    assert len(shard_calls) == 5
+    assert sorted(i for _, ids in shard_calls for i in ids) == list(range(1, 46))
+    assert len(final_calls) == 1 and len(final_calls[0][1]) == 15
+    assert picks[0]["id"] == 45
+    assert pipe.prompt_stats["mode"] == "sharded"
+
+
+def test_sharded_ranking_falls_back_to_shard_winners(tmp_path, monkeypatch):
+    pipe = make_pipeline(rank_mode="sharded")
+    pipe.shard_size, pipe.shard_keep = 10, 2
+
+    def fake_rank(candidates, label="ranking"):
+        if label == "final round":
+            return [], {}
+        return [{"id": candidates[0]["id"], "final_rank": 1}], {}
+
+    monkeypatch.setattr(pipe, "_rank_candidates", fake_rank)
+    picks = pipe.call_deepseek(write_filters(tmp_path, make_candidates(25)))
+    assert [p["id"] for p in picks] == [1, 2, 3]
+    assert [p["final_rank"] for p in picks] == [1, 2, 3]
+
+
+def test_single_mode_uses_one_call(tmp_path, monkeypatch):
+    pipe = make_pipeline(rank_mode="single")
+    labels = []
+    monkeypatch.setattr(
+        pipe, "_rank_candidates", lambda c, label="ranking": (labels.append(label) or [], {})
+    )
+    pipe.call_deepseek(write_filters(tmp_path, make_candidates(45)))
+    assert labels == ["ranking"]
+
+
+class ReversingPreRanker:
+    def rank(self, articles):
+        return list(reversed(articles))
+
+
+def make_raw(n):
+    return [
+        {"id": i, "title": f"Federal Reserve raises interest rates as inflation hits stocks {i}",
+         "description": "The central bank said the economy and earnings outlook changed",
+         "url": f"https://example.com/{i}", "source": "example"}
+        for i in range(1, n + 1)
+    ]
+
+
+def test_prerank_keep_only_cuts_the_single_prompt_pool():
+    single = make_pipeline(pre_ranker=ReversingPreRanker())
+    single.prerank_pool, single.prerank_keep = 90, 20
+    assert single.build_candidates(make_raw(100), max_candidates=30)["selected_count"] == 20
+
+    sharded = make_pipeline(rank_mode="sharded", pre_ranker=ReversingPreRanker())
+    sharded.prerank_pool, sharded.prerank_keep = 90, 20
+    summary = sharded.build_candidates(make_raw(100), max_candidates=60)
+    assert summary["selected_count"] == 60
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.llm_cache import (
+    DiskCacheBackend,
+    LLMResponseCache,
+    S3CacheBackend,
+    cache_key,
+)
+
+
+def test_cache_key_depends_on_every_request_field():
+    base = cache_key("deepseek-chat", 0.3, 1500, "prompt")
+
+    assert base == cache_key("deepseek-chat", 0.3, 1500, "prompt")
+    assert base != cache_key("deepseek-chat", 0.5, 1500, "prompt")
+    assert base != cache_key("deepseek-chat", 0.3, 400, "prompt")
+    assert base != cache_key("other-model", 0.3, 1500, "prompt")
+    assert base != cache_key("deepseek-chat", 0.3, 1500, "prompt!")
+
+
+def test_disk_cache_roundtrip_stats_and_ttl(tmp_path):
+    cache = LLMResponseCache(DiskCacheBackend(str(tmp_path)), ttl=60)
+    key = cache_key("m", 0.1, 10, "p")
+
+    assert cache.get(key) is None
+    cache.set(key, [{"id": 1, "final_rank": 1}])
+    assert cache.get(key) == [{"id": 1, "final_rank": 1}]
+
+    # a new instance (next run) sees the same entry
+    again = LLMResponseCache(DiskCacheBackend(str(tmp_path)), ttl=60)
+    assert again.get(key) == [{"id": 1, "final_rank": 1}]
+
+    expired = LLMResponseCache(DiskCacheBackend(str(tmp_path)), ttl=0.01)
+    time.sleep(0.02)
+    assert expired.get(key) is None
+    assert expired.snapshot()["expired"] == 1
+    assert cache.snapshot() == {
+        "backend": "DiskCacheBackend", "hits": 1, "misses": 1, "expired": 0, "stores": 1,
+    }
+
+
+def test_disk_backend_evicts_oldest_entries(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path), max_entries=2)
+    for i, key in enumerate(["aa1", "bb2", "cc3"]):
+        backend.set(key, time.time(), i)
+        os.utime(backend._path(key), (1000 + i, 1000 + i))
+
+    assert backend.evict() == 1
+    assert backend.get("aa1") is None
+    assert backend.get("cc3")[1] == 2
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+    def get_object(self, Bucket, Key):
+        import io
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+def test_s3_backend_uses_prefix_and_reads_back():
+    s3 = FakeS3()
+    backend = S3CacheBackend("bucket", prefix="LLMCache/", client=s3)
+    backend.evict = lambda: 0
+    cache = LLMResponseCache(backend)
+
+    cache.set("abc", {"title": "t"})
+
+    assert list(s3.objects) == ["LLMCache/abc.json"]
+    assert cache.get("abc") == {"title": "t"}
+    assert cache.get("missing") is None
@@ -0,0 +1,165 @@
+import os
+import random
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.llm_client import (
+    LLMCallError,
+    LLMClient,
+    limit_concurrency,
+    parse_retry_after,
+)
+
+
+class FakeResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status_code = status
+        self._body = body
+        self.headers = headers or {}
+        self.text = str(body)
+
+    def json(self):
+        if isinstance(self._body, Exception):
+            raise self._body
+        return self._body
+
+
+def make_client(responses, **kwargs):
+    calls = []
+    sleeps = []
+
+    def post(url, headers=None, json=None, timeout=None):
+        calls.append(timeout)
+        r = responses.pop(0)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    client = LLMClient(
+        "k",
+        "http://llm.test",
+        post=post,
+        sleep=sleeps.append,
+        rng=random.Random(1),
+        **kwargs,
+    )
+    return client, calls, sleeps
+
+
+def test_retries_transient_errors_then_succeeds():
+    ok = FakeResponse(200, {"choices": []})
+    client, calls, sleeps = make_client(
+        [requests.ConnectionError("reset"), FakeResponse(502, "bad gateway"), ok],
+        max_attempts=4,
+        base_delay=1,
+        max_delay=10,
+    )
+    assert client.chat({"x": 1}, "t") == {"choices": []}
+    assert len(calls) == 3
+    # full jitter: each wait is within [0, base * 2**attempt]
+    assert 0 <= sleeps[0] <= 1 and 0 <= sleeps[1] <= 2
+
+
+def test_honours_retry_after_on_429():
+    client, _, sleeps = make_client(
+        [FakeResponse(429, "slow down", {"Retry-After": "3"}), FakeResponse(200, {"ok": 1})],
+        deadline=30,
+    )
+    assert client.chat({}, "t") == {"ok": 1}
+    assert sleeps == [3.0]
+
+
+def test_fatal_status_is_not_retried():
+    client, calls, _ = make_client([FakeResponse(401, "no key"), FakeResponse(200, {})])
+    with pytest.raises(LLMCallError) as err:
+        client.chat({}, "t")
+    assert err.value.status == 401
+    assert len(calls) == 1
+
+
+def test_conflict_is_not_retried():
+    client, calls, _ = make_client([FakeResponse(409, "conflict"), FakeResponse(200, {})])
+    with pytest.raises(LLMCallError) as err:
+        client.chat({}, "t")
+    assert err.value.status == 409
+    assert len(calls) == 1
+
+
+def test_zero_deadline_sends_nothing(monkeypatch):
+    monkeypatch.setenv("DEEPSEEK_CALL_DEADLINE", "90")
+    client, calls, _ = make_client([FakeResponse(200, {})], deadline=0)
+    assert client.deadline == 0
+    with pytest.raises(LLMCallError) as err:
+        client.chat({}, "t")
+    assert calls == []
+    assert err.value.attempts == 0
+    assert "0 attempt(s)" in str(err.value)
+
+
+def test_gives_up_when_retry_after_exceeds_deadline():
+    client, calls, sleeps = make_client(
+        [FakeResponse(503, "busy", {"Retry-After": "120"}), FakeResponse(200, {})],
+        deadline=10,
+        request_timeout=60,
+    )
+    with pytest.raises(LLMCallError):
+        client.chat({}, "t")
+    assert sleeps == []
+    # attempt timeout is cut to the time left
+    assert calls[0] <= 10
+
+
+def test_parse_retry_after_http_date():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+    assert parse_retry_after("soon") is None
+
+
+def test_calls_are_metered():
+    usage = {"prompt_tokens": 50, "completion_tokens": 5}
+    client, _, _ = make_client(
+        [FakeResponse(500, "oops"), FakeResponse(200, {"usage": usage}), FakeResponse(404, "gone")]
+    )
+    client.chat({"model": "deepseek-chat"}, "t", stage="rewrite")
+    with pytest.raises(LLMCallError):
+        client.chat({"model": "deepseek-chat"}, "t", stage="ranking")
+    calls = client.meter.calls
+    assert [(c["stage"], c["status"], c["attempts"]) for c in calls] == [
+        ("rewrite", 200, 2),
+        ("ranking", 404, 1),
+    ]
+    assert calls[0]["prompt_tokens"] == 50
+
+
+def test_limit_concurrency_caps_requests_across_clients():
+    lock = threading.Lock()
+    in_flight, peak = [0], [0]
+
+    def post(url, headers=None, json=None, timeout=None):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return FakeResponse(200, {"choices": []})
+
+    clients = [LLMClient("k", "http://llm.test", post=post) for _ in range(3)]
+    limit_concurrency(threading.BoundedSemaphore(2))
+    try:
+        threads = [
+            threading.Thread(target=c.chat, args=({"model": "m"},))
+            for c in clients for _ in range(3)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        limit_concurrency(None)
+    assert peak[0] == 2
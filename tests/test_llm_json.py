@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.llm_json import parse_items, parse_object
+
+
+def test_parse_object_ignores_fences_and_chatter():
+    reply = 'Sure! ```json\n{"title": "A", "description": "B"}\n``` hope it helps'
+    assert parse_object(reply) == {"title": "A", "description": "B"}
+    assert parse_object('```json\n{"title": "A"}\n```') == {"title": "A"}
+    assert parse_object("no json here") is None
+
+
+def test_parse_items_clean_array():
+    parsed = parse_items('[{"id": 1}, {"id": 2}]', expected_ids=[1, 2])
+    assert parsed.complete
+    assert [i["id"] for i in parsed.items] == [1, 2]
+    assert parsed.missing_ids == []
+
+
+def test_parse_items_recovers_truncated_array_and_reports_missing():
+    reply = '```json\n[{"id": 1, "title": "x"}, {"id": 2, "title": "y"}, {"id": 3, "title": "cut'
+    parsed = parse_items(reply, expected_ids=["1", "2", "3", "4"])
+    assert not parsed.complete
+    assert [i["id"] for i in parsed.items] == [1, 2]
+    assert parsed.missing_ids == ["3", "4"]
+
+
+def test_parse_items_from_truncated_wrapper():
+    reply = (
+        '{"selected_articles": [{"id": 5, "final_rank": 1, "sector": "Tech"},'
+        ' {"id": 9, "final_rank": 2, "sec'
+    )
+    parsed = parse_items(reply, list_key="selected_articles")
+    assert [i["id"] for i in parsed.items] == [5]
+
+
+def test_parse_items_wrapper_with_trailing_text():
+    reply = '{"selected_articles": [{"id": 1}, {"id": 1}, {"id": 2}]}\nLet me know!'
+    parsed = parse_items(reply, list_key="selected_articles")
+    assert [i["id"] for i in parsed.items] == [1, 2]
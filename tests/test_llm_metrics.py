@@ -0,0 +1,45 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.llm_metrics import LLMMeter, percentile, report
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([], 95) == 0.0
+
+
+def test_meter_cost_and_stage_summary(monkeypatch):
+    monkeypatch.setenv("DEEPSEEK_PRICE_INPUT_HIT", "1")
+    monkeypatch.setenv("DEEPSEEK_PRICE_INPUT_MISS", "2")
+    monkeypatch.setenv("DEEPSEEK_PRICE_OUTPUT", "4")
+    meter = LLMMeter()
+    usage = {"prompt_tokens": 1000, "completion_tokens": 500, "prompt_cache_hit_tokens": 400}
+    meter.record("rewrite", "deepseek-chat", 200, 2, 0.25, usage)
+    meter.record("rewrite", "deepseek-chat", 503, 4, 1.5)
+    meter.record("ranking", "deepseek-chat", 200, 1, 0.8, usage)
+
+    s = meter.summary()
+    rewrite = s["stages"]["rewrite"]
+    assert rewrite["calls"] == 2 and rewrite["failures"] == 1 and rewrite["retries"] == 4
+    # 400*1 + 600*2 + 500*4 = 3600 per 1M tokens
+    assert rewrite["cost_usd"] == 0.0036
+    assert s["total"]["cached_tokens"] == 800
+    assert rewrite["latency_ms_max"] == 1500.0
+
+
+def test_report_groups_by_stage_and_day(tmp_path):
+    for stamp, latency in (("11012025", 0.1), ("11022025", 0.3)):
+        meter = LLMMeter()
+        meter.record("rewrite", "m", 200, 1, latency, {"prompt_tokens": 10})
+        meter.write(str(tmp_path / f"DAILY_CONTENT_{stamp}.metrics.json"))
+
+    rep = report([str(tmp_path)])
+    assert rep["files"] == 2
+    assert list(rep["days"]) == ["2025-11-01", "2025-11-02"]
+    assert rep["stages"]["rewrite"]["calls"] == 2
+    assert rep["stages"]["rewrite"]["latency_ms_p95"] == 300.0
@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.pre_ranker import (
+    PreRanker,
+    load_archive,
+    main,
+    recall_at_k,
+)
+
+
+def write_day(archive, stamp, day):
+    """Candidates 1..20; DeepSeek 'picked' the explainer-style ones (even ids)."""
+    candidates = []
+    for i in range(1, 21):
+        if i % 2 == 0:
+            title = f"How rate cuts work explained {day}-{i}"
+            desc = "Why the impact on borrowers matters"
+        else:
+            title = f"Company statement on quarterly numbers {day}-{i}"
+            desc = "Shares moved in early trading"
+        candidates.append(
+            {"id": i, "title": title, "description": desc,
+             "base_label": "NEUTRAL", "educational_score": 1}
+        )
+    # keyword order puts the non-picked ones first
+    candidates.sort(key=lambda a: a["id"] % 2 == 0)
+    picked = [{"id": i} for i in range(2, 21, 2)]
+
+    (archive / f"FILTERSFORDEEPSEEK_{stamp}.json").write_text(
+        json.dumps({"articles": candidates}), encoding="utf-8"
+    )
+    (archive / f"DEEPSEEKLISTFOR{stamp}.json").write_text(
+        json.dumps({"articles": picked}), encoding="utf-8"
+    )
+
+
+def make_archive(tmp_path, n_days=4):
+    for d in range(1, n_days + 1):
+        write_day(tmp_path, f"0{d}012025", d)
+    return tmp_path
+
+
+def test_load_archive_pairs_files_by_date(tmp_path):
+    make_archive(tmp_path, n_days=2)
+    # unpaired filters file is skipped
+    (tmp_path / "FILTERSFORDEEPSEEK_12312024.json").write_text('{"articles": []}')
+
+    days = load_archive(str(tmp_path))
+
+    assert [d["stamp"] for d in days] == ["01012025", "02012025"]
+    assert days[0]["picked"] == set(range(2, 21, 2))
+
+
+def test_trained_model_beats_keyword_order(tmp_path):
+    days = load_archive(str(make_archive(tmp_path)))
+
+    model = PreRanker(n_buckets=1 << 12)
+    model.train(days[:-1], epochs=10)
+
+    model_recall = recall_at_k(days[-1:], [10], model)[10]
+    baseline = recall_at_k(days[-1:], [10])[10]
+
+    assert model_recall == 1.0
+    assert baseline == 0.0
+
+
+def test_save_load_roundtrip_and_scoring_speed(tmp_path):
+    days = load_archive(str(make_archive(tmp_path)))
+    model = PreRanker(n_buckets=1 << 12)
+    model.train(days, epochs=3)
+    path = str(tmp_path / "model.json")
+    model.save(path)
+
+    loaded = PreRanker.load(path)
+    article = days[0]["candidates"][0]
+    assert abs(loaded.score(article) - model.score(article)) < 1e-3
+
+    start = time.perf_counter()
+    for _ in range(200):
+        loaded.score(article)
+    assert (time.perf_counter() - start) / 200 < 0.001
+
+
+def test_cli_train_with_holdout(tmp_path, capsys):
+    make_archive(tmp_path)
+    model_path = str(tmp_path / "model.json")
+
+    main(["train", "--archive", str(tmp_path), "--model", model_path,
+          "--holdout-days", "1", "--k", "10"])
+
+    out = capsys.readouterr().out
+    assert os.path.exists(model_path)
+    assert "Trained on 3 day(s)" in out
@@ -0,0 +1,66 @@
+import json
+import os
+import pstats
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.profiling import (
+    StageProfile,
+    profile_modes,
+    profile_path_for,
+    pstats_path_for,
+)
+
+
+def busy_work():
+    blobs = [bytearray(64 * 1024) for _ in range(40)]
+    return sum(len(b) for b in blobs), blobs
+
+
+def test_modes_from_env(monkeypatch):
+    monkeypatch.delenv("BRIEFLY_PROFILE", raising=False)
+    assert profile_modes() == set()
+    monkeypatch.setenv("BRIEFLY_PROFILE", "cpu")
+    assert profile_modes() == {"cpu"}
+    assert profile_modes("all") == profile_modes("1") == profile_modes("cpu,mem") == {"cpu", "mem"}
+    assert profile_modes("off") == set()
+
+
+def test_profile_is_written_next_to_the_artifact(tmp_path):
+    artifact = str(tmp_path / "DAILY_CONTENT_11012025.json")
+    with StageProfile("generate", artifact, modes={"cpu", "mem"}, top=5) as prof:
+        total, keep = busy_work()
+
+    assert prof.paths == [profile_path_for(artifact), pstats_path_for(artifact)]
+    report = json.loads(open(profile_path_for(artifact)).read())
+    assert report["stage"] == "generate" and report["status"] == "ok"
+    assert report["artifact"] == "DAILY_CONTENT_11012025.json"
+    assert any("busy_work" in r["function"] for r in report["cpu"]["top_cumulative"])
+    assert len(report["cpu"]["top_self"]) <= 5
+    assert report["memory"]["peak_bytes"] >= 40 * 64 * 1024
+    assert any("test_profiling.py" in a["where"] for a in report["memory"]["top_allocators"])
+    assert pstats.Stats(pstats_path_for(artifact)).total_calls > 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_survives_a_failing_stage(tmp_path):
+    artifact = str(tmp_path / "DEEPSEEKLISTFOR11012025.json")
+    with pytest.raises(RuntimeError):
+        with StageProfile("filter", artifact, modes={"cpu"}):
+            raise RuntimeError("DeepSeek down")
+
+    report = json.loads(open(profile_path_for(artifact)).read())
+    assert report["status"] == "error"
+    assert "memory" not in report
+
+
+def test_disabled_profile_writes_nothing(tmp_path):
+    artifact = str(tmp_path / "RAW_NEWS_11012025.json")
+    with StageProfile("collect", artifact, modes=set()) as prof:
+        busy_work()
+    assert prof.paths == [] and prof.report is None
+    assert os.listdir(tmp_path) == []
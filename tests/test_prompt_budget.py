@@ -0,0 +1,142 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.prompt_budget import (
+    compact_table,
+    estimate_tokens,
+    fit_to_budget,
+    savings_report,
+)
+
+
+def make_candidates(n, desc_words=40):
+    return [
+        {
+            "id": i,
+            "title": f"Why rates matter for story {i}",
+            "description": " ".join(["explainer"] * desc_words),
+            "base_label": "IMPORTANT" if i % 2 else "NEUTRAL",
+            "educational_score": i,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+FIELDS = ["id", "base_label", "educational_score", "title", "description"]
+
+
+def render(items, desc_limit):
+    limits = {"description": desc_limit} if desc_limit is not None else None
+    return "Instructions.\n" + compact_table(items, FIELDS, limits)
+
+
+def test_estimate_tokens_counts_indentation_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello world") == 2
+    assert estimate_tokens('{"id": 1}') > estimate_tokens("id 1")
+    assert estimate_tokens("a\n" + " " * 16 + "b") > estimate_tokens("a b")
+
+
+def test_compact_table_shortens_labels_and_truncates():
+    table = compact_table(
+        [{"id": 1, "base_label": "NOT IMPORTANT", "title": "A | B\nC", "description": "x" * 50}],
+        ["id", "base_label", "title", "description"],
+        {"description": 10},
+    )
+
+    header, row = table.split("\n")
+    assert header == "id|base_label|title|description"
+    assert row == "1|LOW|A / B C|xxxxxxxxx…"
+
+
+def test_compact_table_drops_a_column_limited_to_zero():
+    table = compact_table(
+        [{"id": 1, "title": "Fed holds", "description": "long text"}],
+        ["id", "title", "description"],
+        {"description": 0},
+    )
+
+    assert table == "id|title\n1|Fed holds"
+    assert "…" not in table
+
+
+def test_compact_prompt_is_much_smaller_than_indented_json():
+    candidates = make_candidates(30)
+
+    report = savings_report(json.dumps(candidates, indent=2), render(candidates, 160))
+
+    assert report["json_tokens"] - report["compact_tokens"] == report["saved_tokens"] > 0
+    assert report["saved_pct"] > 20
+
+
+def test_fit_to_budget_trims_descriptions_before_dropping_items():
+    candidates = make_candidates(10, desc_words=60)
+    no_desc = estimate_tokens(render(candidates, 0))
+
+    kept, limit, prompt = fit_to_budget(candidates, render, no_desc)
+    assert len(kept) == 10
+    assert limit == 0
+
+    kept, limit, prompt = fit_to_budget(candidates, render, no_desc // 2)
+    assert 1 <= len(kept) < 10
+    assert [a["id"] for a in kept] == list(range(1, len(kept) + 1))
+    assert estimate_tokens(prompt) <= no_desc // 2
+
+
+def test_prompt_cache_stats_hit_rate():
+    from backend.unipro_pipeline.llm_usage import PromptCacheStats
+
+    stats = PromptCacheStats()
+    stats.record(None)
+    stats.record({"prompt_tokens": 100, "prompt_cache_hit_tokens": 0, "prompt_cache_miss_tokens": 100})
+    stats.record({"prompt_tokens": 100, "prompt_cache_hit_tokens": 80, "prompt_cache_miss_tokens": 20})
+    snap = stats.snapshot()
+    assert snap["calls"] == 2
+    assert snap["cache_hit_tokens"] == 80
+    assert snap["hit_rate"] == 0.4
+
+
+def test_ranking_system_prompt_is_static():
+    from backend.unipro_pipeline.educational_filter_pipeline import (
+        RANKING_SYSTEM_PROMPT,
+        EducationalFilterPipeline,
+    )
+    from backend.unipro_pipeline.llm_cache import LLMResponseCache
+
+    pipe = EducationalFilterPipeline(deepseek_api_key="k", llm_cache=LLMResponseCache(None))
+    user_a = pipe._build_deepseek_prompt({"articles": make_candidates(3)})
+    user_b = pipe._build_deepseek_prompt({"articles": make_candidates(8)})
+    # candidates only ever appear in the user message
+    assert "story 1" in user_a and "story 1" not in RANKING_SYSTEM_PROMPT
+    assert user_a != user_b
+
+
+def test_analyzer_prompt_is_fitted_to_its_token_budget():
+    from backend.Filtration.deepseek_educational_article_analyzer import (
+        SYSTEM_PROMPT,
+        EducationalArticleAnalyzer,
+    )
+    from backend.unipro_pipeline.llm_cache import LLMResponseCache
+
+    articles = [
+        {"id": i, "title": f"Why rates matter {i}", "description": " ".join(["explainer"] * 60),
+         "sector": "Economy", "base_label": "IMPORTANT"}
+        for i in range(1, 31)
+    ]
+    roomy = EducationalArticleAnalyzer(deepseek_api_key="k", llm_cache=LLMResponseCache(None))
+    roomy._build_prompt(articles)
+    assert roomy.prompt_stats["articles_sent"] == 30
+    assert roomy.prompt_stats["description_chars"] == 200
+    assert roomy.prompt_stats["saved_tokens"] > 0
+
+    budget = estimate_tokens(SYSTEM_PROMPT) + 150
+    tight = EducationalArticleAnalyzer(
+        deepseek_api_key="k", llm_cache=LLMResponseCache(None), prompt_token_budget=budget
+    )
+    prompt = tight._build_prompt(articles)
+    assert 1 <= tight.prompt_stats["articles_sent"] < 30
+    assert tight.prompt_stats["description_chars"] == 0
+    assert estimate_tokens(SYSTEM_PROMPT + prompt) <= budget
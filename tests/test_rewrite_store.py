@@ -0,0 +1,63 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.rewrite_store import RewriteStore, jaccard, shingles
+
+
+def test_near_duplicate_title_reuses_rewrite():
+    store = RewriteStore(":memory:", threshold=0.5)
+    store.store("Fed holds interest rates steady as inflation cools", {"title": "T", "description": "D"})
+    store.store("Oil prices jump after OPEC cuts output", {"title": "O", "description": "P"})
+
+    hit = store.lookup("Fed holds interest rates steady while inflation cools")
+    assert hit["title"] == "T"
+    assert hit["similarity"] >= 0.5
+    assert store.lookup("Apple unveils a new iPhone lineup") is None
+    assert store.snapshot()["reuse_rate"] == 0.5
+
+
+def test_lsh_only_checks_band_matches():
+    store = RewriteStore(":memory:", threshold=0.6)
+    for i in range(200):
+        store.store(f"unrelated headline number {i} about topic{i} and subject{i}", {"title": str(i), "description": ""})
+    store.store("Bitcoin rallies past record high on ETF demand", {"title": "B", "description": ""})
+
+    assert store.lookup("Bitcoin rallies past record high on strong ETF demand")["title"] == "B"
+    assert store.stats["candidates_checked"] < 50
+
+
+def test_refresh_skips_reuse_and_store_replaces_same_title():
+    store = RewriteStore(":memory:", refresh=True)
+    store.store("Same headline here", {"title": "old", "description": ""})
+    assert store.lookup("Same headline here") is None
+    store.refresh = False
+    store.store("Same headline here", {"title": "new", "description": ""})
+    assert store.lookup("Same headline here")["title"] == "new"
+
+
+def test_shingles_and_jaccard():
+    a = shingles("Fed holds rates")
+    assert a == {"fed", "holds", "rates", "fed holds", "holds rates"}
+    assert jaccard(a, a) == 1.0
+    assert jaccard(a, set()) == 0.0
+
+
+def test_locked_file_disables_the_store_instead_of_failing(tmp_path, monkeypatch):
+    import sqlite3
+
+    from backend.unipro_pipeline import rewrite_store
+
+    monkeypatch.setattr(rewrite_store, "_BUSY_TIMEOUT", 0.05)
+    path = str(tmp_path / "rewrites.sqlite")
+    store = RewriteStore(path)
+
+    other = sqlite3.connect(path)
+    other.execute("BEGIN EXCLUSIVE")  # another backfill worker mid-write
+    store.store("Fed holds interest rates steady", {"title": "T", "description": "D"})
+    other.rollback()
+
+    assert store.lookup("Fed holds interest rates steady") is None
+    assert store.prune() == 0
+    assert store.snapshot()["stored"] == 0
@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.Filtration import rule_set
+from backend.Filtration.rule_set import load_rule_set
+
+
+def write_rules(path, important):
+    path.write_text(
+        json.dumps(
+            {
+                "classify": {
+                    "non_us": ["china"],
+                    "important": important,
+                },
+                "classify_order": [["non_us", "REMOVE"], ["important", "IMPORTANT"]],
+                "news_filter": {"earnings": ["earnings"]},
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def test_classify_keeps_substring_semantics_and_order():
+    rules = load_rule_set(use_cache=False)
+
+    assert rules.classify("Breaking: urgent recall of cars") == "IMPORTANT"
+    assert rules.classify("China trade crisis") == "REMOVE"
+    assert rules.classify("celebrity gossip") == "NOT IMPORTANT"
+    assert rules.classify("Quiet day for stocks") == "NEUTRAL"
+    # substring match, like the old `k in text` loops
+    assert rules.classify("shareholders vote yes") == "REMOVE"
+
+
+def test_news_filter_lists_use_word_boundaries():
+    rules = load_rule_set(use_cache=False)
+
+    assert rules.matches("news_filter.earnings", "quarterly earnings beat")
+    assert not rules.matches("news_filter.earnings", "earningsmania")
+
+
+def test_compiled_cache_is_reused_until_rules_change(tmp_path):
+    rules_path = tmp_path / "rules.json"
+    cache_path = str(tmp_path / "cache" / "rules.json")
+    write_rules(rules_path, ["breaking"])
+
+    first = load_rule_set(str(rules_path), cache_path)
+    assert os.path.exists(cache_path)
+    assert first.classify("breaking news") == "IMPORTANT"
+
+    # cache hit: compile step is skipped
+    original = rule_set.compile_rules
+    rule_set.compile_rules = None
+    try:
+        second = load_rule_set(str(rules_path), cache_path)
+    finally:
+        rule_set.compile_rules = original
+    assert second.checksum == first.checksum
+    assert (second.lists, second.classify_order, second.sector_index) == (
+        first.lists, first.classify_order, first.sector_index
+    )
+
+    # rules edited -> checksum mismatch -> recompiled
+    write_rules(rules_path, ["urgent"])
+    third = load_rule_set(str(rules_path), cache_path)
+    assert third.checksum != first.checksum
+    assert third.classify("breaking news") == "NEUTRAL"
+    assert third.classify("urgent news") == "IMPORTANT"
+
+
+def test_corrupt_cache_falls_back_to_compiling(tmp_path):
+    rules_path = tmp_path / "rules.json"
+    cache_path = tmp_path / "rules_cache.json"
+    write_rules(rules_path, ["breaking"])
+    cache_path.write_bytes(b"garbage")
+
+    rules = load_rule_set(str(rules_path), str(cache_path))
+
+    assert rules.classify("breaking") == "IMPORTANT"
+
+
+def test_garbled_cache_header_is_a_miss(tmp_path):
+    rules_path = tmp_path / "rules.json"
+    cache_path = tmp_path / "rules_cache.json"
+    write_rules(rules_path, ["breaking"])
+    cache_path.write_bytes(b"v3 not-a-checksum x\n{}")
+
+    rules = load_rule_set(str(rules_path), str(cache_path))
+
+    assert rules.classify("breaking") == "IMPORTANT"
+    # and the bad file was replaced by a good one
+    assert load_rule_set(str(rules_path), str(cache_path)).lists == rules.lists
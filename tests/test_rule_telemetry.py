@@ -0,0 +1,56 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.Filtration.article_filter import NewsFilter
+from backend.Filtration.rule_telemetry import RuleTelemetry, aggregate, summary_path_for
+
+
+def test_observe_classify_counts_all_lists_and_decider():
+    telemetry = RuleTelemetry()
+
+    telemetry.observe_classify("global crisis: breaking news on the bill")
+    telemetry.observe_classify("quiet day")
+
+    summary = telemetry.summary()
+    assert summary["rule_hits"]["non_us"]["global"] == 1
+    assert summary["rule_hits"]["political"]["bill"] == 1
+    assert summary["rule_hits"]["important"]["crisis"] == 1
+    assert summary["rule_hits"]["important"]["breaking"] == 1
+    # rules that never fired are still listed
+    assert summary["rule_hits"]["non_us"]["japan"] == 0
+    assert summary["decided_by"] == {"non_us": 1, "none": 1}
+    assert summary["texts"]["classify"] == 2
+
+
+def test_stage_timing_and_news_filter_hook():
+    telemetry = RuleTelemetry()
+    news_filter = NewsFilter(telemetry=telemetry)
+
+    with telemetry.stage("news_filter"):
+        kept = news_filter.filter_articles(
+            [{"title": "Earnings beat", "description": ""},
+             {"title": "Fed explains rates", "description": ""}]
+        )
+
+    summary = telemetry.summary()
+    assert len(kept) == 1
+    assert summary["rule_hits"]["news_filter.earnings"]["earnings"] == 1
+    assert summary["stage_seconds"]["news_filter"] >= 0
+
+
+def test_aggregate_reports_dead_rules_and_days_fired(tmp_path):
+    for day, text in (("01012025", "global markets"), ("01022025", "global crisis")):
+        telemetry = RuleTelemetry()
+        telemetry.observe_classify(text)
+        telemetry.write(summary_path_for(str(tmp_path / f"FILTERSFORDEEPSEEK_{day}.json")))
+
+    report = aggregate([str(tmp_path)])
+
+    top = report["rules"][0]
+    assert (top["list"], top["rule"], top["hits"], top["days_fired"]) == ("non_us", "global", 2, 2)
+    assert "political:bill" in report["dead_rules"]
+    assert report["files"] == 2
+    assert json.loads((tmp_path / "FILTERSFORDEEPSEEK_01012025.rules.json").read_text())
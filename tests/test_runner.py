@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.daily_content_generator import DailyContentGenerator
+from backend.unipro_pipeline.educational_filter_pipeline import EducationalFilterPipeline
+from backend.unipro_pipeline.llm_cache import LLMResponseCache
+from backend.unipro_pipeline.rewrite_store import RewriteStore
+from backend.unipro_pipeline.runner import ArtifactWriter, run_in_memory
+
+
+def make_raw(n):
+    return [
+        {"id": i,
+         "title": f"Federal Reserve raises interest rates as inflation hits stocks {i}",
+         "description": "The central bank said the economy and earnings outlook changed",
+         "url": f"https://example.com/{i}", "source": "example",
+         "published_at": "2025-01-01T08:00:00Z"}
+        for i in range(1, n + 1)
+    ]
+
+
+def make_stages(monkeypatch, **pipeline_kwargs):
+    pipe = EducationalFilterPipeline(
+        deepseek_api_key="k", llm_cache=LLMResponseCache(None), **pipeline_kwargs
+    )
+    monkeypatch.setattr(
+        pipe, "_rank_candidates",
+        lambda cands, label="ranking": ([
+            {"id": c["id"], "final_rank": r + 1, "sector": "Economy", "section": "Rates"}
+            for r, c in enumerate(cands[:5])
+        ], {}),
+    )
+    gen = DailyContentGenerator(
+        deepseek_api_key="k", llm_cache=LLMResponseCache(None),
+        rewrite_store=RewriteStore(":memory:"),
+    )
+    monkeypatch.setattr(
+        gen, "_call_deepseek_for_article",
+        lambda art: {"title": f"New {art['id']}", "description": "why it matters"},
+    )
+    return pipe, gen
+
+
+def test_in_memory_run_writes_nothing_when_persist_off(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pipe, gen = make_stages(monkeypatch)
+    result = run_in_memory(
+        20, ArtifactWriter("off"), collect=lambda n: make_raw(n), pipeline=pipe, generator=gen
+    )
+
+    daily = result["daily"]
+    assert daily["total_articles"] == 5
+    assert [a["title"] for a in daily["articles"]][:2] == ["New 1", "New 2"]
+    assert all(a["sector"] == "Economy" for a in daily["articles"])
+    assert result["counts"] == {"raw": 20, "candidates": 20, "final": 5, "daily": 5}
+    assert result["artifacts"] == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_in_memory_run_persists_the_chained_artifacts(tmp_path, monkeypatch):
+    pipe, gen = make_stages(monkeypatch)
+    writer = ArtifactWriter("local", out_dir=str(tmp_path))
+    result = run_in_memory(20, writer, collect=lambda n: make_raw(n), pipeline=pipe, generator=gen)
+
+    names = {os.path.basename(p) for p in result["artifacts"]}
+    assert os.path.basename(gen.output_filename) in names
+    assert pipe._final_filename() in names
+    assert pipe._filters_filename() in names
+    assert any(n.startswith("RAW_NEWS_") for n in names)
+    assert any(n.endswith(".metrics.json") for n in names)
+
+    saved = json.loads((tmp_path / os.path.basename(gen.output_filename)).read_text())
+    assert saved == result["daily"]
+
+
+def test_speculative_rewrites_are_handed_over_in_memory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pipe, gen = make_stages(monkeypatch, speculative=True)
+    monkeypatch.setattr(
+        pipe, "_start_speculation",
+        lambda summary, raw: type("Spec", (), {
+            "stats": {},
+            "finish": lambda self, ids, timeout: {
+                "1": {"title": "Spec 1", "description": "d", "source_title": raw[0]["title"]}
+            },
+        })(),
+    )
+    result = run_in_memory(
+        20, ArtifactWriter("off"), collect=lambda n: make_raw(n), pipeline=pipe, generator=gen
+    )
+
+    first = result["daily"]["articles"][0]
+    assert (first["title"], first["strategy"]) == ("Spec 1", "speculative")
+    assert result["daily"]["metadata"]["speculative"] == {"available": 1, "used": 1}
+
+
+def test_artifact_writer_rejects_unknown_mode():
+    try:
+        ArtifactWriter("ftp")
+    except ValueError as e:
+        assert "ftp" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
@@ -0,0 +1,44 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline.speculative import SpeculativeRewriter, load_speculative
+
+
+class FakeGenerator:
+    max_workers = 2
+
+    def __init__(self):
+        self.started = []
+        self.lock = threading.Lock()
+
+    def _call_deepseek_for_article(self, article):
+        with self.lock:
+            self.started.append(article["id"])
+        time.sleep(0.2)
+        if article["id"] == 3:
+            return {"title": "local", "description": "", "strategy": "FastAIStrategy"}
+        return {"title": f"R{article['id']}", "description": "d"}
+
+
+def test_keeps_picked_rewrites_and_reports_hit_and_waste(tmp_path):
+    gen = FakeGenerator()
+    spec = SpeculativeRewriter(gen)
+    spec.start([{"id": i, "title": f"T{i}"} for i in range(1, 7)])
+    time.sleep(0.05)  # ids 1 and 2 are running, the rest queued
+
+    kept = spec.finish(picked_ids=[1, 3, 9], timeout=2)
+
+    # 3 fell back to a local rewrite, 9 was never speculated
+    assert kept == {"1": {"title": "R1", "description": "d", "source_title": "T1"}}
+    assert spec.stats["hits"] == 1 and spec.stats["picked"] == 3
+    # 2 was already running (wasted); 4-6 were cancelled before starting
+    assert spec.stats["wasted"] == 1 and spec.stats["cancelled"] == 3
+    assert 4 not in gen.started
+
+    path = spec.write(str(tmp_path / "SPECULATIVE_REWRITES_01012025.json"), kept)
+    assert load_speculative(path) == kept
+    assert load_speculative(str(tmp_path / "missing.json")) == {}
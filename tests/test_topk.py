@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.Filtration.topk import label_score_key, rank_key, top_k
+
+
+def test_top_k_matches_sorted_slice():
+    items = [5, 3, 9, 1, 7, 3, 2]
+
+    assert top_k(items, 3, key=lambda x: x) == sorted(items)[:3]
+
+
+def test_top_k_accepts_generator_and_small_k():
+    result = top_k((n for n in range(100, 0, -1)), 2, key=lambda x: x)
+
+    assert result == [1, 2]
+    assert top_k([1, 2, 3], 0, key=lambda x: x) == []
+
+
+def test_top_k_label_score_key_is_stable_on_ties():
+    articles = [
+        {"id": 1, "base_label": "NEUTRAL", "educational_score": 3},
+        {"id": 2, "base_label": "IMPORTANT", "educational_score": 1},
+        {"id": 3, "base_label": "NEUTRAL", "educational_score": 3},
+        {"id": 4, "base_label": "NOT IMPORTANT", "educational_score": 9},
+        {"id": 5, "base_label": "NEUTRAL", "educational_score": 3},
+    ]
+
+    top = top_k(iter(articles), 3, key=label_score_key)
+
+    assert [a["id"] for a in top] == [2, 1, 3]
+
+
+def test_rank_key_defaults_missing_rank_to_last():
+    articles = [
+        {"id": 1},
+        {"id": 2, "educational_ranking": {"rank": 2}},
+        {"id": 3, "educational_ranking": {"rank": 1}},
+    ]
+
+    assert [a["id"] for a in top_k(articles, 10, key=rank_key)] == [3, 2, 1]
@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from backend.unipro_pipeline import tracing
+from backend.unipro_pipeline.llm_client import LLMClient
+from backend.unipro_pipeline.tracing import TracedS3, carry, span
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracing.configure(str(path), trace_id="t1")
+    yield path
+    tracing.configure("off")
+
+
+def read_spans(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_spans_nest_and_carry_attributes(trace_file):
+    with span("outer", stage="filter"):
+        with span("inner", items_in=3) as sp:
+            sp.set(items_out=2)
+            sp.add("memo_hits")
+            sp.add("memo_hits")
+
+    inner, outer = read_spans(trace_file)
+    assert (inner["name"], outer["name"]) == ("inner", "outer")
+    assert inner["parent"] == outer["span"] and outer["parent"] is None
+    assert inner["trace"] == outer["trace"] == "t1"
+    assert (inner["items_in"], inner["items_out"], inner["memo_hits"]) == (3, 2, 2)
+    assert inner["status"] == "ok" and inner["duration_ms"] >= 0
+
+
+def test_span_records_errors_and_reraises(trace_file):
+    with pytest.raises(ValueError):
+        with span("fetch", provider="gnews"):
+            raise ValueError("boom")
+
+    (rec,) = read_spans(trace_file)
+    assert rec["status"] == "error"
+    assert rec["error"] == "ValueError: boom"
+
+
+def test_carry_links_pool_work_to_the_submitting_span(trace_file):
+    both_running = threading.Barrier(2, timeout=5)
+    with span("generate_stage") as stage, ThreadPoolExecutor(max_workers=2) as pool:
+        def work(i):
+            both_running.wait()  # both calls inside the carried context at once
+            with span("rewrite_one", i=i):
+                return i
+
+        assert sorted(pool.map(carry(work), [1, 2])) == [1, 2]
+
+    recs = {(r["name"], r.get("i")): r for r in read_spans(trace_file)}
+    assert recs[("rewrite_one", 1)]["parent"] == stage.id
+    assert recs[("rewrite_one", 2)]["parent"] == stage.id
+
+
+def test_nothing_is_written_when_off(tmp_path):
+    tracing.configure("off")
+    with span("fetch") as sp:
+        sp.set(items=1)
+    assert not tracing.enabled()
+    assert sp.id is None
+
+
+def test_traced_s3_times_uploads_with_size(trace_file, tmp_path):
+    calls = []
+
+    class FakeS3:
+        def upload_file(self, path, bucket, key):
+            calls.append((path, bucket, key))
+
+        def list_objects_v2(self, **kwargs):
+            return {"Contents": []}
+
+    artifact = tmp_path / "FINAL.json"
+    artifact.write_text("{}" * 10)
+    s3 = TracedS3(FakeS3())
+    s3.upload_file(str(artifact), "bucket", "FinalArticles/FINAL.json")
+    assert s3.list_objects_v2(Bucket="bucket") == {"Contents": []}
+
+    (rec,) = read_spans(trace_file)
+    assert calls == [(str(artifact), "bucket", "FinalArticles/FINAL.json")]
+    assert (rec["name"], rec["key"], rec["bytes"]) == ("s3_upload", "FinalArticles/FINAL.json", 20)
+
+
+def test_llm_calls_become_spans_with_tokens(trace_file):
+    class Resp:
+        status_code = 200
+        headers = {}
+        text = ""
+
+        def json(self):
+            return {"choices": [], "usage": {"prompt_tokens": 120, "completion_tokens": 30}}
+
+    client = LLMClient("k", "http://llm.test", post=lambda *a, **k: Resp())
+    client.chat({"model": "deepseek-chat"}, label="ranking", stage="ranking")
+
+    (rec,) = read_spans(trace_file)
+    assert rec["name"] == "llm"
+    assert (rec["stage"], rec["model"], rec["label"]) == ("ranking", "deepseek-chat", "ranking")
+    assert (rec["http_status"], rec["attempts"]) == (200, 1)
+    assert (rec["prompt_tokens"], rec["completion_tokens"]) == (120, 30)